@@ -26,3 +26,5 @@
 
 __version__ = "0.5.1"
 __author__ = "Sebastian Raschka <mail@sebastianraschka.com>"
+
+from biopandas.batch import read_many  # noqa: F401
@@ -0,0 +1,219 @@
+# BioPandas
+# License: BSD 3 clause
+# Project Website: http://rasbt.github.io/biopandas/
+# Code Repository: https://github.com/rasbt/biopandas
+
+"""Cached concatenation of the record DataFrames of a structure."""
+
+import ctypes
+
+import numpy as np
+import pandas as pd
+
+from .spatial import SpatialIndex, point_distances
+
+
+class AtomTable(object):
+    """Record DataFrames concatenated into one table of atoms, with a
+    contiguous coordinate array of shape (n_atoms, 3).
+
+    The concatenated DataFrame, the coordinate array, the codes of
+    factorized columns and the spatial indices are computed on first
+    access.
+
+    Parameters
+    ----------
+    frames : list of pandas.DataFrame
+        Record DataFrames, e.g. `[ppdb.df['ATOM'], ppdb.df['HETATM']]`.
+
+    coord_columns : tuple of str
+        Names of the x, y and z coordinate columns.
+
+    """
+
+    def __init__(self, frames, coord_columns):
+        self.frames = list(frames)
+        self.coord_columns = tuple(coord_columns)
+        self.size = sum(len(df) for df in self.frames)
+        self._state = None
+        self._values = None
+        self._df = None
+        self._index = None
+        self._xyz = None
+        self._codes = {}
+        self._spatial = {}
+
+    def snapshot(self):
+        """Record the state of the DataFrames, against which `is_current`
+        detects changes. Called for the tables cached by `atom_table`."""
+        self._state = [_frame_state(df) for df in self.frames]
+        # keeping the values of object columns alive ensures that their
+        # addresses are not reused by other values
+        self._values = [
+            s.values.copy()
+            for df in self.frames
+            for _, s in df.items()
+            if s.dtype == object
+        ]
+
+    def is_current(self, frames):
+        """Return True if `frames` are the DataFrames the table was built
+        from and they have not been changed since the `snapshot`.
+
+        DataFrames are changed if rows or columns have been added, removed
+        or reordered, or if any value has been assigned or modified in
+        place (e.g. via `df['residue_name'] = ...` or `df.loc[...] = ...`).
+        Modifications are detected by comparing the raw values of the
+        columns, i.e. the bytes of numeric columns and the addresses of the
+        values of object columns, with the copies of the snapshot, which is
+        much faster than concatenating the DataFrames again.
+
+        """
+        frames = list(frames)
+        if self._state is None or len(frames) != len(self.frames):
+            return False
+        for df, old, state in zip(frames, self.frames, self._state):
+            if df is not old or not _same_state(df, state):
+                return False
+        return True
+
+    @property
+    def df(self):
+        """The concatenated DataFrame; like
+        `pd.concat([ppdb.df[r] for r in records])`. Do not modify it in
+        place."""
+        if self._df is None:
+            self._df = pd.concat(objs=self.frames)
+        return self._df
+
+    @property
+    def index(self):
+        """The index of the concatenated DataFrame."""
+        if self._df is not None:
+            return self._df.index
+        if self._index is None:
+            self._index = self.frames[0].index.append(
+                [df.index for df in self.frames[1:]]
+            )
+        return self._index
+
+    @property
+    def xyz(self):
+        """Read-only, C-contiguous float64 array of shape (n_atoms, 3)."""
+        if self._xyz is None:
+            xyz = np.empty((self.size, 3))
+            start = 0
+            for df in self.frames:
+                end = start + len(df)
+                for j, c in enumerate(self.coord_columns):
+                    xyz[start:end, j] = df[c].to_numpy(dtype=float)
+                start = end
+            xyz.flags.writeable = False
+            self._xyz = xyz
+        return self._xyz
+
+    def column(self, name):
+        """Return the values of a column as an array."""
+        if self._df is not None:
+            return self._df[name].to_numpy()
+        if not self.frames:
+            return np.empty(0)
+        return np.concatenate([df[name].to_numpy() for df in self.frames])
+
+    def codes(self, name):
+        """Return the codes of the distinct values of a column, and a
+        dictionary mapping each distinct value to its code (missing values
+        have code -1), as computed by `pd.factorize`."""
+        if name not in self._codes:
+            values = [df[name] for df in self.frames]
+            if values:
+                codes, uniques = pd.factorize(
+                    pd.concat(values, ignore_index=True)
+                )
+            else:
+                codes, uniques = np.empty(0, dtype=np.intp), []
+            lookup = {value: i for i, value in enumerate(uniques)}
+            self._codes[name] = (codes, lookup)
+        return self._codes[name]
+
+    def distance(self, xyz, reduce=None, cutoff=None):
+        """Return the distances of the atoms to the point or points `xyz`
+        as a Series or DataFrame indexed like the concatenated DataFrame;
+        see `PandasPdb.distance`."""
+        xyz = np.asarray(xyz, dtype=float)
+        if xyz.shape == (3,) and reduce is None:
+            diff = self.xyz - xyz
+            sq_dist = diff[:, 0] ** 2 + diff[:, 1] ** 2 + diff[:, 2] ** 2
+            return pd.Series(np.sqrt(sq_dist), index=self.index)
+        values = point_distances(self.xyz, xyz, reduce, cutoff)
+        if reduce is None:
+            return pd.DataFrame(values, index=self.index)
+        return pd.Series(values, index=self.index)
+
+    def spatial_index(self, cell_size=4.0):
+        """Return the `SpatialIndex` of the coordinates, with rows in the
+        order of the concatenated DataFrame."""
+        if cell_size not in self._spatial:
+            self._spatial[cell_size] = SpatialIndex(self.xyz, cell_size)
+        return self._spatial[cell_size]
+
+
+def atom_table(structure, records, coord_columns):
+    """Return the `AtomTable` of the `records` DataFrames of a `PandasPdb`,
+    `PandasMmcif` or `PandasMmtf` object, or of the DataFrame of a
+    `PandasMol2` object if `records` is None.
+
+    The table is cached in `structure._atom_tables` and reused as long as
+    the DataFrames are not replaced or changed (see `AtomTable.is_current`).
+
+    """
+    if records is None:
+        frames = [structure.df]
+    else:
+        records = tuple(records)
+        frames = [structure.df[r] for r in records]
+    table = structure._atom_tables.get(records)
+    if table is None or not table.is_current(frames):
+        table = AtomTable(frames, coord_columns)
+        table.snapshot()
+        structure._atom_tables[records] = table
+    return table
+
+
+def _frame_state(df):
+    """Return the shape, the columns, the index and copies of the raw values
+    of the columns of a DataFrame."""
+    values = [_raw_values(s.values).copy() for _, s in df.items()]
+    return df.shape, tuple(df.columns), df.index, values
+
+
+def _same_state(df, state):
+    if df.shape != state[0] or tuple(df.columns) != state[1]:
+        return False
+    if df.index is not state[2]:
+        return False
+    for (_, s), old in zip(df.items(), state[3]):
+        values = s.values
+        # `values` is kept alive while its raw values are compared
+        if not np.array_equal(_raw_values(values), old):
+            return False
+    return True
+
+
+def _raw_values(values):
+    """Return the raw values of a column as an array of unsigned integers
+    without copying them; for object arrays, these are the addresses of
+    the values."""
+    if isinstance(values, pd.Categorical):
+        categories = pd.util.hash_array(np.asarray(values.categories))
+        return np.concatenate(
+            [_raw_values(values.codes), categories.view(np.uint8)]
+        )
+    if not isinstance(values, np.ndarray):
+        values = pd.util.hash_array(np.asarray(values))
+    if values.dtype != object:
+        return np.ascontiguousarray(values).reshape(-1).view(np.uint8)
+    if values.ndim != 1 or not values.flags.c_contiguous or not len(values):
+        return np.fromiter(map(id, values.flat), np.uintp, values.size)
+    pointer = ctypes.cast(values.ctypes.data, ctypes.POINTER(ctypes.c_size_t))
+    return np.ctypeslib.as_array(pointer, values.shape).view(np.uintp)
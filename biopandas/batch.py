@@ -0,0 +1,213 @@
+# BioPandas
+# License: BSD 3 clause
+# Project Website: http://rasbt.github.io/biopandas/
+# Code Repository: https://github.com/rasbt/biopandas
+
+"""Reading many structure files in parallel."""
+
+import glob
+import os
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+FORMATS = {
+    "pdb": (".pdb", ".ent", ".pdb.gz", ".ent.gz"),
+    "mmcif": (".cif", ".cif.gz"),
+    "mmtf": (".mmtf", ".mmtf.gz"),
+    "mol2": (".mol2", ".mol2.gz"),
+}
+
+
+def read_many(
+    paths,
+    fmt=None,
+    workers=None,
+    concat=True,
+    records=("ATOM", "HETATM"),
+    **kwargs,
+):
+    """Read many structure files with a pool of worker processes.
+
+    Parameters
+    ----------
+    paths : str or iterable
+        Paths to the structure files. Strings may contain glob patterns,
+        e.g. `"structures/*.pdb.gz"`.
+
+    fmt : str in {'pdb', 'mmcif', 'mmtf', 'mol2'} or None, default: None
+        File format. If None, the format is inferred from the file extension
+        of each file.
+
+    workers : int or None, default: None
+        Number of worker processes. Uses `os.cpu_count()` processes if None,
+        and reads the files in the current process if `workers` is 0 or 1.
+
+    concat : bool, default: True
+        If True, returns a single DataFrame that contains the `records`
+        sections of all structures and a `structure_id` column holding the
+        path of the file. Otherwise returns an iterator over
+        `(path, structure)` tuples.
+
+    records : iterable, default: ('ATOM', 'HETATM')
+        Record sections that are concatenated if `concat=True`. Ignored for
+        Mol2 files, which only have a single DataFrame.
+
+    **kwargs
+        Additional keyword arguments for the reader, for example
+        `columns=...` or `compact=True` for `PandasPdb.read_pdb`.
+
+    Returns
+    ---------
+    pandas.DataFrame or iterator
+
+        If `concat=True`, a DataFrame of all successfully read structures.
+        Files that could not be read are skipped with a warning and listed
+        in `df.attrs['errors']` as `{path: error message}`.
+
+        If `concat=False`, an iterator yielding `(path, structure)` tuples
+        in the order in which the files have been read, where `structure`
+        is a `PandasPdb`, `PandasMmcif`, `PandasMmtf` or `PandasMol2` object,
+        or the raised exception if the file could not be read. The raw file
+        contents (e.g. `pdb_text`) are not kept.
+
+    Examples
+    ---------
+    >>> df = read_many("structures/*.pdb", workers=4)
+    >>> for path, ppdb in read_many(paths, fmt="pdb", concat=False):
+    ...     if isinstance(ppdb, Exception):
+    ...         print(f"Could not read {path}: {ppdb}")
+
+    """
+    if fmt is not None and fmt not in FORMATS:
+        raise ValueError(
+            f"Unknown format {fmt!r}; allowed formats are {list(FORMATS)}"
+        )
+    paths = _expand_paths(paths)
+    if concat:
+        return _concat_results(
+            _read_all(paths, fmt, workers, records, kwargs), paths
+        )
+    return (
+        (path, result)
+        for _, path, result in _read_all(paths, fmt, workers, None, kwargs)
+    )
+
+
+def _expand_paths(paths):
+    """Return a list of paths with glob patterns expanded."""
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    expanded = []
+    for path in paths:
+        path = str(path)
+        if glob.has_magic(path):
+            expanded.extend(sorted(glob.glob(path)))
+        else:
+            expanded.append(path)
+    return expanded
+
+
+def _infer_format(path):
+    """Infer the file format from the file extension."""
+    lower = path.lower()
+    for fmt, extensions in FORMATS.items():
+        if lower.endswith(extensions):
+            return fmt
+    raise ValueError(
+        f"Cannot infer the file format of {path}; please specify `fmt`"
+    )
+
+
+def _read_one(index, path, fmt, records, kwargs):
+    """Read a single file; returns `(index, path, result)` where result is
+    the structure, a DataFrame of the concatenated `records`, or the
+    exception."""
+    try:
+        if fmt is None:
+            fmt = _infer_format(path)
+        if fmt == "pdb":
+            from biopandas.pdb import PandasPdb
+
+            obj = PandasPdb().read_pdb(path, keep_text=False, **kwargs)
+        elif fmt == "mmcif":
+            from biopandas.mmcif import PandasMmcif
+
+            obj = PandasMmcif().read_mmcif(path, keep_text=False, **kwargs)
+        elif fmt == "mmtf":
+            from biopandas.mmtf import PandasMmtf
+
+            obj = PandasMmtf().read_mmtf(path, **kwargs)
+        else:
+            from biopandas.mol2 import PandasMol2
+
+            obj = PandasMol2().read_mol2(path, **kwargs)
+            obj.mol2_text = ""
+
+        if records is None:
+            return index, path, obj
+        # only send the requested DataFrames back to the parent process
+        if fmt == "mol2":
+            return index, path, obj.df
+        df = pd.concat(
+            [obj.df[r] for r in records if r in obj.df], ignore_index=True
+        )
+        return index, path, df
+    except Exception as e:
+        return index, path, e
+
+
+def _read_all(paths, fmt, workers, records, kwargs):
+    """Yield `(index, path, result)` tuples in completion order."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(paths) <= 1:
+        for index, path in enumerate(paths):
+            yield _read_one(index, path, fmt, records, kwargs)
+        return
+
+    # submit the largest files first so that a single large file at the end
+    # of the list does not keep one worker busy after all others are done
+    def size(index):
+        try:
+            return os.path.getsize(paths[index])
+        except OSError:
+            return 0
+
+    pending = sorted(range(len(paths)), key=size)
+    max_in_flight = 4 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        while pending or futures:
+            while pending and len(futures) < max_in_flight:
+                index = pending.pop()
+                future = executor.submit(
+                    _read_one, index, paths[index], fmt, records, kwargs
+                )
+                futures[future] = index
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = futures.pop(future)
+                try:
+                    yield future.result()
+                except Exception as e:
+                    # e.g., the result could not be sent to the parent process
+                    yield index, paths[index], e
+
+
+def _concat_results(results, paths):
+    """Concatenate the DataFrames of `results` in the order of `paths`."""
+    dfs, errors = {}, {}
+    for index, path, result in results:
+        if isinstance(result, Exception):
+            errors[index] = f"{type(result).__name__}: {result}"
+            warnings.warn(f"Could not read {path}: {errors[index]}")
+        else:
+            dfs[index] = result.assign(structure_id=path)
+    if dfs:
+        df = pd.concat([dfs[i] for i in sorted(dfs)], ignore_index=True)
+    else:
+        df = pd.DataFrame(columns=["structure_id"])
+    df.attrs["errors"] = {paths[i]: errors[i] for i in sorted(errors)}
+    return df
@@ -0,0 +1,492 @@
+# BioPandas
+# License: BSD 3 clause
+# Project Website: http://rasbt.github.io/biopandas/
+# Code Repository: https://github.com/rasbt/biopandas
+
+"""Caches for parsed structure files.
+
+`DiskCache` requires the optional `pyarrow` dependency
+(`pip install pyarrow`).
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from copy import deepcopy
+
+import biopandas
+from biopandas.lazy import LazyDict
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join("~", ".cache")), "biopandas"
+)
+
+# types of the values whose memory usage does not include other objects
+_SCALAR_TYPES = {str, bytes, int, float, bool, type(None)}
+
+
+class DiskCache(object):
+    """Cache of parsed record sections stored as Feather (Arrow IPC) files.
+
+    Each entry is keyed by the absolute path, modification time and size of
+    the structure file (or, optionally, a hash of its contents), the
+    reader options and the BioPandas version. If the total size of the
+    cache exceeds `max_size`, the least recently used entries are removed.
+
+    Parameters
+    ----------
+    directory : str or None, default: None
+        Cache directory. Uses `~/.cache/biopandas` if None.
+
+    max_size : int or None, default: 2**30
+        Maximum total size of the cache in bytes. Unbounded if None.
+
+    hash_content : bool, default: False
+        If True, entries are keyed by the SHA-1 hash of the file contents
+        instead of the modification time and size of the file.
+
+    Examples
+    ---------
+    >>> cache = DiskCache("/tmp/biopandas-cache")
+    >>> ppdb = PandasPdb().read_pdb("3eiy.pdb", cache=cache)
+
+    """
+
+    def __init__(self, directory=None, max_size=2**30, hash_content=False):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                "The disk cache requires pyarrow; install it via "
+                "`pip install pyarrow`"
+            ) from e
+        if directory is None:
+            directory = DEFAULT_CACHE_DIR
+        self.directory = os.path.abspath(os.path.expanduser(str(directory)))
+        self.max_size = max_size
+        self.hash_content = hash_content
+
+    def key(self, path, fmt, **options):
+        """Return the cache key of a file read with the given options."""
+        return _make_key(fmt, _file_source(path, self.hash_content), options)
+
+    def key_for_id(self, identifier, fmt, **options):
+        """Return the cache key of a structure fetched by its identifier."""
+        return _make_key(fmt, ["id", identifier], options)
+
+    def get(self, key):
+        """Return the `(frames, attrs)` of an entry, or None if `key` is not
+        in the cache."""
+        from pyarrow import feather
+
+        entry = os.path.join(self.directory, key)
+        meta_path = os.path.join(entry, "meta.json")
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            frames = {
+                name: feather.read_table(
+                    os.path.join(entry, f"{i}.feather")
+                ).to_pandas()
+                for i, name in enumerate(meta["frames"])
+            }
+            # the modification time of meta.json records the last access
+            os.utime(meta_path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return frames, meta["attrs"]
+
+    def put(self, key, frames, attrs):
+        """Store the DataFrames in `frames` and the JSON-serializable
+        `attrs` dictionary under `key`. Returns False if the DataFrames
+        cannot be stored in the Arrow format.
+
+        DataFrames that are deferred in a `LazyDict` are not constructed;
+        they are added to the entry once they are constructed (see
+        `update`).
+
+        """
+        import pyarrow as pa
+
+        frames = _constructed(self, key, frames)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=self.directory, prefix=".tmp-")
+        try:
+            meta = {"frames": [], "attrs": attrs}
+            self._write_frames(tmp, meta, frames)
+            os.replace(tmp, os.path.join(self.directory, key))
+        except (OSError, TypeError, ValueError, pa.ArrowException):
+            # e.g., columns with mixed types or concurrent writes of an entry
+            shutil.rmtree(tmp, ignore_errors=True)
+            return False
+        self._evict()
+        return True
+
+    def update(self, key, frames):
+        """Add the DataFrames in `frames` that are not stored yet to the
+        entry `key`; DataFrames deferred in a `LazyDict` are added once
+        they are constructed. Returns False if there is no such entry or
+        the DataFrames cannot be stored."""
+        import pyarrow as pa
+
+        frames = _constructed(self, key, frames)
+        entry = os.path.join(self.directory, key)
+        try:
+            with open(os.path.join(entry, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            frames = {
+                k: v for k, v in frames.items() if k not in meta["frames"]
+            }
+            if frames:
+                self._write_frames(entry, meta, frames)
+        except (OSError, TypeError, ValueError, KeyError, pa.ArrowException):
+            return False
+        self._evict()
+        return True
+
+    @staticmethod
+    def _write_frames(entry, meta, frames):
+        """Write `frames` to Feather files in the `entry` directory and
+        (re)write its `meta` data."""
+        import pyarrow as pa
+        from pyarrow import feather
+
+        for name, df in frames.items():
+            i = len(meta["frames"])
+            feather.write_feather(
+                pa.Table.from_pandas(df), os.path.join(entry, f"{i}.feather")
+            )
+            meta["frames"].append(name)
+        fd, tmp = tempfile.mkstemp(dir=entry, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp, os.path.join(entry, "meta.json"))
+        except (OSError, TypeError, ValueError):
+            os.remove(tmp)
+            raise
+
+    def clear(self):
+        """Remove all entries from the cache. Other files and directories
+        in the cache directory are left untouched."""
+        for _, entry, _ in self._entries():
+            shutil.rmtree(entry, ignore_errors=True)
+
+    def size(self):
+        """Return the total size of the cache in bytes."""
+        return sum(size for _, _, size in self._entries())
+
+    def _entries(self):
+        """Return `(last access time, path, size)` tuples of all entries."""
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for name in os.listdir(self.directory):
+            entry = os.path.join(self.directory, name)
+            if not os.path.isdir(entry):
+                continue
+            try:
+                files = [os.path.join(entry, f) for f in os.listdir(entry)]
+                atime = os.path.getmtime(os.path.join(entry, "meta.json"))
+                size = sum(os.path.getsize(f) for f in files)
+            except OSError:
+                continue
+            entries.append((atime, entry, size))
+        return entries
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits into
+        `max_size` bytes."""
+        if self.max_size is None:
+            return
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        for _, entry, size in entries:
+            if total <= self.max_size:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+class MemoryCache(object):
+    """Thread-safe, memory-bounded LRU cache of parsed structures.
+
+    Each entry is keyed by the absolute path, modification time and size of
+    the structure file, or by the PDB/UniProt code of fetched structures,
+    and the reader options. Cache hits return copies of the cached
+    DataFrames, which are only made once a record section is accessed, so
+    that callers cannot modify the cached entry.
+
+    Parameters
+    ----------
+    max_size : int or None, default: 2**30
+        Maximum total memory usage of the cached DataFrames and attributes
+        (e.g. the file contents) in bytes. Unbounded if None.
+
+    Attributes
+    ----------
+    hits : int
+        Number of cache hits.
+
+    misses : int
+        Number of cache misses.
+
+    evictions : int
+        Number of entries removed to stay within `max_size`.
+
+    Examples
+    ---------
+    >>> cache = MemoryCache(max_size=2**28)
+    >>> ppdb = PandasPdb().read_pdb("3eiy.pdb", cache=cache)
+    >>> ppdb = PandasPdb().fetch_pdb("3eiy", cache=cache)
+    >>> cache.stats()
+    {'hits': 0, 'misses': 2, 'evictions': 0, 'entries': 2, 'size': 1234567}
+
+    """
+
+    def __init__(self, max_size=2**30):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def key(self, path, fmt, **options):
+        """Return the cache key of a file read with the given options."""
+        return _make_key(fmt, _file_source(path), options)
+
+    def key_for_id(self, identifier, fmt, **options):
+        """Return the cache key of a structure fetched by its identifier."""
+        return _make_key(fmt, ["id", identifier], options)
+
+    def get(self, key):
+        """Return copies of the `(frames, attrs)` of an entry, or None if
+        `key` is not in the cache."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            frames, attrs, _ = entry
+            frames = dict(frames)
+        copies = LazyDict()
+        for name, df in frames.items():
+            copies.set_lazy(name, df.copy)
+        attrs = {k: _lazy_copy(v) for k, v in attrs.items()}
+        return copies, attrs
+
+    def put(self, key, frames, attrs):
+        """Store copies of the DataFrames in `frames` and of the `attrs`
+        dictionary under `key`. Returns False if the entry is larger than
+        `max_size`.
+
+        DataFrames that are deferred in a `LazyDict` are not constructed;
+        they are added to the entry once they are constructed (see
+        `update`).
+
+        """
+        frames = _constructed(self, key, frames)
+        frames = {name: df.copy() for name, df in frames.items()}
+        attrs = deepcopy(attrs)
+        size = _frames_size(frames) + _memory_usage(attrs)
+        if self.max_size is not None and size > self.max_size:
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[2]
+            self._entries[key] = (frames, attrs, size)
+            self._size += size
+            self._evict()
+        return True
+
+    def update(self, key, frames):
+        """Add copies of the DataFrames in `frames` that are not stored yet
+        to the entry `key`; DataFrames deferred in a `LazyDict` are added
+        once they are constructed. Returns False if there is no such
+        entry."""
+        frames = _constructed(self, key, frames)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            names = [name for name in frames if name not in entry[0]]
+        if not names:
+            return True
+        frames = {name: frames[name].copy() for name in names}
+        sizes = {name: _frames_size({name: df}) for name, df in frames.items()}
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            stored, attrs, old = entry
+            # another thread may have added the same DataFrames meanwhile
+            names = [name for name in frames if name not in stored]
+            size = sum(sizes[name] for name in names)
+            stored.update((name, frames[name]) for name in names)
+            self._entries[key] = (stored, attrs, old + size)
+            self._size += size
+            self._evict()
+        return True
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits into
+        `max_size` bytes; requires holding the lock."""
+        while self.max_size is not None and self._size > self.max_size:
+            _, (_, _, evicted) = self._entries.popitem(last=False)
+            self._size -= evicted
+            self.evictions += 1
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def size(self):
+        """Return the estimated memory usage of the cache in bytes."""
+        return self._size
+
+    def stats(self):
+        """Return a dictionary with the number of hits, misses, evictions
+        and entries and the memory usage in bytes."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size": self._size,
+            }
+
+
+def _file_source(path, hash_content=False):
+    """Return the parts of a cache key that identify a file."""
+    path = os.path.abspath(str(path))
+    if hash_content:
+        sha = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                sha.update(chunk)
+        return [sha.hexdigest()]
+    stat = os.stat(path)
+    return [path, stat.st_mtime_ns, stat.st_size]
+
+
+def _make_key(fmt, source, options):
+    """Return a cache key for a source read with the given options."""
+    options = {
+        k: (
+            sorted(v, key=str)
+            if isinstance(v, (set, frozenset))
+            else list(v) if isinstance(v, (tuple, list)) else v
+        )
+        for k, v in sorted(options.items())
+    }
+    ident = json.dumps([biopandas.__version__, fmt, source, options])
+    return hashlib.sha1(ident.encode("utf-8")).hexdigest()
+
+
+def _constructed(cache, key, frames):
+    """Return the constructed DataFrames of `frames`. If `frames` is a
+    `LazyDict`, its deferred DataFrames are added to the entry `key` of
+    `cache` once they are constructed."""
+    if not isinstance(frames, LazyDict):
+        return dict(frames)
+    frames.on_load(lambda name, df: cache.update(key, {name: df}))
+    return {k: frames[k] for k in frames if frames.is_loaded(k)}
+
+
+def restore_frames(cache, key, frames, names, rebuild):
+    """Return a `LazyDict` of the DataFrames `names` of the cache entry
+    `key` whose DataFrames `frames` were returned by `cache.get`.
+
+    DataFrames that had not been constructed when the entry was stored are
+    taken from the mapping returned by `rebuild()`, which is called once,
+    on first access, and are then added to the entry.
+
+    """
+    source = LazyDict()
+    source.set_lazy("frames", rebuild)
+
+    def rebuilt(name):
+        return source["frames"][name]
+
+    dfs = LazyDict()
+    for name in names:
+        if name in frames:
+            dfs.set_lazy(name, frames.__getitem__, name)
+        else:
+            dfs.set_lazy(name, rebuilt, name)
+    cache.update(key, dfs)
+    return dfs
+
+
+def _frames_size(frames):
+    return sum(
+        df.memory_usage(index=True, deep=True).sum() for df in frames.values()
+    )
+
+
+def _memory_usage(value):
+    """Return the memory usage of a value and of the strings and nested
+    containers it holds in bytes; like `DataFrame.memory_usage(deep=True)`,
+    objects referenced several times are counted each time."""
+    size = 0
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        size += sys.getsizeof(value)
+        if isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            if set(map(type, value)) <= _SCALAR_TYPES:
+                size += sum(map(sys.getsizeof, value))
+            else:
+                stack.extend(value)
+    return size
+
+
+def sorted_names(names):
+    """Return the record, column or category `names` of a reader option as
+    a sorted list of distinct names, so that equivalent options give the
+    same cache key, or None if `names` is None."""
+    if names is None:
+        return None
+    if isinstance(names, str):
+        names = (names,)
+    return sorted(set(names))
+
+
+def _lazy_copy(value):
+    """Return a dictionary whose items are deep-copied on first access, or
+    `value` itself if it is not a dictionary."""
+    if not isinstance(value, dict):
+        return value
+    copies = LazyDict()
+    for k, v in value.items():
+        copies.set_lazy(k, deepcopy, v)
+    return copies
+
+
+def get_cache(cache):
+    """Return `cache` if it is a `DiskCache` or `MemoryCache` object and
+    otherwise a `DiskCache` using `cache` as its directory."""
+    if isinstance(cache, (DiskCache, MemoryCache)):
+        return cache
+    return DiskCache(cache)
+
+
+def clear_cache(directory=None):
+    """Remove all entries from the disk cache in `directory`
+    (default: `~/.cache/biopandas`)."""
+    DiskCache(directory).clear()
@@ -0,0 +1,217 @@
+# BioPandas
+# License: BSD 3 clause
+# Project Website: http://rasbt.github.io/biopandas/
+# Code Repository: https://github.com/rasbt/biopandas
+
+"""Atom and residue distance matrices and contact maps.
+
+Residue-level matrices are reduced from the atom distances in tiles, and
+contact maps are built from the pairs found by the spatial index, so the
+memory used besides the result is bounded.
+
+"""
+
+import numpy as np
+import pandas as pd
+
+from .spatial import SpatialIndex, point_distances
+
+LEVELS = ("residue", "atom")
+REDUCTIONS = ("min", "ca", "centroid")
+
+# maximum number of atoms per side of a tile of atom distances
+MAX_TILE = 512
+
+
+def contact_map(
+    table,
+    key_columns,
+    atom_name_column,
+    level="residue",
+    cutoff=None,
+    reduce="min",
+    max_memory=2**28,
+    sparse=False,
+):
+    """Compute the distance matrix or contact map of the atoms or residues
+    of an `AtomTable`.
+
+    Parameters
+    ----------
+    table : AtomTable
+        Atoms, e.g. `atom_table(ppdb, ('ATOM',), coord_columns)`.
+
+    key_columns : list of str
+        Columns that identify a residue, e.g.
+        `['chain_id', 'residue_number', 'insertion']`.
+
+    atom_name_column : str
+        Column of the atom names, used to find the C-alpha atoms.
+
+    level, cutoff, reduce, max_memory, sparse
+        See `PandasPdb.contact_map`.
+
+    Returns
+    ---------
+    pandas.DataFrame or (scipy.sparse.csr_matrix, pandas.Index) : See
+        `PandasPdb.contact_map`.
+
+    """
+    if level not in LEVELS:
+        raise ValueError(f"level must be one of {LEVELS}; got {level!r}")
+    if reduce not in REDUCTIONS:
+        raise ValueError(f"reduce must be one of {REDUCTIONS}; got {reduce!r}")
+    if sparse and cutoff is None:
+        raise ValueError("A sparse contact map requires a cutoff")
+    if cutoff is not None and not cutoff >= 0:
+        raise ValueError(f"cutoff must not be negative; got {cutoff}")
+    if not max_memory > 0:
+        raise ValueError(f"max_memory must be positive; got {max_memory}")
+
+    if level == "atom":
+        residues, points, keys = None, table.xyz, table.index
+    else:
+        residues, keys = _residues(table, key_columns)
+        if reduce == "ca":
+            points = _ca_points(table, residues, len(keys), atom_name_column)
+        elif reduce == "centroid":
+            points = _centroids(table.xyz, residues, len(keys))
+        else:
+            points = None
+
+    if cutoff is None:
+        if points is None:
+            values = _min_distances(table.xyz, residues, len(keys), max_memory)
+        else:
+            values = point_distances(points, points)
+        return pd.DataFrame(values, index=keys, columns=keys)
+
+    if points is None:
+        rows, cols = _residue_contacts(table, residues, len(keys), cutoff)
+    else:
+        if level == "atom":
+            index = table.spatial_index()
+        else:
+            index = SpatialIndex(points, cell_size=max(cutoff, 1.0))
+        pairs = [p for p, _ in index.iter_pairs(cutoff)]
+        pairs = np.concatenate([np.empty((0, 2), dtype=np.intp)] + pairs)
+        rows, cols = pairs[:, 0], pairs[:, 1]
+        diagonal = np.flatnonzero(np.isfinite(points).all(axis=1))
+        rows = np.concatenate([rows, cols, diagonal])
+        cols = np.concatenate([cols, pairs[:, 0], diagonal])
+
+    n = len(keys)
+    if sparse:
+        try:
+            from scipy.sparse import csr_matrix
+        except ImportError as e:
+            raise ImportError(
+                "Sparse contact maps require scipy; install it via "
+                "`pip install scipy`"
+            ) from e
+        values = np.ones(len(rows), dtype=bool)
+        return csr_matrix((values, (rows, cols)), shape=(n, n)), keys
+    values = np.zeros((n, n), dtype=bool)
+    values[rows, cols] = True
+    return pd.DataFrame(values, index=keys, columns=keys)
+
+
+def _residues(table, key_columns):
+    """Return the residue number (in order of first appearance) of each
+    atom, and the keys of the residues as a MultiIndex."""
+    combined = np.zeros(table.size, dtype=np.int64)
+    for column in key_columns:
+        codes, lookup = table.codes(column)
+        combined = combined * (len(lookup) + 1) + codes + 1
+    residues, uniques = pd.factorize(combined)
+    order = np.argsort(residues, kind="stable")
+    first = order[np.searchsorted(residues[order], np.arange(len(uniques)))]
+    keys = pd.MultiIndex.from_arrays(
+        [table.column(c)[first] for c in key_columns], names=key_columns
+    )
+    return residues, keys
+
+
+def _ca_points(table, residues, n_residues, atom_name_column):
+    """Return the coordinates of the first C-alpha atom of each residue
+    (NaN for residues without one)."""
+    codes, lookup = table.codes(atom_name_column)
+    rows = np.flatnonzero(codes == lookup.get("CA", -2))
+    found, first = np.unique(residues[rows], return_index=True)
+    points = np.full((n_residues, 3), np.nan)
+    points[found] = table.xyz[rows[first]]
+    return points
+
+
+def _centroids(xyz, residues, n_residues):
+    """Return the mean coordinates of the atoms of each residue, ignoring
+    atoms with non-finite coordinates."""
+    finite = np.isfinite(xyz).all(axis=1)
+    counts = np.bincount(residues[finite], minlength=n_residues)
+    points = np.empty((n_residues, 3))
+    for j in range(3):
+        points[:, j] = np.bincount(
+            residues[finite], weights=xyz[finite, j], minlength=n_residues
+        )
+    with np.errstate(invalid="ignore"):
+        return points / counts[:, None]
+
+
+def _min_distances(xyz, residues, n_residues, max_memory):
+    """Return the matrix of minimum atom distances between residues,
+    computed in tiles of at most about `max_memory` bytes.
+
+    The squared distances of a tile are computed with a single matrix
+    product as `[a, 1, |a|**2] . [-2 * b, |b|**2, 1]`, on coordinates
+    centered at their mean to limit the rounding error.
+
+    """
+    order = np.argsort(residues, kind="stable")
+    xyz, residues = xyz[order], residues[order]
+    finite = np.isfinite(xyz).all(axis=1)
+    xyz = xyz - (xyz[finite].mean(axis=0) if finite.any() else 0.0)
+    sq_norm = (xyz**2).sum(axis=1)
+    ones = np.ones(len(xyz))
+    left = np.column_stack([xyz, ones, sq_norm])
+    right = np.column_stack([-2.0 * xyz, sq_norm, ones])
+
+    starts = np.searchsorted(residues, np.arange(n_residues))
+    # tiles that fit into the CPU cache are faster than larger ones
+    tile = max(1, min(MAX_TILE, int(np.sqrt(max_memory / 16))))
+    out = np.full((n_residues, n_residues), np.nan)
+    for a in range(0, len(xyz), tile):
+        rows, row_starts = _tile_residues(residues, starts, a, tile)
+        for b in range(a, len(xyz), tile):
+            cols, col_starts = _tile_residues(residues, starts, b, tile)
+            sq_dist = left[a : a + tile] @ right[b : b + tile].T
+            # reducing along the contiguous axis first is faster
+            sq_dist = np.fmin.reduceat(sq_dist, col_starts, axis=1)
+            sq_dist = np.fmin.reduceat(sq_dist, row_starts, axis=0)
+            np.fmin(out[rows, cols], sq_dist, out=out[rows, cols])
+    out = np.fmin(out, out.T)
+    np.maximum(out, 0.0, out=out)
+    return np.sqrt(out, out=out)
+
+
+def _tile_residues(residues, starts, start, tile):
+    """Return the slice of residues of the sorted atoms `start` to
+    `start + tile`, and the start of each residue within the tile."""
+    end = min(start + tile, len(residues))
+    first, last = residues[start], residues[end - 1] + 1
+    return slice(first, last), np.maximum(starts[first:last] - start, 0)
+
+
+def _residue_contacts(table, residues, n_residues, cutoff):
+    """Return the (row, column) pairs of residues that have atoms within
+    `cutoff` of each other."""
+    found = []
+    for pairs, _ in table.spatial_index().iter_pairs(cutoff):
+        i, j = residues[pairs[:, 0]], residues[pairs[:, 1]]
+        low, high = np.minimum(i, j), np.maximum(i, j)
+        found.append(np.unique(low.astype(np.int64) * n_residues + high))
+    found = np.unique(np.concatenate([np.empty(0, dtype=np.int64)] + found))
+    low, high = found // n_residues, found % n_residues
+    diagonal = np.unique(residues[np.isfinite(table.xyz).all(axis=1)])
+    rows = np.concatenate([low, high, diagonal])
+    cols = np.concatenate([high, low, diagonal])
+    return rows, cols
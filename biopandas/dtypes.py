@@ -0,0 +1,58 @@
+# BioPandas
+# License: BSD 3 clause
+# Project Website: http://rasbt.github.io/biopandas/
+# Code Repository: https://github.com/rasbt/biopandas
+
+"""Utilities for storing parsed structures with compact dtypes."""
+
+import numpy as np
+import pandas as pd
+
+INT32_MIN, INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+
+def compact_df(df, categorical_columns=None, max_unique_ratio=0.5):
+    """Return a copy of a DataFrame that uses compact dtypes.
+
+    String columns with few distinct values are stored as pandas
+    categoricals, float64 columns as float32 and int64 columns as int32
+    (if all values fit into 32 bits). All other columns are left unchanged.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        DataFrame of a record section, e.g. `PandasPdb.df['ATOM']`.
+
+    categorical_columns : iterable or None, default: None
+        String columns to convert to categoricals. If None, string columns
+        are converted if they pass the `max_unique_ratio` criterion.
+
+    max_unique_ratio : float, default: 0.5
+        String columns are converted to categoricals if the number of
+        distinct values is at most `max_unique_ratio` times the number
+        of rows. Ignored if `categorical_columns` is not None.
+
+    Returns
+    ---------
+    pandas.DataFrame : DataFrame with compact dtypes.
+
+    """
+    df = df.copy()
+    for c in df.columns:
+        col = df[c]
+        if col.dtype == np.float64:
+            df[c] = col.astype(np.float32)
+        elif col.dtype == np.int64:
+            if len(col) == 0 or (
+                col.min() >= INT32_MIN and col.max() <= INT32_MAX
+            ):
+                df[c] = col.astype(np.int32)
+        elif col.dtype == object and len(col) > 0:
+            if pd.api.types.infer_dtype(col, skipna=True) != "string":
+                continue
+            if categorical_columns is not None:
+                if c in categorical_columns:
+                    df[c] = col.astype("category")
+            elif col.nunique() <= max_unique_ratio * len(col):
+                df[c] = col.astype("category")
+    return df
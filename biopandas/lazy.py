@@ -0,0 +1,133 @@
+# BioPandas
+# License: BSD 3 clause
+# Project Website: http://rasbt.github.io/biopandas/
+# Code Repository: https://github.com/rasbt/biopandas
+
+"""Dictionary with values that are constructed on first access."""
+
+from collections.abc import MutableMapping
+from copy import deepcopy
+
+
+class LazyDict(MutableMapping):
+    """Dictionary whose values can be registered as deferred function calls.
+
+    A value registered via `set_lazy` is constructed the first time it is
+    accessed and then stored like a regular value. Iterating over the keys,
+    membership tests and `len` do not construct any values.
+
+    Parameters
+    ----------
+    data : dict or None, default: None
+        Initial (already constructed) values.
+
+    """
+
+    def __init__(self, data=None):
+        self._data = {}
+        self._pending = {}
+        self._callbacks = []
+        if data is not None:
+            self._data.update(data)
+
+    def set_lazy(self, key, func, *args):
+        """Register `func(*args)` as the value of `key`."""
+        self._data[key] = None
+        self._pending[key] = (None, func, args)
+
+    def set_lazy_group(self, keys, func, *args):
+        """Register `func(*args)`, which returns a dict with an entry for
+        each of `keys`, as the values of `keys`. The function is called
+        once, the first time any of the keys is accessed."""
+        keys = tuple(keys)
+        for key in keys:
+            self._data[key] = None
+            self._pending[key] = (keys, func, args)
+
+    def on_load(self, func):
+        """Register `func(key, value)` to be called whenever a deferred
+        value is constructed."""
+        self._callbacks.append(func)
+
+    def is_loaded(self, key):
+        """Return True if the value of `key` has been constructed."""
+        return key in self._data and key not in self._pending
+
+    def pending_call(self, key):
+        """Return the `(func, args)` of the deferred call of `key`, or None
+        if the value has already been constructed."""
+        if key not in self._pending:
+            return None
+        return self._pending[key][1:]
+
+    def _load(self, key):
+        keys, func, args = self._pending[key]
+        if keys is None:
+            self._data[key] = func(*args)
+            del self._pending[key]
+            loaded = [key]
+        else:
+            values = func(*args)
+            loaded = []
+            for k in keys:
+                if self._pending.get(k, (None,))[0] is keys:
+                    del self._pending[k]
+                    self._data[k] = values[k]
+                    loaded.append(k)
+        for callback in self._callbacks:
+            for k in loaded:
+                callback(k, self._data[k])
+
+    def __getitem__(self, key):
+        if key in self._pending:
+            self._load(key)
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        self._pending.pop(key, None)
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        self._pending.pop(key, None)
+        del self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __repr__(self):
+        items = ", ".join(
+            f"{k!r}: <not loaded>" if k in self._pending else f"{k!r}: {v!r}"
+            for k, v in self._data.items()
+        )
+        return f"{type(self).__name__}({{{items}}})"
+
+    def copy(self):
+        """Return a shallow copy; deferred values stay deferred."""
+        new = type(self)()
+        new._data = self._data.copy()
+        new._pending = self._pending.copy()
+        return new
+
+    def __getstate__(self):
+        # deferred calls may not be picklable; construct all values
+        for key in list(self._pending):
+            if key in self._pending:
+                self._load(key)
+        return dict(self.__dict__, _callbacks=[])
+
+    def __deepcopy__(self, memo):
+        # the arguments of deferred calls are never modified and are shared
+        new = type(self)()
+        memo[id(self)] = new
+        new._pending = self._pending.copy()
+        new._data = {
+            k: None if k in self._pending else deepcopy(v, memo)
+            for k, v in self._data.items()
+        }
+        return new
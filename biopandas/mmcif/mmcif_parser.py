@@ -8,6 +8,8 @@ import gzip
 import json
 import re
 
+from ..lazy import LazyDict
+
 
 def partition_string(string, sep):
     return string.partition(sep)
@@ -54,6 +56,18 @@ class LoopMMCIF:
             return self.stop_push()
         target.append(value)
 
+    def push_values(self, values):
+        """Push many values at once; equivalent to calling `push_value` for
+        each value, provided that no value is 'stop_' and that the loop has
+        names that are all distinct."""
+        self.names_defined = True
+        start = self.ref_id + 1
+        for j in range(self.length):
+            self.ref_list[(start + j) % self.length].extend(
+                values[j :: self.length]
+            )
+        self.ref_id = (self.ref_id + len(values)) % self.length
+
     def next_target(self):
         self.ref_id = (self.ref_id + 1) % self.length
         return self.ref_list[self.ref_id]
@@ -91,6 +105,130 @@ def special_split(content):
     return output
 
 
+PARSERS = ("fast", "python")
+
+# characters for which `fast_split` cannot split a line with `str.split`:
+# quotes, comments and the whitespace characters other than space and tab
+__CIF_SPECIAL_CHARS__ = (
+    "'\"#\n\r\x0b\x0c\x1c-\x1f\x85\xa0\u1680\u2000-\u200a\u2028\u2029"
+    "\u202f\u205f\u3000"
+)
+__CIF_SPECIAL__ = re.compile("[%s]" % __CIF_SPECIAL_CHARS__)
+# lines whose tokens can be pushed to a loop at once: no special characters
+# and no tokens that could be keywords or data names
+__CIF_NOT_VALUES__ = re.compile(
+    "[%s]|(?<![^ \t])(?:_|data_|save_|global_|loop_|stop_)"
+    % __CIF_SPECIAL_CHARS__
+)
+# unquoted tokens that `process_content` does not treat as values
+__CIF_KEYWORD__ = re.compile("_|data_|save_|global_|loop_")
+# quotes that open or close a quoted token in `special_split`
+__CIF_QUOTE__ = re.compile("(?<![^ \t])['\"]|['\"](?![^ \t])")
+__CIF_WHITESPACE__ = re.compile("[ \t]")
+
+
+def fast_split(content):
+    """Split a line into `[token, quoted]` pairs like `special_split`.
+
+    Lines without quotes and comments are split with `str.split`. Other
+    lines are cut at the quotes that open or close quoted tokens, and only
+    the unquoted parts are split at whitespace.
+
+    """
+    if not __CIF_SPECIAL__.search(content):
+        return [[token, False] for token in content.split()]
+    output = []
+    token, quoted, quote = "", False, False
+    start = 0
+    ends = [m.start() for m in __CIF_QUOTE__.finditer(content)]
+    for end in ends + [len(content)]:
+        part = content[start:end]
+        if quote:
+            if part:
+                token, quoted = token + part, True
+        else:
+            comment = part.find("#")
+            if comment >= 0:
+                part = part[:comment]
+            for i, word in enumerate(__CIF_WHITESPACE__.split(part)):
+                if i and token:
+                    output.append([token, quoted])
+                    token, quoted = "", False
+                if word:
+                    token, quoted = token + word, False
+            if comment >= 0:
+                break
+        quote = not quote
+        start = end + 1
+    if token:
+        output.append([token, quoted])
+    return output
+
+
+# first characters of the lines that `select_categories` inspects
+__CIF_LINE_STARTS__ = frozenset(
+    ["", ";", "#", " ", "\t", "_", "l", "d", "s", "g"]
+)
+
+
+def select_categories(lines, categories):
+    """Yield the lines that do not belong to categories other than
+    `categories`, without tokenizing the lines of the skipped categories.
+
+    A category is skipped from its first data name (or its `loop_` line) up
+    to the next line that starts with a data name or keyword outside of `;`
+    text fields. Data block headers are always kept.
+
+    """
+    categories = set(categories)
+    skip = False
+    text = False
+    pending = None  # lines from `loop_` up to the first data name
+    in_header = False  # within the data names of a loop
+    for line in lines:
+        z = line[:1]
+        if z not in __CIF_LINE_STARTS__ and not text:
+            # a line of values
+            in_header = False
+            if pending is not None:
+                pending.append(line)
+            elif not skip:
+                yield line
+            continue
+        if z == ";" or text:
+            if z == ";":
+                text = not text
+                in_header = False
+            if pending is not None:
+                pending.append(line)
+            elif not skip:
+                yield line
+            continue
+        start = line.lstrip() if z in (" ", "\t") else line
+        words = start.split(None, 2)
+        first = words[0] if words else "#"
+        if first == "loop_" and len(words) > 1 and words[1][:1] == "_":
+            # data names on the line of the `loop_` keyword
+            pending, first = [], words[1]
+        if first[:1] == "_":
+            if pending is not None or not in_header:
+                skip = first[1:].partition(".")[0] not in categories
+                in_header = pending is not None
+                if not skip:
+                    yield from pending or ()
+                pending = None
+        elif first == "loop_":
+            pending, in_header, skip = [], True, True
+        elif first[:5] in ("data_", "save_") or first == "global_":
+            pending, in_header, skip = None, False, False
+        elif first[:1] != "#":
+            in_header = False
+        if pending is not None:
+            pending.append(line)
+        elif not skip:
+            yield line
+
+
 class TargetSetter:
     def __init__(self, obj, key):
         self.obj = obj
@@ -101,15 +239,25 @@ class TargetSetter:
 
 
 class CIFParser:
-    def __init__(self):
+    def __init__(self, parser="fast"):
+        if parser not in PARSERS:
+            raise ValueError(
+                f"Unknown parser {parser!r}; allowed parsers are {PARSERS}"
+            )
+        self.parser = parser
         self.data = {}
         self.current_target = None
         self.loop_pointer = None
 
     def parse_string(self, contents):
+        self.parse(contents.splitlines())
+
+    def parse(self, fileobj):
+        if self.parser == "fast":
+            return self._parse_fast(fileobj)
         multi_line_mode = False
         buffer = []
-        for line in contents.splitlines():
+        for line in fileobj:
             z = line[:1]
             line = line.strip()
             if z == ";":
@@ -124,12 +272,34 @@ class CIFParser:
             else:
                 self.process_content(special_split(line))
 
-    def parse(self, fileobj):
+    def _parse_fast(self, lines):
+        """Parse lines like `parse`, but collect the tokens of consecutive
+        lines of values and push them to the current loop at once."""
         multi_line_mode = False
         buffer = []
-        for line in fileobj.readlines():
+        values = []
+        for line in lines:
             z = line[:1]
             line = line.strip()
+            if z != ";" and not multi_line_mode:
+                if not __CIF_NOT_VALUES__.search(line):
+                    values += line.split()
+                    continue
+                content = fast_split(line)
+                if all(
+                    c != "stop_" and (quoted or not __CIF_KEYWORD__.match(c))
+                    for c, quoted in content
+                ):
+                    values += [c for c, _ in content]
+                    continue
+                if values:
+                    self._push_values(values)
+                    values = []
+                self.process_content(content)
+                continue
+            if values:
+                self._push_values(values)
+                values = []
             if z == ";":
                 if multi_line_mode:
                     self.set_data_value("\n".join(buffer))
@@ -140,7 +310,21 @@ class CIFParser:
             if multi_line_mode:
                 buffer.append(line)
             else:
-                self.process_content(special_split(line))
+                self.process_content(fast_split(line))
+        if values:
+            self._push_values(values)
+
+    def _push_values(self, values):
+        """Process tokens that are neither keywords nor data names."""
+        loop = self.loop_pointer
+        if (
+            loop is not None
+            and loop.length > 0
+            and len(set(map(id, loop.ref_list))) == loop.length
+        ):
+            return loop.push_values(values)
+        for value in values:
+            self.set_data_value(value)
 
     def process_content(self, content):
         for c, quoted in content:
@@ -363,34 +547,99 @@ def __dump_part__(jso):
     return output + "#\n" if inner else output
 
 
-def load_cif_data(data, do_clean=True, do_type=True):
-    parser = CIFParser()
-    if isinstance(data, str):
+def __clean_cif_category__(name, category, do_clean=True, do_type=True):
+    if not do_clean:
+        return category
+
+    for v in category.values():
+        v[:] = [x not in ("?", ".") and x or None for x in v]
+
+    if not do_type or not __MMCIF_TYPING__ or name not in __MMCIF_TYPING__:
+        return category
+
+    for k2, v2 in __MMCIF_TYPING__[name].items():
+        if k2 in category:
+            for r in range(len(category[k2])):
+                with contextlib.suppress(KeyError):
+                    category[k2][r] = v2(category[k2][r])
+    return category
+
+
+def raw_category(block, name):
+    """Return the item lists of the category `name` of a data block that
+    was loaded with `load_cif_data(..., lazy=True)`.
+
+    If the category has not been accessed yet, its values are returned as
+    tokenized, without cleaning or typing them (missing values are then
+    '?' or '.' instead of None), and the category stays unloaded.
+
+    """
+    call = block.pending_call(name) if isinstance(block, LazyDict) else None
+    if call is not None and call[0] is __clean_cif_category__:
+        return call[1][1]
+    return block[name]
+
+
+def load_cif_data(
+    data,
+    do_clean=True,
+    do_type=True,
+    lazy=False,
+    parser="fast",
+    categories=None,
+):
+    """Parse mmCIF data into a dictionary of data blocks, each holding a
+    dictionary of categories that map item names to lists of values.
+
+    Parameters
+    ----------
+    data : str or iterable of str
+        Contents of an mmCIF file, or its lines (e.g. a file object).
+
+    do_clean : bool, default: True
+        Replaces the values '?' and '.' with None.
+
+    do_type : bool, default: True
+        Converts the values of numeric items to numbers.
+
+    lazy : bool, default: False
+        Cleans and types each category when it is first accessed.
+
+    parser : {'fast', 'python'}, default: 'fast'
+        Tokenizer engine. 'fast' splits plain lines with `str.split` and
+        pushes runs of loop values at once; 'python' splits every line
+        character by character with `special_split`. Both return the same
+        data.
+
+    categories : iterable or None, default: None
+        Names of the categories to parse, e.g. `['entry', 'atom_site']`.
+        The lines of all other categories are skipped before they are
+        tokenized (see `select_categories`). Parses all categories if None.
+
+    """
+    parser = CIFParser(parser)
+    if categories is not None:
+        lines = data.splitlines() if isinstance(data, str) else data
+        parser.parse(select_categories(lines, categories))
+    elif isinstance(data, str):
         parser.parse_string(data)
     else:
         parser.parse(data)  # fileobj
 
-    if not do_clean:
+    if lazy:
+        # categories are cleaned and typed when they are first accessed
+        for k, v in parser.data.items():
+            block = LazyDict()
+            for k2, v2 in v.items():
+                block.set_lazy(
+                    k2, __clean_cif_category__, k2, v2, do_clean, do_type
+                )
+            parser.data[k] = block
         return parser.data
 
-    for k, v in parser.data.items():
+    for v in parser.data.values():
         for k2, v2 in v.items():
-            for k3, v3 in v2.items():
-                for i in range(len(v3)):
-                    v2[k3][i] = v3[i] not in ["?", "."] and v3[i] or None
-
-    if not do_type or not __MMCIF_TYPING__:
-        return parser.data
-
-    for _, data in parser.data.items():
-        for k, v in __MMCIF_TYPING__.items():
-            if k not in data:
-                continue
-            for k2, v2 in v.items():
-                if k2 in data[k]:
-                    for r in range(len(data[k][k2])):
-                        with contextlib.suppress(KeyError):
-                            data[k][k2][r] = v2(data[k][k2][r])
+            __clean_cif_category__(k2, v2, do_clean, do_type)
     return parser.data
 
 
@@ -8,10 +8,13 @@
 # Code Repository: https://github.com/rasbt/biopandas
 from __future__ import annotations
 import gzip
+import mmap
+import os
 import sys
-import copy
 import warnings
-from typing import Dict, List, Optional
+from contextlib import contextmanager
+from functools import partial
+from typing import List, Optional
 from urllib.error import HTTPError, URLError
 from urllib.request import urlopen
 
@@ -19,11 +22,21 @@ import numpy as np
 import pandas as pd
 from looseversion import LooseVersion
 
+from ..atom_table import AtomTable, atom_table
+from ..cache import get_cache, restore_frames, sorted_names
+from ..contacts import contact_map
+from ..dtypes import compact_df
+from ..lazy import LazyDict
+from ..models import (ModelIndex, array_to_models, models_to_array,
+                      select_models)
 from ..pdb.engines import amino3to1dict
 from ..pdb.pandas_pdb import PandasPdb
+from ..superpose import (dataframe_rmsd, matched_rmsd, model_rmsd_matrix,
+                         selector, superpose_dataframe)
+from ..selection import SelectionError, mmcif_fields, selection_mask
 from .engines import (ANISOU_DF_COLUMNS, MMCIF_PDB_COLUMN_MAP,
                       MMCIF_PDB_NONEFIELDS, PDB_COLUMN_ORDER, mmcif_col_types)
-from .mmcif_parser import load_cif_data
+from .mmcif_parser import load_cif_data, raw_category
 
 pd_version = LooseVersion(pd.__version__)
 
@@ -37,10 +50,17 @@ class PandasMmcif:
         self.mmcif_path = ""
         self.auth = use_auth
         self._get_dict = {}
+        self._model_cache = {}
+        self._atom_tables = {}
 
     @property
     def df(self):
-        """Acccess dictionary of pandas DataFrames for PDB record sections."""
+        """Acccess dictionary of pandas DataFrames for PDB record sections.
+
+        The record sections, as well as the categories in `data`, are
+        constructed the first time they are accessed.
+
+        """
         return self._df
 
     @df.setter
@@ -52,7 +72,18 @@ class PandasMmcif:
             "you want to overwrite the `df` attribute."
         )
 
-    def read_mmcif(self, path):
+    def read_mmcif(
+        self,
+        path,
+        columns=None,
+        records=None,
+        memory_map=False,
+        keep_text=True,
+        compact=False,
+        cache=None,
+        parser="fast",
+        categories=None,
+    ):
         """Read MMCIF files (unzipped or gzipped) from local drive
 
         Attributes
@@ -60,17 +91,170 @@ class PandasMmcif:
         path : Union[str, os.PathLike]
             Path to the MMCIF file in .cif format or gzipped format (.cif.gz).
 
+        columns : iterable, default: None
+            Names of the `atom_site` (and `atom_site_anisotrop`) items to
+            keep, for example `("auth_atom_id", "Cartn_x", "Cartn_y",
+            "Cartn_z")`. Columns not present in the file are ignored.
+            Keeps all columns if None.
+
+        records : iterable, default: None
+            Record sections to construct, any of {'ATOM', 'HETATM', 'ANISOU'}.
+            Constructs all sections if None.
+
+        memory_map : bool, default: False
+            If True, memory-maps uncompressed files (gzipped files are
+            decompressed as a stream) and passes the file to the parser one
+            line at a time instead of decoding it into a single string first.
+
+        keep_text : bool, default: True
+            Stores the file contents in `pdb_text` if True. Set to False to
+            avoid keeping a copy of the raw text in memory.
+
+        compact : bool, default: False
+            If True, converts the ATOM, HETATM and ANISOU DataFrames to
+            compact dtypes to reduce memory usage. See `compact`.
+
+        cache : str, DiskCache or MemoryCache, default: None
+            Cache directory, `biopandas.cache.DiskCache` or
+            `biopandas.cache.MemoryCache` object. If set, the parsed record
+            sections and `data` are loaded from the cache if the file has been
+            read with the same arguments before, and are stored in the cache
+            otherwise. A directory or `DiskCache` requires `pyarrow`.
+
+        parser : {'fast', 'python'}, default: 'fast'
+            Tokenizer engine of `load_cif_data`. Both engines return the
+            same data; 'python' is the original character-by-character
+            tokenizer.
+
+        categories : iterable or None, default: None
+            Names of the categories to parse into `data` besides `entry` and
+            the categories needed for the `records` (`atom_site` and
+            `atom_site_anisotrop`), e.g. `("struct_conn",)`; use `()` for
+            none. The lines of all other categories are skipped without
+            being tokenized, which saves most of the parsing time for large
+            entries. Parses all categories if None.
+
         Returns
         ---------
         self
 
         """
-        self.mmcif_path, self.pdb_text = self._read_mmcif(path=str(path))
-        self._df = self._construct_df(text=self.pdb_text)
+        path = str(path)
+        if cache is not None:
+            cache = get_cache(cache)
+            key = cache.key(
+                path,
+                "mmcif",
+                columns=sorted_names(columns),
+                records=sorted_names(records),
+                keep_text=keep_text,
+                compact=compact,
+                categories=sorted_names(categories),
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                frames, attrs = cached
+                # sections and categories that are not cached are read
+                # again from the file on first access
+                source = LazyDict()
+                source.set_lazy(
+                    "pdbx",
+                    partial(
+                        PandasMmcif(self.auth).read_mmcif,
+                        path,
+                        columns=columns,
+                        records=records,
+                        keep_text=False,
+                        compact=compact,
+                        parser=parser,
+                        categories=categories,
+                    ),
+                )
+                self._df = restore_frames(
+                    cache,
+                    key,
+                    frames,
+                    attrs["sections"],
+                    lambda: source["pdbx"].df,
+                )
+                self.data = LazyDict()
+                for name in attrs["categories"]:
+                    self.data.set_lazy(
+                        name, lambda k: source["pdbx"].data[k], name
+                    )
+                self.mmcif_path, self.pdb_text = path, attrs["pdb_text"]
+                self.code = attrs["code"]
+                return self
+
+        if memory_map:
+            self.mmcif_path = path
+            with self._iter_mmcif_lines(path) as (lines, buffer):
+                self._df = self._construct_df(
+                    text=lines,
+                    columns=columns,
+                    records=records,
+                    parser=parser,
+                    categories=categories,
+                )
+                self.pdb_text = (
+                    bytes(buffer).decode("utf-8")
+                    if keep_text and buffer is not None
+                    else ""
+                )
+            if keep_text and not self.pdb_text:
+                # gzipped files are not memory-mapped
+                _, self.pdb_text = self._read_mmcif(path=path)
+        else:
+            self.mmcif_path, self.pdb_text = self._read_mmcif(path=path)
+            self._df = self._construct_df(
+                text=self.pdb_text,
+                columns=columns,
+                records=records,
+                parser=parser,
+                categories=categories,
+            )
+            if not keep_text:
+                self.pdb_text = ""
+        if compact:
+            self.compact()
         # self.header, self.code = self._parse_header_code() #TODO: implement
         self.code = self.data["entry"]["id"][0].lower()
+        if cache is not None:
+            # sections that have not been constructed yet are stored later;
+            # the categories in `data` are not stored
+            cache.put(
+                key,
+                self.df,
+                {
+                    "pdb_text": self.pdb_text,
+                    "code": self.code,
+                    "sections": list(self.df),
+                    "categories": list(self.data),
+                },
+            )
         return self
     
+    def compact(self, records=("ATOM", "HETATM", "ANISOU")):
+        """Convert record DataFrames to compact dtypes in place.
+
+        String columns with few distinct values are converted to pandas
+        categoricals, float columns to float32 and integer columns to int32.
+
+        Parameters
+        ----------
+        records : iterable, default: ('ATOM', 'HETATM', 'ANISOU')
+            Record sections to convert.
+
+        Returns
+        ---------
+        self
+
+        """
+        for r in records:
+            if r in self.df:
+                self._df[r] = compact_df(self.df[r])
+        return self
+
     def label_models(self):
         """Adds a column ("model_id") to the underlying
         DataFrames containing the model number."""
@@ -95,14 +279,7 @@ class PandasMmcif:
             structure subsetted to the given model.
         """
 
-        biopandas_structure = copy.deepcopy(self)
-        if "ATOM" in biopandas_structure.df.keys():
-            biopandas_structure.df["ATOM"] = biopandas_structure.df["ATOM"].loc[biopandas_structure.df["ATOM"]["pdbx_PDB_model_num"] == model_index]
-        if "HETATM" in biopandas_structure.df.keys():
-            biopandas_structure.df["HETATM"] = biopandas_structure.df["HETATM"].loc[
-                biopandas_structure.df["HETATM"]["pdbx_PDB_model_num"] == model_index
-            ]
-        return biopandas_structure
+        return select_models(self, [model_index], ("ATOM", "HETATM"))
 
     def get_models(self, model_indices: List[int]) -> PandasMmcif:
         """Returns a new PandasMmcif object with the dataframes subset to the
@@ -119,17 +296,102 @@ class PandasMmcif:
             containing the structure subsetted to the given model.
         """
 
-        biopandas_structure = copy.deepcopy(self)
+        return select_models(self, model_indices, ("ATOM", "HETATM"))
 
-        if "ATOM" in biopandas_structure.df.keys():
-            biopandas_structure.df["ATOM"] = biopandas_structure.df["ATOM"].loc[
-                [x in model_indices for x in biopandas_structure.df["ATOM"]["pdbx_PDB_model_num"].tolist()]
-            ]
-        if "HETATM" in biopandas_structure.df.keys():
-            biopandas_structure.df["HETATM"] = biopandas_structure.df["HETATM"].loc[
-                [x in model_indices for x in biopandas_structure.df["HETATM"]["pdbx_PDB_model_num"].tolist()]
-            ]
-        return biopandas_structure
+    def _model_index(self, record):
+        """Return the (cached) `biopandas.models.ModelIndex` of the
+        `pdbx_PDB_model_num` column of a record section."""
+        df = self.df[record]
+        cached = self._model_cache.get(record)
+        if cached is None or cached[0] is not df:
+            cached = (df, ModelIndex(df["pdbx_PDB_model_num"]))
+            self._model_cache[record] = cached
+        return cached[1]
+
+    def to_coordinate_array(self, records=("ATOM", "HETATM")):
+        """Return the coordinates of all models as a single array.
+
+        Parameters
+        ----------
+        records : iterable, default: ('ATOM', 'HETATM')
+            Record sections in {'ATOM', 'HETATM'} to include.
+
+        Returns
+        ---------
+        coords : numpy.ndarray, shape (n_models, n_atoms, 3)
+            Coordinates of each model (by `pdbx_PDB_model_num`), allocated
+            once. Within each model, the atoms are in the order of the
+            concatenated `records` DataFrames.
+
+        topology : pandas.DataFrame
+            The `records` rows of the first model (with a new index), which
+            describe the atoms of all models.
+
+        Raises a ValueError if the models do not have the same atoms, i.e.,
+        the same groups, chains, residues, atom names and alternate
+        locations.
+
+        """
+        for r in records:
+            if r not in ("ATOM", "HETATM"):
+                raise ValueError(
+                    f"Unknown record {r!r}; allowed records are "
+                    "['ATOM', 'HETATM']"
+                )
+        return models_to_array(
+            self,
+            records,
+            ("Cartn_x", "Cartn_y", "Cartn_z"),
+            (
+                "group_PDB",
+                "label_asym_id",
+                "label_seq_id",
+                "pdbx_PDB_ins_code",
+                "label_comp_id",
+                "label_atom_id",
+                "label_alt_id",
+            ),
+        )
+
+    @classmethod
+    def from_coordinate_array(cls, coords, topology, model_ids=None):
+        """Construct a multi-model structure from an array of coordinates.
+
+        Parameters
+        ----------
+        coords : array-like, shape (n_models, n_atoms, 3)
+            Coordinates of each model.
+
+        topology : pandas.DataFrame
+            ATOM and/or HETATM rows describing the `n_atoms` atoms of each
+            model, e.g. as returned by `to_coordinate_array`.
+
+        model_ids : array-like or None, default: None
+            Model numbers (`pdbx_PDB_model_num`). Models are numbered
+            1, 2, ... if None.
+
+        Returns
+        ---------
+        pandas_mmcif.PandasMmcif : A new PandasMmcif object with a copy of
+            the `topology` rows for each model in the ATOM and HETATM
+            DataFrames.
+
+        """
+        df, _ = array_to_models(
+            coords,
+            topology,
+            ("Cartn_x", "Cartn_y", "Cartn_z"),
+            model_column="pdbx_PDB_model_num",
+            serial_column="id",
+            model_ids=model_ids,
+        )
+        new = cls()
+        new._df = {
+            r: df.loc[df["group_PDB"] == r].reset_index(drop=True)
+            for r in ("ATOM", "HETATM")
+        }
+        new._df["ANISOU"] = pd.DataFrame(columns=ANISOU_DF_COLUMNS)
+        return new
 
     def fetch_mmcif(
         self,
@@ -205,22 +467,143 @@ class PandasMmcif:
         self._df = self._construct_df(text=self.mmcif_text)
         return self
 
-    def _construct_df(self, text: str):
-        data = load_cif_data(text)
+    def _construct_df(
+        self,
+        text: str,
+        columns=None,
+        records=None,
+        parser="fast",
+        categories=None,
+    ):
+        if records is None:
+            records = ("ATOM", "HETATM", "ANISOU")
+        elif isinstance(records, str):
+            records = (records,)
+        unknown = set(records) - {"ATOM", "HETATM", "ANISOU"}
+        if unknown:
+            raise ValueError(
+                f"Unknown record sections {sorted(unknown)}; "
+                "allowed sections are ['ATOM', 'HETATM', 'ANISOU']"
+            )
+        if isinstance(columns, str):
+            columns = (columns,)
+
+        if categories is not None:
+            categories = set(categories) | {"entry"}
+            if "ATOM" in records or "HETATM" in records:
+                categories.add("atom_site")
+            if "ANISOU" in records:
+                categories.add("atom_site_anisotrop")
+
+        # categories and record sections are constructed on first access
+        data = load_cif_data(
+            text, lazy=True, parser=parser, categories=categories
+        )
         data = data[list(data.keys())[0]]
         self.data = data
-        df: Dict[str, pd.DataFrame] = {}
-        full_df = pd.DataFrame.from_dict(
-            data["atom_site"], orient="index"
-        ).transpose()
-        full_df = full_df.astype(mmcif_col_types, errors="ignore")
-        df["ATOM"] = pd.DataFrame(full_df[full_df.group_PDB == "ATOM"])
-        df["HETATM"] = pd.DataFrame(full_df[full_df.group_PDB == "HETATM"])
+        df = LazyDict()
+        atom_records = [r for r in ("ATOM", "HETATM") if r in records]
+        if atom_records:
+            df.set_lazy_group(
+                atom_records,
+                self._atom_site_to_dfs,
+                data,
+                atom_records,
+                columns,
+            )
+        if "ANISOU" in records:
+            df.set_lazy("ANISOU", self._anisotrop_to_df, data, columns)
+        return df
+
+    @staticmethod
+    def _atom_site_to_dfs(data, atom_records, columns=None):
+        """Construct the ATOM and HETATM DataFrames from `atom_site`."""
+        atom_site = raw_category(data, "atom_site")
+        if columns is not None:
+            # group_PDB is needed to split ATOM and HETATM entries
+            atom_site = {
+                k: v
+                for k, v in atom_site.items()
+                if k in columns or k == "group_PDB"
+            }
+        full_df = PandasMmcif._category_to_df(atom_site, mmcif_col_types)
+        df = {}
+        for r in atom_records:
+            df[r] = pd.DataFrame(full_df[full_df.group_PDB == r])
+            if columns is not None and "group_PDB" not in columns:
+                df[r] = df[r].drop(columns="group_PDB")
+        return df
+
+    @staticmethod
+    def _anisotrop_to_df(data, columns=None):
+        """Construct the ANISOU DataFrame from `atom_site_anisotrop`."""
         try:
-            df["ANISOU"] = pd.DataFrame(data["atom_site_anisotrop"])
+            anisotrop = raw_category(data, "atom_site_anisotrop")
         except KeyError:
-            df["ANISOU"] = pd.DataFrame(columns=ANISOU_DF_COLUMNS)
-        return df
+            anisotrop = {k: [] for k in ANISOU_DF_COLUMNS}
+        if columns is not None:
+            anisotrop = {k: v for k, v in anisotrop.items() if k in columns}
+        return PandasMmcif._category_to_df(anisotrop)
+
+    @staticmethod
+    def _category_to_df(category, col_types=None):
+        """Construct a DataFrame from the item lists of a category.
+
+        The values of all items are stacked into a single (items, rows)
+        object array, and each row of it is converted to a column of the
+        type given in `col_types`. Missing values ('?', '.' or None) become
+        NaN in float columns, 'None' in str columns and None otherwise;
+        int columns with missing or non-integer values are left as str.
+
+        """
+        if col_types is None:
+            col_types = {}
+        names = list(category)
+        values = np.array([category[k] for k in names], dtype=object)
+        if values.ndim != 2:
+            # items of unequal lengths are padded with missing values
+            category = {
+                k: [x not in ("?", ".") and x or None for x in v]
+                for k, v in category.items()
+            }
+            df = pd.DataFrame.from_dict(category, orient="index").transpose()
+            return df.astype(
+                {k: v for k, v in col_types.items() if k in df},
+                errors="ignore",
+            )
+        missing = (
+            (values == "?")
+            | (values == ".")
+            | (values == "")
+            | pd.isnull(values)
+        )
+        return pd.DataFrame(
+            {
+                k: PandasMmcif._typed_column(v, m, col_types.get(k))
+                for k, v, m in zip(names, values, missing)
+            },
+            index=pd.RangeIndex(values.shape[1]),
+            columns=names,
+        )
+
+    @staticmethod
+    def _typed_column(values, missing, dtype):
+        """Convert a column of tokens and its mask of missing values."""
+        if dtype is float:
+            column = np.full(len(values), np.nan)
+            try:
+                column[~missing] = values[~missing].astype(np.float64)
+                return column
+            except ValueError:
+                pass
+        elif dtype is int and not missing.any():
+            try:
+                return values.astype(np.int64)
+            except (ValueError, OverflowError):
+                pass
+        column = values.copy()
+        column[missing] = "None" if dtype is str else None
+        return column
 
     @staticmethod
     def _fetch_mmcif(pdb_code):
@@ -289,17 +672,50 @@ class PandasMmcif:
             )
         return path, txt
 
+    @staticmethod
+    @contextmanager
+    def _iter_mmcif_lines(path):
+        """Provide an iterator over the decoded lines of an MMCIF file from
+        local drive together with the memory-mapped file buffer (None for
+        gzipped files)."""
+        if path.endswith((".cif", ".mmcif")):
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    # empty files cannot be memory-mapped
+                    yield iter(()), b""
+                    return
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    lines = (
+                        line.decode("utf-8") for line in iter(mm.readline, b"")
+                    )
+                    yield lines, mm
+        elif path.endswith((".cif.gz", ".mmcif.gz")):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                yield f, None
+        else:
+            allowed_formats = ", ".join(
+                (".cif", ".cif.gz", ".mmcif", ".mmcif.gz")
+            )
+            raise ValueError(
+                f"Wrong file format; allowed file formats are {allowed_formats}"
+            )
+
     def get(self, s, df=None, invert=False, records=("ATOM", "HETATM")):
         """Filter PDB DataFrames by properties
 
         Parameters
         ----------
-        s : str  in {'main chain', 'hydrogen', 'c-alpha', 'heavy'}
-            String to specify which entries to return.
+        s : str
+            String to specify which entries to return: one of
+            {'main chain', 'hydrogen', 'c-alpha', 'carbon', 'heavy'} or a
+            selection string such as `"chain A and resi 10-50 and name CA"`;
+            see `biopandas.selection` for the syntax. Chains, residues and
+            atom names refer to the `auth_*` columns if `use_auth` is True
+            and to the `label_*` columns otherwise.
 
         df : pandas.DataFrame, default: None
             Optional DataFrame to perform the filter operation on.
-            If df=None, filters on self.df['ATOM'].
+            If df=None, filters on the `records` DataFrames.
 
         invert : bool, default: True
             Inverts the search query. For example if s='hydrogen' and
@@ -330,11 +746,21 @@ class PandasMmcif:
 
         if not self._get_dict:
             self._get_dict = self._init_get_dict()
-        if s not in self._get_dict.keys():
-            raise AttributeError(f"s must be in {self._get_dict.keys()}")
-        if not df:
-            df = pd.concat(objs=[self.df[i] for i in records])
-        return self._get_dict[s](df, invert=invert)
+        if df is None:
+            table = atom_table(self, records,
+                               ("Cartn_x", "Cartn_y", "Cartn_z"))
+            df = table.df
+        else:
+            table = AtomTable([df], ("Cartn_x", "Cartn_y", "Cartn_z"))
+        if s in self._get_dict:
+            return self._get_dict[s](df, invert=invert)
+        try:
+            mask = selection_mask(s, table, mmcif_fields(self.auth))
+        except SelectionError as e:
+            raise AttributeError(
+                f"s must be in {self._get_dict.keys()} or a selection "
+                f"string; {e}") from e
+        return df[~mask if invert else mask]
 
     @staticmethod
     def _get_mainchain(
@@ -430,7 +856,8 @@ class PandasMmcif:
         indices = []
 
         residue_number_insertion = (
-            tmp[residue_number_col].astype(str) + tmp["pdbx_PDB_ins_code"]
+            tmp[residue_number_col].astype(str)
+            + tmp["pdbx_PDB_ins_code"].astype(object)
         )
 
         for num, ind in zip(residue_number_insertion, np.arange(tmp.shape[0])):
@@ -439,13 +866,24 @@ class PandasMmcif:
             cmp = num
 
         transl = (
-            tmp.iloc[indices][residue_col].map(amino3to1dict).fillna(fillna)
+            tmp.iloc[indices][residue_col]
+            .astype(object)
+            .map(amino3to1dict)
+            .fillna(fillna)
         )
 
         return pd.concat((tmp.iloc[indices][chain_col], transl), axis=1)
 
     @staticmethod
-    def rmsd(df1, df2, s=None, invert=False):
+    def rmsd(
+        df1,
+        df2,
+        s=None,
+        invert=False,
+        decimals=4,
+        superpose=False,
+        weights=None,
+    ):
         """Compute the Root Mean Square Deviation between molecules.
 
         Parameters
@@ -467,47 +905,55 @@ class PandasMmcif:
             `s='hydrogen', invert=True` computes the RMSD based on all
             but hydrogen atoms.
 
+        decimals, superpose, weights
+            See `PandasPdb.rmsd`.
+
         Returns
         ---------
         rmsd : float
             Root Mean Square Deviation between df1 and df2
 
         """
-        if df1.shape[0] != df2.shape[0]:
-            raise AttributeError("DataFrames have unequal lengths")
-        get_dict = PandasMmcif._init_get_dict()
-        if s:
-            if s not in get_dict.keys():
-                raise AttributeError(f"s must be in {get_dict.keys()} or None")
-            df1 = get_dict[s](df1, invert=invert)
-            df2 = get_dict[s](df2, invert=invert)
-
-        total = (
-            (df1["Cartn_x"].values - df2["Cartn_x"].values) ** 2
-            + (df1["Cartn_y"].values - df2["Cartn_y"].values) ** 2
-            + (df1["Cartn_z"].values - df2["Cartn_z"].values) ** 2
+        select = selector(PandasMmcif._init_get_dict(), s, invert)
+        rmsd = dataframe_rmsd(
+            df1, df2, ["Cartn_x", "Cartn_y", "Cartn_z"], select, weights,
+            superpose
         )
-        return round((total.sum() / df1.shape[0]) ** 0.5, 4)
+        return round(rmsd, decimals)
 
-    def distance(self, xyz=(0.00, 0.00, 0.00), records=("ATOM", "HETATM")):
-        """Computes Euclidean distance between atoms and a 3D point.
+    def distance(
+        self,
+        xyz=(0.00, 0.00, 0.00),
+        records=("ATOM", "HETATM"),
+        reduce=None,
+        cutoff=None,
+    ):
+        """Computes Euclidean distance between atoms and a 3D point or
+        several points.
 
         Parameters
         ----------
-        xyz : tuple, default: (0.00, 0.00, 0.00)
+        xyz : tuple or array-like, default: (0.00, 0.00, 0.00)
             X, Y, and Z coordinate of the reference center for the distance
-            computation.
+            computation, or an array of shape (n_points, 3) of several
+            reference points.
         records : iterable, default: ('ATOM', 'HETATM')
             Specify which record sections to consider. For example, to consider
             both protein and ligand atoms, set `records=('ATOM', 'HETATM')`.
             This setting is ignored if `df` is not set to None.
             For downward compatibility, a string argument is still supported
             but deprecated and will be removed in future versions.
+        reduce : {None, 'min', 'argmin', 'count'}, default: None
+            See `PandasPdb.distance`.
+        cutoff : float or None, default: None
+            Distance cutoff in Angstrom; required for `reduce='count'`.
 
         Returns
         ---------
         pandas.Series : Pandas Series object containing the Euclidean
             distance between the atoms in the record section and `xyz`.
+            For several reference points, a DataFrame with one column per
+            point, or a Series of the reduced values if `reduce` is set.
 
         """
 
@@ -521,19 +967,71 @@ class PandasMmcif:
             )
             records = (records,)
 
-        df = pd.concat(objs=[self.df[i] for i in records])
+        table = atom_table(self, records,
+                           ("Cartn_x", "Cartn_y", "Cartn_z"))
+        return table.distance(xyz, reduce, cutoff)
 
-        return np.sqrt(
-            np.sum(
-                df[["Cartn_x", "Cartn_y", "Cartn_z"]].subtract(xyz, axis=1)
-                ** 2,
-                axis=1,
-            )
+    @staticmethod
+    def superpose(df_mobile, df_ref, s=None, invert=False, weights=None):
+        """Superpose atoms onto reference atoms with minimal RMSD, using
+        the Kabsch algorithm; see `PandasPdb.superpose`.
+
+        Returns
+        ---------
+        rotation, translation, df : The rotation matrix, the translation
+            vector and a copy of df_mobile with transformed coordinates.
+
+        """
+        select = selector(PandasMmcif._init_get_dict(), s, invert)
+        return superpose_dataframe(
+            df_mobile, df_ref, ["Cartn_x", "Cartn_y", "Cartn_z"], select,
+            weights
         )
 
+    def rmsd_matrix(
+        self,
+        s=None,
+        invert=False,
+        records=("ATOM", "HETATM"),
+        superpose=False,
+        weights=None,
+        chunk_size=256,
+        workers=1,
+    ):
+        """Compute the RMSD between all pairs of models, e.g. of an NMR
+        ensemble; see `PandasPdb.rmsd_matrix`. A weights column is, e.g.,
+        'B_iso_or_equiv'."""
+        return model_rmsd_matrix(
+            self, s, invert, records, superpose, weights, chunk_size, workers
+        )
+
+    @staticmethod
+    def matched_rmsd(
+        df1,
+        df2,
+        keys=("auth_asym_id", "auth_seq_id", "pdbx_PDB_ins_code",
+              "auth_atom_id", "label_alt_id"),
+        s=None,
+        invert=False,
+        decimals=4,
+        superpose=False,
+        weights=None,
+    ):
+        """Compute the Root Mean Square Deviation between the atoms of two
+        molecules that are matched by the `keys` columns instead of by row
+        order; see `PandasPdb.matched_rmsd`. By default, atoms are matched
+        by their `auth_*` identifiers and `label_alt_id`."""
+        select = selector(PandasMmcif._init_get_dict(), s, invert)
+        rmsd, unmatched = matched_rmsd(
+            df1, df2, ["Cartn_x", "Cartn_y", "Cartn_z"], keys, select,
+            weights, superpose
+        )
+        return round(rmsd, decimals), unmatched
+
     @staticmethod
-    def distance_df(df, xyz=(0.00, 0.00, 0.00)):
-        """Computes Euclidean distance between atoms and a 3D point.
+    def distance_df(df, xyz=(0.00, 0.00, 0.00), reduce=None, cutoff=None):
+        """Computes Euclidean distance between atoms and a 3D point or
+        several points.
 
         Parameters
         ----------
@@ -541,22 +1039,56 @@ class PandasMmcif:
             DataFrame containing entries in the `PandasPdb.df['ATOM']`
             or `PandasPdb.df['HETATM']` format for the
             the distance computation to the `xyz` reference coordinates.
-        xyz : tuple, default: (0.00, 0.00, 0.00)
+        xyz : tuple or array-like, default: (0.00, 0.00, 0.00)
             X, Y, and Z coordinate of the reference center for the distance
-            computation.
+            computation, or an array of shape (n_points, 3) of several
+            reference points.
+        reduce : {None, 'min', 'argmin', 'count'}, default: None
+            See `PandasPdb.distance`.
+        cutoff : float or None, default: None
+            Distance cutoff in Angstrom; required for `reduce='count'`.
 
         Returns
         ---------
         pandas.Series : Pandas Series object containing the Euclidean
             distance between the atoms in the record section and `xyz`.
+            For several reference points, a DataFrame with one column per
+            point, or a Series of the reduced values if `reduce` is set.
 
         """
-        return np.sqrt(
-            np.sum(
-                df[["Cartn_x", "Cartn_y", "Cartn_z"]].subtract(xyz, axis=1)
-                ** 2,
-                axis=1,
-            )
+        table = AtomTable([df], ("Cartn_x", "Cartn_y", "Cartn_z"))
+        return table.distance(xyz, reduce, cutoff)
+
+    def build_spatial_index(self, records=("ATOM", "HETATM"), cell_size=4.0):
+        """Returns a cached spatial index of the atoms of the `records`;
+        see `PandasPdb.build_spatial_index`."""
+        table = atom_table(self, records, ("Cartn_x", "Cartn_y", "Cartn_z"))
+        return table.spatial_index(cell_size)
+
+    def contact_map(
+        self,
+        level="residue",
+        cutoff=None,
+        reduce="min",
+        records=("ATOM",),
+        max_memory=2**28,
+        sparse=False,
+    ):
+        """Computes the distance matrix or contact map of the residues or
+        atoms; see `PandasPdb.contact_map`. Residues are identified by the
+        chain, residue number (the `auth_*` or `label_*` columns, depending
+        on `use_auth`) and `pdbx_PDB_ins_code`."""
+        table = atom_table(self, records, ("Cartn_x", "Cartn_y", "Cartn_z"))
+        fields = mmcif_fields(self.auth)
+        return contact_map(
+            table,
+            [fields["chain"], fields["resi"], "pdbx_PDB_ins_code"],
+            fields["name"],
+            level=level,
+            cutoff=cutoff,
+            reduce=reduce,
+            max_memory=max_memory,
+            sparse=sparse,
         )
 
     @staticmethod
@@ -570,7 +1102,7 @@ class PandasMmcif:
             "heavy": PandasMmcif._get_heavy,
         }
 
-    def read_mmcif_from_list(self, mmcif_lines):
+    def read_mmcif_from_list(self, mmcif_lines, parser="fast"):
         """Reads mmCIF file from a list into DataFrames
 
         Attributes
@@ -578,13 +1110,16 @@ class PandasMmcif:
         pdb_lines : list
             A list of lines containing the mmCIF file contents.
 
+        parser : {'fast', 'python'}, default: 'fast'
+            Tokenizer engine; see `read_mmcif`.
+
         Returns
         ---------
         self
 
         """
         self.pdb_text = "".join(mmcif_lines)
-        self._df = self._construct_df(mmcif_lines)
+        self._df = self._construct_df(mmcif_lines, parser=parser)
         # self.header, self.code = self._parse_header_code()
         self.code = self.data["entry"]["id"][0].lower()
         return self
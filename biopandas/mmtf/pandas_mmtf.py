@@ -3,20 +3,36 @@
 from __future__ import annotations
 
 import os
-import copy
-import gzip
 import warnings
 from typing import Any, Dict, List, Union
-from warnings import warn
 
 import numpy as np
 import pandas as pd
 from looseversion import LooseVersion
 from mmtf import MMTFDecoder, MMTFEncoder, fetch, parse, parse_gzip
 
+from biopandas.atom_table import AtomTable, atom_table
+from biopandas.cache import get_cache
 from biopandas.constants import protein_letters_3to1_extended
-
-from ..pdb.engines import amino3to1dict, pdb_df_columns, pdb_records
+from biopandas.contacts import contact_map
+from biopandas.dtypes import compact_df
+from biopandas.models import (
+    ModelIndex,
+    array_to_models,
+    models_to_array,
+    select_models,
+)
+from biopandas.superpose import (
+    dataframe_rmsd,
+    matched_rmsd,
+    model_rmsd_matrix,
+    selector,
+    superpose_dataframe,
+)
+from biopandas.selection import PDB_FIELDS, SelectionError, selection_mask
+
+from ..pdb.engines import amino3to1dict
+from ..pdb.writer import write_pdb
 
 pd_version = LooseVersion(pd.__version__)
 
@@ -29,6 +45,8 @@ class PandasMmtf(object):
         self.code = ""
         self._get_dict = {}
         self.mmtf_path = ""
+        self._model_cache = {}
+        self._atom_tables = {}
 
     @property
     def df(self):
@@ -45,8 +63,47 @@ class PandasMmtf(object):
         )
         # self._df = value
 
-    def read_mmtf(self, filename: Union[str, os.PathLike]):
+    def read_mmtf(
+        self,
+        filename: Union[str, os.PathLike],
+        compact: bool = False,
+        cache=None,
+    ):
+        """Read MMTF files (unzipped or gzipped) from local drive
+
+        Attributes
+        ----------
+        filename : Union[str, os.PathLike]
+            Path to the MMTF file in .mmtf format or gzipped format (.mmtf.gz).
+
+        compact : bool, default: False
+            If True, converts the ATOM and HETATM DataFrames to compact dtypes
+            to reduce memory usage. See `compact`.
+
+        cache : str, DiskCache or MemoryCache, default: None
+            Cache directory, `biopandas.cache.DiskCache` or
+            `biopandas.cache.MemoryCache` object. If set, the ATOM and HETATM
+            DataFrames are loaded from the cache if the file has been read
+            with the same arguments before, and are stored in the cache
+            otherwise. The decoded MMTF object is not cached, i.e., `mmtf` is
+            not set if the DataFrames are loaded from the cache. A directory
+            or `DiskCache` requires `pyarrow`.
+
+        Returns
+        ---------
+        self
+
+        """
         filename = str(filename)
+        if cache is not None:
+            cache = get_cache(cache)
+            key = cache.key(filename, "mmtf", compact=compact)
+            cached = cache.get(key)
+            if cached is not None:
+                self._df, _ = cached
+                self.mmtf_path = filename
+                return self
+
         if filename.endswith(".gz"):
             self.mmtf = parse_gzip(filename)
         else:
@@ -55,6 +112,31 @@ class PandasMmtf(object):
         df = self._mmtf_to_df(self.mmtf)
         self._df["ATOM"] = df.loc[df.record_name == "ATOM"]
         self._df["HETATM"] = df.loc[df.record_name == "HETATM"]
+        if compact:
+            self.compact()
+        if cache is not None:
+            cache.put(key, dict(self.df), {})
+        return self
+
+    def compact(self, records=("ATOM", "HETATM")):
+        """Convert record DataFrames to compact dtypes in place.
+
+        String columns with few distinct values are converted to pandas
+        categoricals, float columns to float32 and integer columns to int32.
+
+        Parameters
+        ----------
+        records : iterable, default: ('ATOM', 'HETATM')
+            Record sections to convert.
+
+        Returns
+        ---------
+        self
+
+        """
+        for r in records:
+            if r in self.df:
+                self._df[r] = compact_df(self.df[r])
         return self
 
     def fetch_mmtf(self, pdb_code: str):
@@ -64,6 +146,55 @@ class PandasMmtf(object):
     def _mmtf_to_df(mmtf_obj: MMTFDecoder) -> pd.DataFrame:
         return mmtf_to_df(mmtf_obj)
 
+    def get(self, s, df=None, invert=False, records=("ATOM", "HETATM")):
+        """Filter MMTF DataFrames by properties
+
+        Parameters
+        ----------
+        s : str
+            String to specify which entries to return: one of
+            {'main chain', 'hydrogen', 'c-alpha', 'carbon', 'heavy'} or a
+            selection string such as `"chain A and resi 10-50 and name CA"`;
+            see `biopandas.selection` for the syntax.
+
+        df : pandas.DataFrame, default: None
+            Optional DataFrame to perform the filter operation on.
+            If df=None, filters on the `records` DataFrames.
+
+        invert : bool, default: False
+            Inverts the search query. For example if s='hydrogen' and
+            invert=True, all but hydrogen entries are returned.
+
+        records : iterable, default: ('ATOM', 'HETATM')
+            Specify which record sections to consider. This setting is
+            ignored if `df` is not set to None.
+
+        Returns
+        --------
+        df : pandas.DataFrame
+            Returns a DataFrame view on the filtered entries.
+
+        """
+        if not self._get_dict:
+            self._get_dict = self._init_get_dict()
+        if df is None:
+            table = atom_table(
+                self, records, ("x_coord", "y_coord", "z_coord")
+            )
+            df = table.df
+        else:
+            table = AtomTable([df], ("x_coord", "y_coord", "z_coord"))
+        if s in self._get_dict:
+            return self._get_dict[s](df, invert=invert)
+        try:
+            mask = selection_mask(s, table, PDB_FIELDS)
+        except SelectionError as e:
+            raise AttributeError(
+                f"s must be in {self._get_dict.keys()} or a selection "
+                f"string; {e}"
+            ) from e
+        return df[~mask if invert else mask]
+
     def impute_element(self, records=("ATOM", "HETATM"), inplace=False):
         """Impute element_symbol from atom_name section.
 
@@ -96,7 +227,15 @@ class PandasMmtf(object):
         return t
 
     @staticmethod
-    def rmsd(df1, df2, s=None, invert=False):
+    def rmsd(
+        df1,
+        df2,
+        s=None,
+        invert=False,
+        decimals=4,
+        superpose=False,
+        weights=None,
+    ):
         """Compute the Root Mean Square Deviation between molecules.
 
         Parameters
@@ -118,27 +257,82 @@ class PandasMmtf(object):
             `s='hydrogen', invert=True` computes the RMSD based on all
             but hydrogen atoms.
 
+        decimals, superpose, weights
+            See `PandasPdb.rmsd`.
+
         Returns
         ---------
         rmsd : float
             Root Mean Square Deviation between df1 and df2
 
         """
-        if df1.shape[0] != df2.shape[0]:
-            raise AttributeError("DataFrames have unequal lengths")
-        get_dict = PandasMmtf._init_get_dict()
-        if s:
-            if s not in get_dict.keys():
-                raise AttributeError(f"s must be in {get_dict.keys()} or None")
-            df1 = get_dict[s](df1, invert=invert)
-            df2 = get_dict[s](df2, invert=invert)
-
-        total = (
-            (df1["x_coord"].values - df2["x_coord"].values) ** 2
-            + (df1["y_coord"].values - df2["y_coord"].values) ** 2
-            + (df1["z_coord"].values - df2["z_coord"].values) ** 2
+        select = selector(PandasMmtf._init_get_dict(), s, invert)
+        coords = ["x_coord", "y_coord", "z_coord"]
+        rmsd = dataframe_rmsd(df1, df2, coords, select, weights, superpose)
+        return round(rmsd, decimals)
+
+    @staticmethod
+    def superpose(df_mobile, df_ref, s=None, invert=False, weights=None):
+        """Superpose atoms onto reference atoms with minimal RMSD, using
+        the Kabsch algorithm; see `PandasPdb.superpose`.
+
+        Returns
+        ---------
+        rotation, translation, df : The rotation matrix, the translation
+            vector and a copy of df_mobile with transformed coordinates.
+
+        """
+        select = selector(PandasMmtf._init_get_dict(), s, invert)
+        coords = ["x_coord", "y_coord", "z_coord"]
+        return superpose_dataframe(df_mobile, df_ref, coords, select, weights)
+
+    def rmsd_matrix(
+        self,
+        s=None,
+        invert=False,
+        records=("ATOM", "HETATM"),
+        superpose=False,
+        weights=None,
+        chunk_size=256,
+        workers=1,
+    ):
+        """Compute the RMSD between all pairs of models, e.g. of an NMR
+        ensemble; see `PandasPdb.rmsd_matrix`."""
+        return model_rmsd_matrix(
+            self, s, invert, records, superpose, weights, chunk_size, workers
+        )
+
+    @staticmethod
+    def matched_rmsd(
+        df1,
+        df2,
+        keys=(
+            "chain_id",
+            "residue_number",
+            "insertion",
+            "atom_name",
+            "alt_loc",
+        ),
+        s=None,
+        invert=False,
+        decimals=4,
+        superpose=False,
+        weights=None,
+    ):
+        """Compute the Root Mean Square Deviation between the atoms of two
+        molecules that are matched by the `keys` columns instead of by row
+        order; see `PandasPdb.matched_rmsd`."""
+        select = selector(PandasMmtf._init_get_dict(), s, invert)
+        rmsd, unmatched = matched_rmsd(
+            df1,
+            df2,
+            ["x_coord", "y_coord", "z_coord"],
+            keys,
+            select,
+            weights,
+            superpose,
         )
-        return round((total.sum() / df1.shape[0]) ** 0.5, 4)
+        return round(rmsd, decimals), unmatched
 
     @staticmethod
     def _init_get_dict():
@@ -236,7 +430,8 @@ class PandasMmtf(object):
         indices = []
 
         residue_number_insertion = (
-            tmp["residue_number"].astype(str) + tmp["insertion"]
+            tmp["residue_number"].astype(str)
+            + tmp["insertion"].astype(object)
         )
 
         for num, ind in zip(residue_number_insertion, np.arange(tmp.shape[0])):
@@ -245,30 +440,47 @@ class PandasMmtf(object):
             cmp = num
 
         transl = (
-            tmp.iloc[indices][residue_col].map(amino3to1dict).fillna(fillna)
+            tmp.iloc[indices][residue_col]
+            .astype(object)
+            .map(amino3to1dict)
+            .fillna(fillna)
         )
 
         return pd.concat((tmp.iloc[indices]["chain_id"], transl), axis=1)
 
-    def distance(self, xyz=(0.00, 0.00, 0.00), records=("ATOM", "HETATM")):
-        """Computes Euclidean distance between atoms and a 3D point.
+    def distance(
+        self,
+        xyz=(0.00, 0.00, 0.00),
+        records=("ATOM", "HETATM"),
+        reduce=None,
+        cutoff=None,
+    ):
+        """Computes Euclidean distance between atoms and a 3D point or
+        several points.
 
         Parameters
         ----------
-        xyz : tuple, default: (0.00, 0.00, 0.00)
+        xyz : tuple or array-like, default: (0.00, 0.00, 0.00)
             X, Y, and Z coordinate of the reference center for the distance
-            computation.
+            computation, or an array of shape (n_points, 3) of several
+            reference points.
         records : iterable, default: ('ATOM', 'HETATM')
             Specify which record sections to consider. For example, to consider
             both protein and ligand atoms, set `records=('ATOM', 'HETATM')`.
             This setting is ignored if `df` is not set to None.
             For downward compatibility, a string argument is still supported
             but deprecated and will be removed in future versions.
+        reduce : {None, 'min', 'argmin', 'count'}, default: None
+            See `PandasPdb.distance`.
+        cutoff : float or None, default: None
+            Distance cutoff in Angstrom; required for `reduce='count'`.
 
         Returns
         ---------
         pandas.Series : Pandas Series object containing the Euclidean
             distance between the atoms in the record section and `xyz`.
+            For several reference points, a DataFrame with one column per
+            point, or a Series of the reduced values if `reduce` is set.
 
         """
 
@@ -282,19 +494,13 @@ class PandasMmtf(object):
             )
             records = (records,)
 
-        df = pd.concat(objs=[self.df[i] for i in records])
-
-        return np.sqrt(
-            np.sum(
-                df[["x_coord", "y_coord", "z_coord"]].subtract(xyz, axis=1)
-                ** 2,
-                axis=1,
-            )
-        )
+        table = atom_table(self, records, ("x_coord", "y_coord", "z_coord"))
+        return table.distance(xyz, reduce, cutoff)
 
     @staticmethod
-    def distance_df(df, xyz=(0.00, 0.00, 0.00)):
-        """Computes Euclidean distance between atoms and a 3D point.
+    def distance_df(df, xyz=(0.00, 0.00, 0.00), reduce=None, cutoff=None):
+        """Computes Euclidean distance between atoms and a 3D point or
+        several points.
 
         Parameters
         ----------
@@ -302,22 +508,53 @@ class PandasMmtf(object):
             DataFrame containing entries in the `PandasMmtf.df['ATOM']`
             or `PandasMmtf.df['HETATM']` format for the
             the distance computation to the `xyz` reference coordinates.
-        xyz : tuple, default: (0.00, 0.00, 0.00)
+        xyz : tuple or array-like, default: (0.00, 0.00, 0.00)
             X, Y, and Z coordinate of the reference center for the distance
-            computation.
+            computation, or an array of shape (n_points, 3) of several
+            reference points.
+        reduce : {None, 'min', 'argmin', 'count'}, default: None
+            See `PandasPdb.distance`.
+        cutoff : float or None, default: None
+            Distance cutoff in Angstrom; required for `reduce='count'`.
 
         Returns
         ---------
         pandas.Series : Pandas Series object containing the Euclidean
             distance between the atoms in the record section and `xyz`.
+            For several reference points, a DataFrame with one column per
+            point, or a Series of the reduced values if `reduce` is set.
 
         """
-        return np.sqrt(
-            np.sum(
-                df[["x_coord", "y_coord", "z_coord"]].subtract(xyz, axis=1)
-                ** 2,
-                axis=1,
-            )
+        table = AtomTable([df], ("x_coord", "y_coord", "z_coord"))
+        return table.distance(xyz, reduce, cutoff)
+
+    def build_spatial_index(self, records=("ATOM", "HETATM"), cell_size=4.0):
+        """Returns a cached spatial index of the atoms of the `records`;
+        see `PandasPdb.build_spatial_index`."""
+        table = atom_table(self, records, ("x_coord", "y_coord", "z_coord"))
+        return table.spatial_index(cell_size)
+
+    def contact_map(
+        self,
+        level="residue",
+        cutoff=None,
+        reduce="min",
+        records=("ATOM",),
+        max_memory=2**28,
+        sparse=False,
+    ):
+        """Computes the distance matrix or contact map of the residues or
+        atoms; see `PandasPdb.contact_map`."""
+        table = atom_table(self, records, ("x_coord", "y_coord", "z_coord"))
+        return contact_map(
+            table,
+            ["chain_id", "residue_number", "insertion"],
+            "atom_name",
+            level=level,
+            cutoff=cutoff,
+            reduce=reduce,
+            max_memory=max_memory,
+            sparse=sparse,
         )
 
     def to_pdb(self, path, records=None, gz=False, append_newline=True):
@@ -325,8 +562,11 @@ class PandasMmtf(object):
 
         Parameters
         ----------
-        path : str
-            A valid output path for the pdb file
+        path : str, path object or file-like object
+            A valid output path for the pdb file, or a writable text or
+            binary file-like object (e.g., `sys.stdout`, an `io.BytesIO` or
+            a socket file), which is not closed. The lines are formatted
+            and written in chunks.
 
         records : iterable, default: None
             A list of PDB record sections in
@@ -334,75 +574,18 @@ class PandasMmtf(object):
             Writes all lines to PDB if `records=None`.
 
         gz : bool, default: False
-            Writes a gzipped PDB file if True.
+            Writes a gzipped PDB file if True. File-like objects must be
+            binary in this case.
 
         append_newline : bool, default: True
             Appends a new line at the end of the PDB file if True
 
         """
-        if gz:
-            openf = gzip.open
-            w_mode = "wt"
-        else:
-            openf = open
-            w_mode = "w"
         if not records:
             records = self.df.keys()
 
-        dfs = {r: self.df[r].copy() for r in records if not self.df[r].empty}
-
-        for r in dfs:
-            for col in pdb_records[r]:
-                dfs[r][col["id"]] = dfs[r][col["id"]].apply(col["strf"])
-                dfs[r]["OUT"] = pd.Series("", index=dfs[r].index)
-
-            for c in dfs[r].columns:
-                # fix issue where coordinates with four or more digits would
-                # cause issues because the columns become too wide
-                if c in {"x_coord", "y_coord", "z_coord"}:
-                    for idx in range(dfs[r][c].values.shape[0]):
-                        if len(dfs[r][c].values[idx]) > 8:
-                            dfs[r][c].values[idx] = str(
-                                dfs[r][c].values[idx]
-                            ).strip()
-                if c in {"line_idx", "OUT"}:
-                    pass
-                elif r in {"ATOM", "HETATM"} and c not in pdb_df_columns:
-                    warn(
-                        "Column %s is not an expected column and"
-                        " will be skipped." % c
-                    )
-                else:
-                    dfs[r]["OUT"] = dfs[r]["OUT"] + dfs[r][c]
-
-        if pd_version < LooseVersion("0.17.0"):
-            warn(
-                "You are using an old pandas version (< 0.17)"
-                " that relies on the old sorting syntax."
-                " Please consider updating your pandas"
-                " installation to a more recent version.",
-                DeprecationWarning,
-            )
-            dfs.sort(columns="line_idx", inplace=True)
-
-        elif pd_version < LooseVersion("0.23.0"):
-            df = pd.concat(dfs)
-
-        else:
-            df = pd.concat(dfs, sort=False)
-
-        df.sort_values(by="line_idx", inplace=True)
-
-        with openf(path, w_mode) as f:
-
-            s = df["OUT"].tolist()
-            for idx in range(len(s)):
-                if len(s[idx]) < 80:
-                    s[idx] = f"{s[idx]}{' ' * (80 - len(s[idx]))}"
-            to_write = "\n".join(s)
-            f.write(to_write)
-            if append_newline:
-                f.write("\n")
+        dfs = {r: self.df[r] for r in records if not self.df[r].empty}
+        write_pdb(path, dfs, gz=gz, append_newline=append_newline)
 
     def parse_sse(self):
         """Parse secondary structure elements"""
@@ -438,21 +621,7 @@ class PandasMmtf(object):
             structure subsetted to the given model.
         """
 
-        biopandas_structure = copy.deepcopy(self)
-
-        if "ATOM" in biopandas_structure.df.keys():
-            biopandas_structure.df["ATOM"] = biopandas_structure.df["ATOM"].loc[
-                biopandas_structure.df["ATOM"]["model_id"] == model_index
-            ]
-        if "HETATM" in biopandas_structure.df.keys():
-            biopandas_structure.df["HETATM"] = biopandas_structure.df["HETATM"].loc[
-                biopandas_structure.df["HETATM"]["model_id"] == model_index
-            ]
-        if "ANISOU" in biopandas_structure.df.keys():
-            biopandas_structure.df["ANISOU"] = biopandas_structure.df["ANISOU"].loc[
-                biopandas_structure.df["ANISOU"]["model_id"] == model_index
-            ]
-        return biopandas_structure
+        return select_models(self, [model_index], ("ATOM", "HETATM", "ANISOU"))
 
     def get_models(self, model_indices: List[int]) -> PandasMmtf:
         """Returns a new PandasMmtf object with the dataframes subset to the
@@ -469,30 +638,101 @@ class PandasMmtf(object):
             containing the structure subsetted to the given model.
         """
 
-        biopandas_structure = copy.deepcopy(self)
+        return select_models(self, model_indices, ("ATOM", "HETATM", "ANISOU"))
 
-        if "ATOM" in biopandas_structure.df.keys():
-            biopandas_structure.df["ATOM"] = biopandas_structure.df["ATOM"].loc[
-                [
-                    x in model_indices
-                    for x in biopandas_structure.df["ATOM"]["model_id"].tolist()
-                ]
-            ]
-        if "HETATM" in biopandas_structure.df.keys():
-            biopandas_structure.df["HETATM"] = biopandas_structure.df["HETATM"].loc[
-                [
-                    x in model_indices
-                    for x in biopandas_structure.df["HETATM"]["model_id"].tolist()
-                ]
-            ]
-        if "ANISOU" in biopandas_structure.df.keys():
-            biopandas_structure.df["ANISOU"] = biopandas_structure.df["ANISOU"].loc[
-                [
-                    x in model_indices
-                    for x in biopandas_structure.df["ANISOU"]["model_id"].tolist()
-                ]
-            ]
-        return biopandas_structure
+    def _model_index(self, record):
+        """Return the (cached) `biopandas.models.ModelIndex` of the
+        `model_id` column of a record section."""
+        df = self.df[record]
+        cached = self._model_cache.get(record)
+        if cached is None or cached[0] is not df:
+            cached = (df, ModelIndex(df["model_id"]))
+            self._model_cache[record] = cached
+        return cached[1]
+
+    def to_coordinate_array(self, records=("ATOM", "HETATM")):
+        """Return the coordinates of all models as a single array.
+
+        Parameters
+        ----------
+        records : iterable, default: ('ATOM', 'HETATM')
+            Record sections in {'ATOM', 'HETATM'} to include.
+
+        Returns
+        ---------
+        coords : numpy.ndarray, shape (n_models, n_atoms, 3)
+            Coordinates of each model (by `model_id`), allocated once.
+            Within each model, the atoms are in the order of the
+            concatenated `records` DataFrames.
+
+        topology : pandas.DataFrame
+            The `records` rows of the first model (with a new index), which
+            describe the atoms of all models.
+
+        Raises a ValueError if the models do not have the same atoms, i.e.,
+        the same record names, chain IDs, residues, atom names and
+        alternate locations.
+
+        """
+        for r in records:
+            if r not in ("ATOM", "HETATM"):
+                raise ValueError(
+                    f"Unknown record {r!r}; allowed records are "
+                    "['ATOM', 'HETATM']"
+                )
+        return models_to_array(
+            self,
+            records,
+            ("x_coord", "y_coord", "z_coord"),
+            (
+                "record_name",
+                "chain_id",
+                "residue_number",
+                "insertion",
+                "residue_name",
+                "atom_name",
+                "alt_loc",
+            ),
+        )
+
+    @classmethod
+    def from_coordinate_array(cls, coords, topology, model_ids=None):
+        """Construct a multi-model structure from an array of coordinates.
+
+        Parameters
+        ----------
+        coords : array-like, shape (n_models, n_atoms, 3)
+            Coordinates of each model.
+
+        topology : pandas.DataFrame
+            ATOM and/or HETATM rows describing the `n_atoms` atoms of each
+            model, e.g. as returned by `to_coordinate_array`.
+
+        model_ids : array-like or None, default: None
+            Model numbers (`model_id`). Models are numbered 1, 2, ... if
+            None.
+
+        Returns
+        ---------
+        pandas_mmtf.PandasMmtf : A new PandasMmtf object with a copy of
+            the `topology` rows for each model in the ATOM and HETATM
+            DataFrames.
+
+        """
+        df, _ = array_to_models(
+            coords,
+            topology,
+            ("x_coord", "y_coord", "z_coord"),
+            model_column="model_id",
+            serial_column="atom_number",
+            model_ids=model_ids,
+        )
+        new = cls()
+        new._df = {
+            r: df.loc[df["record_name"] == r].reset_index(drop=True)
+            for r in ("ATOM", "HETATM")
+        }
+        return new
 
 
 def fetch_mmtf(pdb_code: str) -> pd.DataFrame:
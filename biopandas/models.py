@@ -0,0 +1,196 @@
+# BioPandas
+# License: BSD 3 clause
+# Project Website: http://rasbt.github.io/biopandas/
+# Code Repository: https://github.com/rasbt/biopandas
+
+"""Selecting and stacking the models of multi-model structures."""
+
+import copy
+
+import numpy as np
+import pandas as pd
+
+from biopandas.lazy import LazyDict
+
+
+class ModelIndex(object):
+    """Sorted index of the model numbers of the rows of a DataFrame.
+
+    The model numbers are sorted once (which is a no-op for the usual case
+    of rows grouped by model), so that the rows of a model are found via
+    `np.searchsorted` in O(log n + model size) time.
+
+    Parameters
+    ----------
+    model_ids : array-like, shape (n_rows,)
+        Model number of each row.
+
+    """
+
+    def __init__(self, model_ids):
+        self.model_ids = np.asarray(model_ids)
+        if np.all(self.model_ids[1:] >= self.model_ids[:-1]):
+            self._order = None
+            self._sorted = self.model_ids
+        else:
+            self._order = np.argsort(self.model_ids, kind="stable")
+            self._sorted = self.model_ids[self._order]
+
+    def rows(self, model_indices):
+        """Return the ascending positions of the rows of the given models."""
+        values = np.unique(np.asarray(model_indices).ravel())
+        start = np.searchsorted(self._sorted, values, side="left")
+        end = np.searchsorted(self._sorted, values, side="right")
+        if self._order is None:
+            # the rows of each model are contiguous
+            return np.concatenate(
+                [np.arange(s, e) for s, e in zip(start, end)] + [[]]
+            ).astype(np.intp)
+        rows = np.concatenate(
+            [self._order[s:e] for s, e in zip(start, end)] + [[]]
+        )
+        return np.sort(rows.astype(np.intp))
+
+    def take(self, df, model_indices, label=None):
+        """Return a copy of the rows of `df` that belong to the given
+        models, optionally adding the model numbers as column `label`."""
+        rows = self.rows(model_indices)
+        subset = df.take(rows)
+        if label is not None and label not in subset.columns:
+            subset[label] = self.model_ids[rows]
+        return subset
+
+
+def select_models(structure, model_indices, records, label=None):
+    """Return a shallow copy of a `PandasPdb`, `PandasMmcif` or `PandasMmtf`
+    object with the `records` DataFrames subset to the given models.
+
+    The rows are selected via `structure._model_index(record)`, and only
+    the selected rows are copied; the other DataFrames are copied (or stay
+    deferred if they have not been constructed yet), and the other
+    attributes are shared with `structure` instead of being deep-copied.
+
+    """
+    new = copy.copy(structure)
+    for name, value in vars(structure).items():
+        if isinstance(value, (dict, LazyDict)):
+            setattr(new, name, value.copy())
+    new._model_cache = {}
+    new._get_dict = {}
+    new._atom_tables = {}
+
+    frames = new._df
+    for r in list(frames):
+        if r in records:
+            frames[r] = structure._model_index(r).take(
+                structure.df[r], model_indices, label=label
+            )
+        elif not isinstance(frames, LazyDict) or frames.is_loaded(r):
+            frames[r] = frames[r].copy()
+    return new
+
+
+def models_to_array(structure, records, coord_columns, key_columns):
+    """Return the coordinates of all models of `structure` as an array of
+    shape (n_models, n_atoms, 3) and the rows of the first model.
+
+    The coordinates are copied into a single array, in the order of the
+    concatenated `records` DataFrames within each model. Raises a
+    ValueError if the models do not have the same atoms, as identified by
+    the `key_columns`.
+
+    """
+    dfs = [structure.df[r] for r in records]
+    model_ids = [structure._model_index(r).model_ids for r in records]
+    if model_ids:
+        model_ids = np.concatenate(model_ids)
+    else:
+        model_ids = np.empty(0, dtype=int)
+    models, counts = np.unique(model_ids, return_counts=True)
+    if len(models) == 0:
+        return np.empty((0, 0, 3)), pd.concat(dfs, ignore_index=True)
+    if (counts != counts[0]).any():
+        raise ValueError(
+            "The models have different numbers of atoms: %s"
+            % dict(zip(models.tolist(), counts.tolist()))
+        )
+    n_models, n_atoms = len(models), int(counts[0])
+
+    # position of each row (in the concatenated DataFrames) in the array
+    order = np.argsort(model_ids, kind="stable")
+    dest = np.empty_like(order)
+    dest[order] = np.arange(len(order))
+
+    coords = np.empty((len(order), 3))
+    bounds = np.cumsum([0] + [len(df) for df in dfs])
+    for df, start, end in zip(dfs, bounds[:-1], bounds[1:]):
+        for j, c in enumerate(coord_columns):
+            coords[dest[start:end], j] = df[c].to_numpy(dtype=float)
+
+    for c in key_columns:
+        if not all(c in df.columns for df in dfs):
+            continue
+        values = np.concatenate(
+            [np.asarray(df[c], dtype=object) for df in dfs]
+        )
+        values = values[order].reshape(n_models, n_atoms)
+        same = (values == values[0]) | (
+            pd.isnull(values) & pd.isnull(values[0])
+        )
+        if not same.all():
+            model = models[np.flatnonzero(~same.all(axis=1))[0]]
+            raise ValueError(
+                "Model %s does not have the same atoms as model %s "
+                "(column %s)" % (model, models[0], c)
+            )
+
+    first = order[:n_atoms]
+    topology = pd.concat(
+        [
+            df.take(first[(first >= start) & (first < end)] - start)
+            for df, start, end in zip(dfs, bounds[:-1], bounds[1:])
+        ],
+        ignore_index=True,
+    )
+    return coords.reshape(n_models, n_atoms, 3), topology
+
+
+def array_to_models(
+    coords,
+    topology,
+    coord_columns,
+    model_column=None,
+    serial_column=None,
+    model_ids=None,
+):
+    """Return a DataFrame with a copy of the `topology` rows for each model
+    in `coords`, shape (n_models, n_atoms, 3), and the model numbers
+    (1, 2, ... if `model_ids` is None). The atom serial numbers in
+    `serial_column` are offset by `n_atoms` per model so that they are
+    unique across all models."""
+    coords = np.asarray(coords, dtype=float)
+    n_atoms = len(topology)
+    if coords.ndim != 3 or coords.shape[1:] != (n_atoms, 3):
+        raise ValueError(
+            "Expected coordinates of shape (n_models, %d, 3); got %s"
+            % (n_atoms, coords.shape)
+        )
+    n_models = coords.shape[0]
+    if model_ids is None:
+        model_ids = np.arange(1, n_models + 1)
+    model_ids = np.asarray(model_ids)
+    if model_ids.shape != (n_models,):
+        raise ValueError(
+            "Expected %d model numbers; got %d" % (n_models, model_ids.size)
+        )
+
+    df = topology.take(np.tile(np.arange(n_atoms), n_models))
+    df = df.reset_index(drop=True)
+    for j, c in enumerate(coord_columns):
+        df[c] = coords[:, :, j].ravel()
+    if model_column is not None:
+        df[model_column] = np.repeat(model_ids, n_atoms)
+    if serial_column is not None and serial_column in df.columns:
+        offsets = np.arange(n_models) * n_atoms
+        df[serial_column] = df[serial_column] + np.repeat(offsets, n_atoms)
+    return df, model_ids
@@ -9,6 +9,10 @@
 import numpy as np
 import pandas as pd
 
+from ..atom_table import AtomTable, atom_table
+from ..cache import get_cache
+from ..dtypes import compact_df
+from ..superpose import dataframe_rmsd, rmsd_matrix, superpose_dataframe
 from .mol2_io import split_multimol2
 
 COLUMN_NAMES = (
@@ -52,6 +56,7 @@ class PandasMol2(object):
         self.header = ""
         self.code = ""
         self.mol2_path = ""
+        self._atom_tables = {}
 
     @property
     def df(self):
@@ -89,7 +94,7 @@ class PandasMol2(object):
 
         self._df = self._construct_df(mol2_lines, col_names, col_types)
 
-    def read_mol2(self, path, columns=None):
+    def read_mol2(self, path, columns=None, compact=False, cache=None):
         """Reads Mol2 files (unzipped or gzipped) from local drive
 
         Note that if your mol2 file contains more than one molecule,
@@ -114,14 +119,63 @@ class PandasMol2(object):
             However, note that not all assert_raise_message methods
             may be supported then.
 
+        compact : bool, default: False
+            If True, converts the DataFrame to compact dtypes to reduce
+            memory usage. See `compact`.
+
+        cache : str, DiskCache or MemoryCache, default: None
+            Cache directory, `biopandas.cache.DiskCache` or
+            `biopandas.cache.MemoryCache` object. If set, the DataFrame is
+            loaded from the cache if the file has been read with the same
+            arguments before, and is stored in the cache otherwise. A
+            directory or `DiskCache` requires `pyarrow`.
+
         Returns
         ---------
         self
 
         """
+        if cache is not None:
+            cache = get_cache(cache)
+            key = cache.key(
+                path,
+                "mol2",
+                columns=None if columns is None else repr(columns),
+                compact=compact,
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                frames, attrs = cached
+                self._df = frames["df"]
+                self.mol2_text, self.code = attrs["mol2_text"], attrs["code"]
+                self.mol2_path = path
+                return self
+
         mol2_code, mol2_lines = next(split_multimol2(str(path)))
         self._load_mol2(mol2_lines, mol2_code, columns)
         self.mol2_path = path
+        if compact:
+            self.compact()
+        if cache is not None:
+            cache.put(
+                key,
+                {"df": self.df},
+                {"mol2_text": self.mol2_text, "code": self.code},
+            )
+        return self
+
+    def compact(self):
+        """Convert the DataFrame to compact dtypes in place.
+
+        String columns with few distinct values are converted to pandas
+        categoricals, float columns to float32 and integer columns to int32.
+
+        Returns
+        ---------
+        self
+
+        """
+        self._df = compact_df(self.df)
         return self
 
     def read_mol2_from_list(self, mol2_lines, mol2_code, columns=None):
@@ -208,7 +262,7 @@ class PandasMol2(object):
         return df
 
     @staticmethod
-    def rmsd(df1, df2, heavy_only=True):
+    def rmsd(df1, df2, heavy_only=True, superpose=False, weights=None):
         """Compute the Root Mean Square Deviation between molecules
 
         Parameters
@@ -221,13 +275,27 @@ class PandasMol2(object):
         heavy_only : bool (default: True)
             Which atoms to compare to compute the RMSD. If `True` (default),
             computes the RMSD between non-hydrogen atoms only.
+        superpose : bool (default: False)
+            If True, computes the RMSD after optimally superposing the
+            compared atoms of df1 onto those of df2 (see `superpose`).
+        weights : str, array-like or None (default: None)
+            Per-atom weights for a weighted RMSD: the name of a column of
+            df1, or one weight per row of df1. Uniform if None.
 
         Returns
         ---------
         rmsd : float
-            Root Mean Square Deviation between df1 and df2
+            Root Mean Square Deviation between df1 and df2. If `superpose`
+            or `weights` is set, the mean is taken over the compared atoms
+            only.
 
         """
+        if superpose or weights is not None:
+            select = PandasMol2._get_heavy if heavy_only else None
+            rmsd = dataframe_rmsd(
+                df1, df2, ["x", "y", "z"], select, weights, superpose
+            )
+            return round(rmsd, 4)
         if df1.shape[0] != df2.shape[0]:
             raise AttributeError("DataFrames have unequal lengths")
 
@@ -245,29 +313,137 @@ class PandasMol2(object):
         rmsd = round((total.sum() / df1.shape[0]) ** 0.5, 4)
         return rmsd
 
-    def distance(self, xyz=(0.00, 0.00, 0.00)):
+    @staticmethod
+    def superpose(df_mobile, df_ref, heavy_only=True, weights=None):
+        """Superpose a molecule onto a reference molecule with minimal
+        RMSD, using the Kabsch algorithm.
+
+        Parameters
+        ----------
+        df_mobile : pandas.DataFrame
+            Atoms to superpose, e.g. `PandasMol2.df` of a conformer.
+        df_ref : pandas.DataFrame
+            Reference atoms. Must have the same number of entries as
+            df_mobile, in the same order.
+        heavy_only : bool (default: True)
+            If `True` (default), fits the non-hydrogen atoms only. All atoms
+            are transformed.
+        weights : str, array-like or None (default: None)
+            Per-atom weights of the fit: the name of a column of df_mobile,
+            or one weight per row of df_mobile. Uniform if None.
+
+        Returns
+        ---------
+        rotation : numpy.ndarray, shape (3, 3)
+            Rotation matrix.
+        translation : numpy.ndarray, shape (3,)
+            Translation vector; `xyz @ rotation.T + translation` superposes
+            coordinates of df_mobile.
+        df : pandas.DataFrame
+            Copy of df_mobile with the coordinates of all atoms
+            transformed.
+
+        """
+        select = PandasMol2._get_heavy if heavy_only else None
+        return superpose_dataframe(
+            df_mobile, df_ref, ["x", "y", "z"], select, weights
+        )
+
+    @staticmethod
+    def rmsd_matrix(
+        dfs,
+        heavy_only=True,
+        superpose=False,
+        weights=None,
+        chunk_size=256,
+        workers=1,
+    ):
+        """Compute the RMSD between all pairs of conformers of a molecule
+
+        Parameters
+        ----------
+        dfs : iterable of pandas.DataFrame
+            Conformers with the same atoms in the same order, e.g. the
+            `PandasMol2.df` of each molecule of a multi-MOL2 file.
+        heavy_only : bool (default: True)
+            If `True` (default), compares the non-hydrogen atoms (of the
+            first conformer) only.
+        superpose : bool (default: False)
+            If True, computes the RMSD of each pair of conformers after
+            optimal superposition.
+        weights : str, array-like or None (default: None)
+            Per-atom weights: the name of a column of the first conformer,
+            or one weight per row. Uniform if None.
+        chunk_size : int (default: 256)
+            Number of conformers per block of the computation.
+        workers : int or None (default: 1)
+            Number of worker processes; see
+            `biopandas.superpose.rmsd_matrix`.
+
+        Returns
+        ---------
+        rmsd : numpy.ndarray, shape (n_conformers, n_conformers)
+            RMSD matrix. Unlike `rmsd`, the mean is taken over the compared
+            atoms only.
+
+        """
+        dfs = list(dfs)
+        if len(dfs) == 0:
+            return np.zeros((0, 0))
+        if any(df.shape[0] != dfs[0].shape[0] for df in dfs):
+            raise AttributeError("DataFrames have unequal lengths")
+        coords = np.stack([df[["x", "y", "z"]].to_numpy(float) for df in dfs])
+        if isinstance(weights, str):
+            weights = dfs[0][weights].to_numpy(dtype=float)
+        elif weights is not None:
+            weights = np.asarray(weights, dtype=float)
+        if heavy_only:
+            rows = np.flatnonzero(dfs[0]["atom_type"].to_numpy() != "H")
+            coords = coords[:, rows]
+            if weights is not None and weights.shape == (len(dfs[0]),):
+                weights = weights[rows]
+        return rmsd_matrix(coords, superpose, weights, chunk_size, workers)
+
+    @staticmethod
+    def _get_heavy(df):
+        """Return the non-hydrogen atoms."""
+        return df[df["atom_type"] != "H"]
+
+    def distance(self, xyz=(0.00, 0.00, 0.00), reduce=None, cutoff=None):
         """Computes Euclidean distance between atoms in
-            self.df and a 3D point.
+            self.df and a 3D point or several points.
 
         Parameters
         ----------
-        xyz : tuple (0.00, 0.00, 0.00)
+        xyz : tuple or array-like, default: (0.00, 0.00, 0.00)
             X, Y, and Z coordinate of the reference center for the distance
-            computation
+            computation, or an array of shape (n_points, 3) of several
+            reference points.
+
+        reduce : {None, 'min', 'argmin', 'count'}, default: None
+            If set, reduces the distances of each atom to the reference
+            points to the distance of the nearest point ('min'), the row
+            number of the nearest point in `xyz` ('argmin') or the number
+            of points within `cutoff` ('count').
+
+        cutoff : float or None, default: None
+            Distance cutoff in Angstrom; required for `reduce='count'`.
 
         Returns
         ---------
         pandas.Series : Pandas Series object containing the Euclidean
             distance between the atoms in the atom section and `xyz`.
+            For several reference points, a DataFrame with one column per
+            point, or a Series of the reduced values if `reduce` is set.
 
         """
-        return np.sqrt(
-            np.sum(self.df[["x", "y", "z"]].subtract(xyz, axis=1) ** 2, axis=1)
-        )
+        table = atom_table(self, None, ("x", "y", "z"))
+        return table.distance(xyz, reduce, cutoff)
 
     @staticmethod
-    def distance_df(df, xyz=(0.00, 0.00, 0.00)):
-        """Computes Euclidean distance between atoms and a 3D point.
+    def distance_df(df, xyz=(0.00, 0.00, 0.00), reduce=None, cutoff=None):
+        """Computes Euclidean distance between atoms and a 3D point or
+        several points.
 
         Parameters
         ----------
@@ -275,17 +451,48 @@ class PandasMol2(object):
             DataFrame containing entries similar to the PandasMol2.df
             format for the
             the distance computation to the `xyz` reference coordinates.
-        xyz : tuple (0.00, 0.00, 0.00)
+        xyz : tuple or array-like, default: (0.00, 0.00, 0.00)
             X, Y, and Z coordinate of the reference center for the distance
-            computation
+            computation, or an array of shape (n_points, 3) of several
+            reference points.
+        reduce : {None, 'min', 'argmin', 'count'}, default: None
+            See `PandasMol2.distance`.
+        cutoff : float or None, default: None
+            Distance cutoff in Angstrom; required for `reduce='count'`.
 
         Returns
         ---------
         pandas.Series : Pandas Series object containing the Euclidean
             distance between the atoms in the atom section and `xyz`.
+            For several reference points, a DataFrame with one column per
+            point, or a Series of the reduced values if `reduce` is set.
 
         """
 
-        return np.sqrt(
-            np.sum(df[["x", "y", "z"]].subtract(xyz, axis=1) ** 2, axis=1)
-        )
+        table = AtomTable([df], ("x", "y", "z"))
+        return table.distance(xyz, reduce, cutoff)
+
+    def build_spatial_index(self, cell_size=4.0):
+        """Returns a spatial index of the atom coordinates for radius,
+        k-nearest-neighbor and pair queries.
+
+        Parameters
+        ----------
+        cell_size : float, default: 4.0
+            Edge length of the grid cells of the index in Angstrom.
+
+        Returns
+        ---------
+        SpatialIndex : Index whose query results are the row numbers of
+            the atoms in `self.df`. The index is cached until the
+            DataFrame is changed.
+
+        Examples
+        ---------
+        >>> index = pmol.build_spatial_index()
+        >>> rows = index.query_radius([10.0, 5.0, -3.0], r=4.5)
+        >>> pairs = index.query_pairs(r=2.0)
+
+        """
+        table = atom_table(self, None, ("x", "y", "z"))
+        return table.spatial_index(cell_size)
@@ -8,26 +8,51 @@
 from __future__ import annotations
 
 import gzip
+import mmap
+import os
 import sys
 import textwrap
 import warnings
-from copy import deepcopy
+from contextlib import contextmanager
 from io import StringIO
 from typing import List, Optional
 from urllib.error import HTTPError, URLError
 from urllib.request import urlopen
-from warnings import warn
 
 import numpy as np
 import pandas as pd
 from looseversion import LooseVersion
 
+from biopandas.atom_table import AtomTable, atom_table
+from biopandas.cache import get_cache, restore_frames, sorted_names
+from biopandas.contacts import contact_map
 from biopandas.constants import ATOMIC_MASSES
-
-from .engines import amino3to1dict, pdb_df_columns, pdb_records
+from biopandas.dtypes import compact_df
+from biopandas.lazy import LazyDict
+from biopandas.models import ModelIndex, array_to_models, models_to_array, select_models
+from biopandas.superpose import (
+    dataframe_rmsd,
+    matched_rmsd,
+    model_rmsd_matrix,
+    selector,
+    superpose_dataframe,
+)
+from biopandas.selection import PDB_FIELDS, SelectionError, selection_mask
+
+from .engines import amino3to1dict, pdb_records
+from .writer import write_pdb, write_trajectory
 
 pd_version = LooseVersion(pd.__version__)
 
+# bytes for which the byte-level parser defers to the text-based parser:
+# non-ASCII characters and line breaks other than "\n" recognized by
+# `str.splitlines`
+_fallback_bytes = np.zeros(256, dtype=bool)
+_fallback_bytes[[11, 12, 13, 28, 29, 30, 31]] = True
+_fallback_bytes[128:] = True
+_blank_bytes = np.zeros(256, dtype=bool)
+_blank_bytes[[9, 10, 32]] = True
+
 
 class PandasPdb(object):
     """
@@ -64,10 +89,17 @@ class PandasPdb(object):
         self.code = ""
         self._get_dict = {}
         self.pdb_path = ""
+        self._model_cache = {}
+        self._atom_tables = {}
 
     @property
     def df(self):
-        """Access dictionary of pandas DataFrames for PDB record sections."""
+        """Access dictionary of pandas DataFrames for PDB record sections.
+
+        After reading a file, the record sections are constructed the first
+        time they are accessed (see `biopandas.lazy.LazyDict`).
+
+        """
         return self._df
 
     @df.setter
@@ -80,7 +112,16 @@ class PandasPdb(object):
         )
         # self._df = value
 
-    def read_pdb(self, path):
+    def read_pdb(
+        self,
+        path,
+        columns=None,
+        records=None,
+        memory_map=False,
+        keep_text=True,
+        compact=False,
+        cache=None,
+    ):
         """Read PDB files (unzipped or gzipped) from local drive
 
         Attributes
@@ -88,17 +129,95 @@ class PandasPdb(object):
         path : str
             Path to the PDB file in .pdb format or gzipped format (.pdb.gz).
 
+        columns : iterable, default: None
+            Names of the ATOM, HETATM and ANISOU columns to parse, for example
+            `("atom_name", "x_coord", "y_coord", "z_coord")`. The `line_idx`
+            column is always included. Parses all columns if None.
+
+        records : iterable, default: None
+            Record sections to parse, any of
+            {'ATOM', 'HETATM', 'ANISOU', 'OTHERS'}. Lines belonging to other
+            sections are skipped. Note that `header` and `code` are extracted
+            from 'OTHERS'. Parses all sections if None.
+
+        memory_map : bool, default: False
+            If True, memory-maps uncompressed files (gzipped files are
+            decompressed into memory) and parses the records directly from
+            the bytes buffer without decoding the file and splitting it into
+            a list of lines.
+
+        keep_text : bool, default: True
+            Stores the file contents in `pdb_text` if True. Set to False to
+            avoid keeping a copy of the raw text in memory.
+
+        compact : bool, default: False
+            If True, the string columns of the ATOM, HETATM and ANISOU
+            sections are stored as pandas categoricals and the numeric columns
+            as float32/int32 to reduce memory usage. See also `compact`.
+
+        cache : str, DiskCache or MemoryCache, default: None
+            Cache directory, `biopandas.cache.DiskCache` or
+            `biopandas.cache.MemoryCache` object. If set, the parsed record
+            sections are loaded from the cache if the file has been read with
+            the same arguments before, and are stored in the cache otherwise.
+            A directory or `DiskCache` requires `pyarrow`.
+
         Returns
         ---------
         self
 
         """
-        self.pdb_path, self.pdb_text = self._read_pdb(path=str(path))
-        self._df = self._construct_df(pdb_lines=self.pdb_text.splitlines(True))
+        path = str(path)
+        if cache is not None:
+            cache = get_cache(cache)
+            key = cache.key(
+                path,
+                "pdb",
+                columns=sorted_names(columns),
+                records=sorted_names(records),
+                keep_text=keep_text,
+                compact=compact,
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                frames, attrs = cached
+                self._df = restore_frames(
+                    cache,
+                    key,
+                    frames,
+                    attrs["sections"],
+                    lambda: PandasPdb()
+                    .read_pdb(path, columns=columns, records=records, compact=compact)
+                    .df,
+                )
+                self.pdb_path, self.pdb_text = path, attrs["pdb_text"]
+                self.header, self.code = attrs["header"], attrs["code"]
+                return self
+
+        if memory_map:
+            self.pdb_path = path
+            with self._read_pdb_buffer(path) as buffer:
+                self._df = self._construct_df_from_buffer(
+                    buffer, columns=columns, records=records, compact=compact
+                )
+                self.pdb_text = self._decode_text(bytes(buffer)) if keep_text else ""
+        else:
+            self.pdb_path, self.pdb_text = self._read_pdb(path=path)
+            self._df = self._construct_df(
+                pdb_lines=self.pdb_text.splitlines(True),
+                columns=columns,
+                records=records,
+                compact=compact,
+            )
+            if not keep_text:
+                self.pdb_text = ""
         self.header, self.code = self._parse_header_code()
+        if cache is not None:
+            # sections that have not been constructed yet are stored later
+            cache.put(key, self.df, self._cache_attrs())
         return self
 
-    def read_pdb_from_list(self, pdb_lines):
+    def read_pdb_from_list(self, pdb_lines, columns=None, records=None, compact=False):
         """Reads PDB file from a list into DataFrames
 
         Attributes
@@ -106,21 +225,162 @@ class PandasPdb(object):
         pdb_lines : list
             A list of lines containing the pdb file contents.
 
+        columns : iterable, default: None
+            Names of the ATOM, HETATM and ANISOU columns to parse.
+            See `read_pdb` for details.
+
+        records : iterable, default: None
+            Record sections to parse. See `read_pdb` for details.
+
+        compact : bool, default: False
+            Use compact dtypes. See `read_pdb` for details.
+
         Returns
         ---------
         self
 
         """
         self.pdb_text = "".join(pdb_lines)
-        self._df = self._construct_df(pdb_lines)
+        self._df = self._construct_df(
+            pdb_lines, columns=columns, records=records, compact=compact
+        )
         self.header, self.code = self._parse_header_code()
         return self
 
+    def compact(self, records=("ATOM", "HETATM", "ANISOU")):
+        """Convert record DataFrames to compact dtypes in place.
+
+        String columns are converted to pandas categoricals, float columns
+        to float32 and integer columns to int32. Methods such as `get`,
+        `distance`, `rmsd` and `to_pdb` work on compact DataFrames as well.
+
+        Parameters
+        ----------
+        records : iterable, default: ('ATOM', 'HETATM', 'ANISOU')
+            Record sections to convert.
+
+        Returns
+        ---------
+        self
+
+        """
+        for r in records:
+            if r in self.df:
+                self._df[r] = compact_df(
+                    self.df[r],
+                    categorical_columns=[
+                        c["id"] for c in pdb_records[r] if c["type"] is str
+                    ],
+                )
+        return self
+
+    @classmethod
+    def iter_models(cls, path, columns=None, records=None):
+        """Iterate over the models of a (multi-model) PDB file one at a time.
+
+        The file is read line by line, and only the lines of the current
+        model are kept in memory. Lines before the first MODEL record are
+        used to extract `header` and `code`; lines after the last ENDMDL
+        record are skipped. A file without MODEL records is returned as a
+        single model with index 1.
+
+        Parameters
+        ----------
+        path : str
+            Path to the PDB file in .pdb format or gzipped format (.pdb.gz).
+
+        columns : iterable, default: None
+            Names of the ATOM, HETATM and ANISOU columns to parse.
+            See `read_pdb` for details.
+
+        records : iterable, default: None
+            Record sections to parse. See `read_pdb` for details.
+
+        Returns
+        ---------
+        generator : Yields `(model_index, pandas_pdb.PandasPdb)` tuples. The
+            `line_idx` columns refer to line numbers in the whole file, and
+            a `model_id` column is added to the coordinate sections as in
+            `get_model`.
+
+        """
+        path = str(path)
+        header, code = "", ""
+        lines, start, model_index, n_models = [], 0, None, 0
+        with cls._open_pdb(path) as f:
+            for line_num, line in enumerate(f):
+                if line.startswith("MODEL"):
+                    if model_index is not None:
+                        # MODEL without a preceding ENDMDL
+                        yield cls._model_from_lines(
+                            path,
+                            lines,
+                            start,
+                            model_index,
+                            header,
+                            code,
+                            columns,
+                            records,
+                        )
+                    elif n_models == 0 and lines:
+                        preamble = cls()
+                        preamble._df = cls._construct_df(lines, records=("OTHERS",))
+                        header, code = preamble._parse_header_code()
+                    n_models += 1
+                    try:
+                        model_index = int(line[6:].strip())
+                    except ValueError:
+                        model_index = n_models
+                    lines, start = [line], line_num
+                elif model_index is not None:
+                    lines.append(line)
+                    if line.startswith("ENDMDL"):
+                        yield cls._model_from_lines(
+                            path,
+                            lines,
+                            start,
+                            model_index,
+                            header,
+                            code,
+                            columns,
+                            records,
+                        )
+                        lines, model_index = [], None
+                elif n_models == 0:
+                    lines.append(line)
+
+        if model_index is not None:
+            # last model is not terminated by ENDMDL
+            yield cls._model_from_lines(
+                path, lines, start, model_index, header, code, columns, records
+            )
+        elif n_models == 0:
+            yield cls._model_from_lines(path, lines, 0, 1, None, None, columns, records)
+
+    @classmethod
+    def _model_from_lines(
+        cls, path, lines, start, model_index, header, code, columns, records
+    ):
+        """Construct a PandasPdb object from the lines of a single model."""
+        ppdb = cls()
+        ppdb.pdb_path = path
+        ppdb.pdb_text = "".join(lines)
+        ppdb._df = cls._construct_df(lines, columns=columns, records=records)
+        for r, df in ppdb.df.items():
+            df["line_idx"] += start
+            if r != "OTHERS":
+                df["model_id"] = model_index
+        if header is None:
+            header, code = ppdb._parse_header_code()
+        ppdb.header, ppdb.code = header, code
+        return model_index, ppdb
+
     def fetch_pdb(
         self,
         pdb_code: Optional[str] = None,
         uniprot_id: Optional[str] = None,
         source: str = "pdb",
+        cache=None,
     ):
         """Fetches PDB file contents from the Protein Databank at rcsb.org or AlphaFold database
                 at https://alphafold.ebi.ac.uk/.
@@ -141,6 +401,10 @@ class PandasPdb(object):
                     (`"pdb"`, `"alphafold2-v3"`, `"alphafold2-v4"`(latest)).
                     Defaults to `"pdb"`.
 
+                cache : str, biopandas.cache.DiskCache or biopandas.cache.MemoryCache
+                    Cache to look up the structure by its PDB code or UniProt ID
+                    before downloading it. Defaults to `None` (no caching).
+
                 Returns
                 ---------
                 self
@@ -167,6 +431,24 @@ class PandasPdb(object):
                 f"Please use a 'uniprot_id' instead of 'pdb_code' for source={source}."
             )
 
+        if cache is not None:
+            cache = get_cache(cache)
+            identifier = pdb_code.lower() if pdb_code is not None else uniprot_id
+            key = cache.key_for_id(identifier, "pdb", source=source)
+            cached = cache.get(key)
+            if cached is not None:
+                frames, attrs = cached
+                self.pdb_path, self.pdb_text = attrs["pdb_path"], attrs["pdb_text"]
+                self._df = restore_frames(
+                    cache,
+                    key,
+                    frames,
+                    attrs["sections"],
+                    lambda: self._construct_df(self.pdb_text.splitlines(True)),
+                )
+                self.header, self.code = attrs["header"], attrs["code"]
+                return self
+
         if source == "alphafold2-v3":
             af2_version = 3
             self.pdb_path, self.pdb_text = self._fetch_af2(uniprot_id, af2_version)
@@ -182,19 +464,39 @@ class PandasPdb(object):
             )
 
         self._df = self._construct_df(pdb_lines=self.pdb_text.splitlines(True))
+        self.header, self.code = self._parse_header_code()
+        if cache is not None:
+            cache.put(key, self.df, dict(self._cache_attrs(), pdb_path=self.pdb_path))
         return self
 
+    def _cache_attrs(self):
+        """Return the attributes that are stored in a cache entry along with
+        the record sections."""
+        return {
+            "pdb_text": self.pdb_text,
+            "header": self.header,
+            "code": self.code,
+            "sections": list(self.df),
+        }
+
     def get(self, s, df=None, invert=False, records=("ATOM", "HETATM")):
         """Filter PDB DataFrames by properties
 
         Parameters
         ----------
-        s : str  in {'main chain', 'hydrogen', 'c-alpha', 'heavy'}
-            String to specify which entries to return.
+        s : str
+            String to specify which entries to return: one of
+            {'main chain', 'hydrogen', 'c-alpha', 'carbon', 'heavy'} or a
+            selection string such as `"chain A and resi 10-50 and name CA"`,
+            `"resn HOH and within 3.5 of resn LIG"` or `"b > 30 or not q 1"`;
+            see `biopandas.selection` for the syntax.
 
         df : pandas.DataFrame, default: None
             Optional DataFrame to perform the filter operation on.
-            If df=None, filters on self.df['ATOM'].
+            If df=None, filters on the `records` DataFrames. Their
+            coordinates are cached (see `biopandas.atom_table.AtomTable`)
+            and shared with `distance` and `gyradius` until the DataFrames
+            are replaced or changed.
 
         invert : bool, default: True
             Inverts the search query. For example if s='hydrogen' and
@@ -225,11 +527,20 @@ class PandasPdb(object):
 
         if not self._get_dict:
             self._get_dict = self._init_get_dict()
-        if s not in self._get_dict.keys():
-            raise AttributeError(f"s must be in {self._get_dict.keys()}")
-        if not df:
-            df = pd.concat(objs=[self.df[i] for i in records])
-        return self._get_dict[s](df, invert=invert)
+        if df is None:
+            table = atom_table(self, records, ("x_coord", "y_coord", "z_coord"))
+            df = table.df
+        else:
+            table = AtomTable([df], ("x_coord", "y_coord", "z_coord"))
+        if s in self._get_dict:
+            return self._get_dict[s](df, invert=invert)
+        try:
+            mask = selection_mask(s, table, PDB_FIELDS)
+        except SelectionError as e:
+            raise AttributeError(
+                f"s must be in {self._get_dict.keys()} or a selection string; {e}"
+            ) from e
+        return df[~mask if invert else mask]
 
     def impute_element(self, records=("ATOM", "HETATM"), inplace=False):
         """Impute element_symbol from atom_name section.
@@ -350,7 +661,7 @@ class PandasPdb(object):
         self.df["OTHERS"] = pd.concat([df_others, df_remark]).sort_index()
 
     @staticmethod
-    def rmsd(df1, df2, s=None, invert=False, decimals=4):
+    def rmsd(df1, df2, s=None, invert=False, decimals=4, superpose=False, weights=None):
         """Compute the Root Mean Square Deviation between molecules.
 
         Parameters
@@ -375,27 +686,212 @@ class PandasPdb(object):
         decimals : int, default: 4
             Specifies the number of decimal places to round the final value to.
 
+        superpose : bool, default: False
+            If True, computes the RMSD after optimally superposing the
+            selected atoms of df1 onto those of df2 (see `superpose`).
+
+        weights : str, array-like or None, default: None
+            Per-atom weights for a weighted RMSD: the name of a column of
+            df1 (e.g. 'b_factor' for the pLDDT of predicted structures), or
+            one weight per row of df1. Uniform if None.
+
         Returns
         ---------
         rmsd : float
             Root Mean Square Deviation between df1 and df2
 
         """
-        if df1.shape[0] != df2.shape[0]:
-            raise AttributeError("DataFrames have unequal lengths")
-        get_dict = PandasPdb._init_get_dict()
-        if s:
-            if s not in get_dict.keys():
-                raise AttributeError(f"s must be in {get_dict.keys()} or None")
-            df1 = get_dict[s](df1, invert=invert)
-            df2 = get_dict[s](df2, invert=invert)
-
-        total = (
-            (df1["x_coord"].values - df2["x_coord"].values) ** 2
-            + (df1["y_coord"].values - df2["y_coord"].values) ** 2
-            + (df1["z_coord"].values - df2["z_coord"].values) ** 2
+        select = selector(PandasPdb._init_get_dict(), s, invert)
+        rmsd = dataframe_rmsd(
+            df1, df2, ["x_coord", "y_coord", "z_coord"], select, weights, superpose
+        )
+        return round(rmsd, decimals)
+
+    @staticmethod
+    def superpose(df_mobile, df_ref, s=None, invert=False, weights=None):
+        """Superpose atoms onto reference atoms with minimal RMSD, using
+        the Kabsch algorithm.
+
+        Parameters
+        ----------
+        df_mobile : pandas.DataFrame
+            Atoms to superpose, e.g. `PandasPdb.df['ATOM']` of a model.
+
+        df_ref : pandas.DataFrame
+            Reference atoms. Must have the same number of entries as
+            df_mobile, in the same order.
+
+        s : {'main chain', 'hydrogen', 'c-alpha', 'heavy', 'carbon'} or None,
+            default: None
+            String to specify which entries to fit. If None, fits all
+            atoms. All atoms are transformed.
+        invert : bool, default: False
+            Inverts the string query if true.
+
+        weights : str, array-like or None, default: None
+            Per-atom weights of the fit: the name of a column of df_mobile
+            (e.g. 'b_factor' for the pLDDT of predicted structures), or one
+            weight per row of df_mobile. Uniform if None.
+
+        Returns
+        ---------
+        rotation : numpy.ndarray, shape (3, 3)
+            Rotation matrix.
+
+        translation : numpy.ndarray, shape (3,)
+            Translation vector; `xyz @ rotation.T + translation` superposes
+            coordinates of df_mobile.
+
+        df : pandas.DataFrame
+            Copy of df_mobile with the coordinates of all atoms
+            transformed.
+
+        Examples
+        ---------
+        >>> rotation, translation, moved = PandasPdb.superpose(
+        ...     model.df['ATOM'], ppdb.df['ATOM'], s='c-alpha'
+        ... )
+
+        """
+        select = selector(PandasPdb._init_get_dict(), s, invert)
+        return superpose_dataframe(
+            df_mobile, df_ref, ["x_coord", "y_coord", "z_coord"], select, weights
+        )
+
+    def rmsd_matrix(
+        self,
+        s=None,
+        invert=False,
+        records=("ATOM", "HETATM"),
+        superpose=False,
+        weights=None,
+        chunk_size=256,
+        workers=1,
+    ):
+        """Compute the RMSD between all pairs of models, e.g. of an NMR
+        ensemble or a trajectory.
+
+        Parameters
+        ----------
+        s : str or None, default: None
+            Atoms to compare, as for `get`: one of {'main chain',
+            'hydrogen', 'c-alpha', 'carbon', 'heavy'} or a selection string,
+            evaluated on the first model. If None, compares all atoms.
+
+        invert : bool, default: False
+            Inverts the selection if true.
+
+        records : iterable, default: ('ATOM', 'HETATM')
+            Record sections in {'ATOM', 'HETATM'} to consider.
+
+        superpose : bool, default: False
+            If True, computes the RMSD of each pair of models after optimal
+            superposition.
+
+        weights : str, array-like or None, default: None
+            Per-atom weights: the name of a column (e.g. 'b_factor'), whose
+            values are taken from the first model, or one weight per atom of
+            a model. Uniform if None.
+
+        chunk_size : int, default: 256
+            Number of models per block of the computation.
+
+        workers : int or None, default: 1
+            Number of worker processes; see
+            `biopandas.superpose.rmsd_matrix`.
+
+        Returns
+        ---------
+        numpy.ndarray, shape (n_models, n_models) : RMSD matrix, with the
+            models in the order of their model numbers.
+
+        Examples
+        ---------
+        >>> ppdb = PandasPdb().fetch_pdb("1g03")
+        >>> rmsd = ppdb.rmsd_matrix(s="c-alpha", superpose=True)
+
+        """
+        return model_rmsd_matrix(
+            self, s, invert, records, superpose, weights, chunk_size, workers
+        )
+
+    @staticmethod
+    def matched_rmsd(
+        df1,
+        df2,
+        keys=("chain_id", "residue_number", "insertion", "atom_name", "alt_loc"),
+        s=None,
+        invert=False,
+        decimals=4,
+        superpose=False,
+        weights=None,
+    ):
+        """Compute the Root Mean Square Deviation between the atoms of two
+        molecules that are matched by key columns instead of by row order,
+        e.g. between a crystal structure and a model with missing atoms.
+
+        Parameters
+        ----------
+        df1 : pandas.DataFrame
+            DataFrame with HETATM and/or ATOM entries.
+
+        df2 : pandas.DataFrame
+            Second DataFrame for RMSD computation against df1, with the
+            atoms in any order.
+
+        keys : iterable, default: ('chain_id', 'residue_number', 'insertion',
+            'atom_name', 'alt_loc')
+            Columns that identify an atom. Must be unique within each
+            DataFrame.
+
+        s : {'main chain', 'hydrogen', 'c-alpha', 'heavy', 'carbon'} or None,
+            default: None
+            String to specify which entries to consider. If None, considers
+            all atoms for comparison.
+
+        invert : bool, default: False
+            Inverts the string query if true.
+
+        decimals : int, default: 4
+            Specifies the number of decimal places to round the final value to.
+
+        superpose : bool, default: False
+            If True, computes the RMSD after optimally superposing the
+            matched atoms of df1 onto those of df2.
+
+        weights : str, array-like or None, default: None
+            Per-atom weights: the name of a column of df1, or one weight per
+            row of df1. Uniform if None.
+
+        Returns
+        ---------
+        rmsd : float
+            Root Mean Square Deviation between the matched atoms.
+
+        unmatched : pandas.DataFrame
+            The considered rows of df1 without a match in df2 and of df2
+            without a match in df1, with a `missing_from` column that is
+            'df2' or 'df1', respectively.
+
+        Examples
+        ---------
+        >>> r, unmatched = PandasPdb.matched_rmsd(
+        ...     model.df['ATOM'], crystal.df['ATOM'], s='c-alpha'
+        ... )
+        >>> unmatched.groupby('missing_from').size()
+
+        """
+        select = selector(PandasPdb._init_get_dict(), s, invert)
+        rmsd, unmatched = matched_rmsd(
+            df1,
+            df2,
+            ["x_coord", "y_coord", "z_coord"],
+            keys,
+            select,
+            weights,
+            superpose,
         )
-        return round((total.sum() / df1.shape[0]) ** 0.5, decimals)
+        return round(rmsd, decimals), unmatched
 
     @staticmethod
     def _init_get_dict():
@@ -427,11 +923,49 @@ class PandasPdb(object):
             txt = f.read()
 
         if path.endswith(".gz"):
-            txt = (
-                txt.decode("utf-8") if sys.version_info[0] >= 3 else txt.encode("ascii")
-            )
+            txt = PandasPdb._decode_text(txt)
         return path, txt
 
+    @staticmethod
+    def _decode_text(data):
+        """Decode the bytes of a PDB file, translating '\r\n' and '\r'
+        line breaks to '\n' like files opened in text mode."""
+        return data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+    @staticmethod
+    @contextmanager
+    def _read_pdb_buffer(path):
+        """Provide the bytes of a PDB file from local drive, memory-mapping
+        uncompressed files."""
+        if path.endswith((".pdb", ".ent")):
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    # empty files cannot be memory-mapped
+                    yield b""
+                    return
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    yield mm
+        elif path.endswith(("pdb.gz", ".ent.gz")):
+            with gzip.open(path, "rb") as f:
+                yield f.read()
+        else:
+            allowed_formats = ", ".join((".pdb", ".pdb.gz", ".ent", ".ent.gz"))
+            raise ValueError(
+                f"Wrong file format; allowed file formats are {allowed_formats}"
+            )
+
+    @staticmethod
+    def _open_pdb(path):
+        """Open PDB file from local drive for reading line by line."""
+        if path.endswith((".pdb", ".ent")):
+            return open(path, "r")
+        elif path.endswith(("pdb.gz", ".ent.gz")):
+            return gzip.open(path, "rt", encoding="utf-8")
+        allowed_formats = ", ".join((".pdb", ".pdb.gz", ".ent", ".ent.gz"))
+        raise ValueError(
+            f"Wrong file format; allowed file formats are {allowed_formats}"
+        )
+
     @staticmethod
     def _fetch_pdb(pdb_code):
         """Load PDB file from rcsb.org."""
@@ -470,6 +1004,16 @@ class PandasPdb(object):
         """Extract header information and PDB code."""
         code, header = "", ""
         if "OTHERS" in self.df:
+            call = None
+            if isinstance(self.df, LazyDict):
+                call = self.df.pending_call("OTHERS")
+            if call is not None and call[0] is PandasPdb._rows_to_df:
+                # look up the HEADER record without constructing OTHERS
+                rows = call[1][0]
+                entry = next((row[1] for row in rows if row[0] == "HEADER"), None)
+                if entry is not None:
+                    s = entry.split()
+                    return entry, s[-1].lower() if s else ""
 
             header = self.df["OTHERS"][self.df["OTHERS"]["record_name"] == "HEADER"]
             if not header.empty:
@@ -531,48 +1075,256 @@ class PandasPdb(object):
             return df[df["element_symbol"] == "C"]
 
     @staticmethod
-    def _construct_df(pdb_lines):
+    def _construct_df(pdb_lines, columns=None, records=None, compact=False):
         """Construct DataFrames from list of PDB lines."""
-        valids = tuple(pdb_records.keys())
-        line_lists = {r: [] for r in valids}
-        line_lists["OTHERS"] = []
+        fields = PandasPdb._select_fields(columns=columns, records=records)
+        valids = {r for r in pdb_records.keys() if r != "OTHERS"}
+        line_lists = {r: [] for r in fields}
+        line_nums = {r: [] for r in fields}
+        keep_others = "OTHERS" in fields
         for line_num, line in enumerate(pdb_lines):
             if line.strip():
-                if line.startswith(valids):
-                    record = line[:6].rstrip()
-                    line_ele = ["" for _ in range(len(pdb_records[record]) + 1)]
-                    for idx, ele in enumerate(pdb_records[record]):
-                        line_ele[idx] = line[ele["line"][0] : ele["line"][1]].strip()
-                    line_ele[-1] = line_num
-                    line_lists[record].append(line_ele)
-                else:
+                record = line[:6].rstrip()
+                if record in valids:
+                    if record in line_lists:
+                        line_lists[record].append(line)
+                        line_nums[record].append(line_num)
+                # e.g., 'ATOM100000' with an overflowing serial number
+                elif keep_others:
                     line_lists["OTHERS"].append(
                         [line[:6].rstrip(), line[6:-1].rstrip(), line_num]
                     )
 
-        dfs = {}
-        for r in line_lists.items():
-            df = pd.DataFrame(
-                r[1], columns=[c["id"] for c in pdb_records[r[0]]] + ["line_idx"]
+        # sections are only constructed when they are first accessed
+        dfs = LazyDict()
+        for r, lines in line_lists.items():
+            if r == "OTHERS":
+                dfs.set_lazy(r, PandasPdb._rows_to_df, lines, fields[r])
+            else:
+                dfs.set_lazy(
+                    r, PandasPdb._lines_to_df, lines, line_nums[r], fields[r], compact
+                )
+
+        PandasPdb._warn_if_no_atoms({r: len(lines) for r, lines in line_lists.items()})
+        return dfs
+
+    @staticmethod
+    def _warn_if_no_atoms(counts):
+        """Issue a warning if no atoms have been loaded, given the number of
+        lines per record section."""
+        atom_records = [r for r in ("ATOM", "HETATM") if r in counts]
+        if atom_records and sum(counts[r] for r in atom_records) == 0:
+            warnings.warn(
+                "No ATOM/HETATM entries have been loaded. "
+                "Is the input file/text in the pdb format?"
+            )
+
+    @staticmethod
+    def _select_fields(columns=None, records=None):
+        """Return the field specifications of the requested record sections
+        restricted to the requested columns."""
+        if records is None:
+            records = tuple(pdb_records.keys())
+        elif isinstance(records, str):
+            records = (records,)
+        unknown = set(records) - set(pdb_records.keys())
+        if unknown:
+            raise ValueError(
+                f"Unknown record sections {sorted(unknown)}; "
+                f"allowed sections are {list(pdb_records.keys())}"
             )
-            for c in pdb_records[r[0]]:
+        if columns is not None:
+            if isinstance(columns, str):
+                columns = (columns,)
+            known = {f["id"] for r in ("ATOM", "ANISOU") for f in pdb_records[r]}
+            unknown = set(columns) - known - {"line_idx"}
+            if unknown:
+                raise ValueError(
+                    f"Unknown columns {sorted(unknown)}; allowed columns are "
+                    f"{sorted(known)}"
+                )
+
+        fields = {}
+        for r in pdb_records:
+            if r not in records:
+                continue
+            if r == "OTHERS" or columns is None:
+                fields[r] = pdb_records[r]
+            else:
+                fields[r] = [f for f in pdb_records[r] if f["id"] in columns]
+        return fields
+
+    @staticmethod
+    def _lines_to_df(lines, line_idx, fields, compact=False):
+        """Construct a DataFrame from fixed-width coordinate record lines.
+
+        All lines are copied into a single (n_lines, 80) byte buffer so that
+        every column is extracted with one NumPy slice and cast. Lines that
+        cannot be mapped onto byte offsets (non-ASCII content) are parsed
+        line by line via `_rows_to_df` instead.
+
+        """
+        if not lines:
+            return PandasPdb._rows_to_df([], fields, compact=compact)
+        if not fields:
+            return pd.DataFrame(
+                {
+                    "line_idx": np.asarray(
+                        line_idx, dtype=np.int32 if compact else np.int64
+                    )
+                }
+            )
+
+        width = max(f["line"][1] for f in fields)
+        try:
+            buffer = "".join(
+                line.rstrip("\r\n")[:width].ljust(width) for line in lines
+            ).encode("ascii")
+        except UnicodeEncodeError:
+            rows = [
+                [line[f["line"][0] : f["line"][1]].strip() for f in fields] + [num]
+                for line, num in zip(lines, line_idx)
+            ]
+            return PandasPdb._rows_to_df(rows, fields, compact=compact)
+
+        chars = np.frombuffer(buffer, dtype=np.uint8).reshape(len(lines), width)
+        return PandasPdb._chars_to_df(chars, line_idx, fields, compact=compact)
+
+    @staticmethod
+    def _chars_to_df(chars, line_idx, fields, compact=False):
+        """Construct a DataFrame from an (n_lines, width) array of ASCII
+        codes holding space-padded fixed-width record lines.
+
+        If `compact` is True, string columns are constructed as categoricals
+        and numeric columns as float32/int32 (see `biopandas.dtypes`)."""
+        dtypes = {float: np.float32, int: np.int32} if compact else {}
+        data = {}
+        for f in fields:
+            start, stop = f["line"]
+            col = np.ascontiguousarray(chars[:, start:stop])
+            col = col.view(f"S{stop - start}").ravel()
+            if f["type"] is str:
+                # strip and decode each distinct value only once
+                values, inverse = np.unique(col, return_inverse=True)
+                values, codes = np.unique(np.char.strip(values), return_inverse=True)
+                values, codes = values.astype(str), codes[inverse]
+                if compact:
+                    data[f["id"]] = pd.Categorical.from_codes(codes, values)
+                else:
+                    data[f["id"]] = values.astype(object)[codes]
+            else:
                 try:
-                    df[c["id"]] = df[c["id"]].astype(c["type"])
+                    data[f["id"]] = col.astype(dtypes.get(f["type"], f["type"]))
                 except ValueError:
                     # expect ValueError if float/int columns are empty strings
-                    df[c["id"]] = pd.Series(np.nan, index=df.index)
+                    data[f["id"]] = np.full(
+                        chars.shape[0], np.nan, dtype=dtypes.get(float, float)
+                    )
+        data["line_idx"] = np.asarray(line_idx, dtype=dtypes.get(int, np.int64))
+        return pd.DataFrame(data)
 
-            dfs[r[0]] = df
+    @staticmethod
+    def _construct_df_from_buffer(buffer, columns=None, records=None, compact=False):
+        """Construct DataFrames from the raw bytes of a PDB file.
 
-        # issue a warning if no atoms have been loaded
-        if (len(dfs["ATOM"]) + len(dfs["HETATM"])) == 0:
-            warnings.warn(
-                "No ATOM/HETATM entries have been loaded. "
-                "Is the input file/text in the pdb format?"
+        Line boundaries and record types are located with NumPy directly on
+        the bytes buffer (e.g., a memory-mapped file), so the file content is
+        neither decoded nor split into a list of lines. Buffers that contain
+        non-ASCII bytes or line breaks other than '\\n' are decoded and passed
+        to `_construct_df` so that line numbering stays identical.
+
+        """
+        chars = np.frombuffer(buffer, dtype=np.uint8)
+        chunks = range(0, len(chars), 1 << 24)
+        if any(_fallback_bytes[chars[i : i + (1 << 24)]].any() for i in chunks):
+            lines = bytes(buffer).decode("utf-8").splitlines(True)
+            return PandasPdb._construct_df(
+                lines, columns=columns, records=records, compact=compact
+            )
+
+        fields = PandasPdb._select_fields(columns=columns, records=records)
+        newlines = np.flatnonzero(chars == 10)
+        starts = np.concatenate(([0], newlines + 1))
+        ends = np.concatenate((newlines, [len(chars)]))
+        if starts[-1] == len(chars):
+            # no empty line after a trailing line break
+            starts, ends = starts[:-1], ends[:-1]
+        line_idx = np.arange(len(starts))
+
+        head = PandasPdb._gather_lines(chars, starts, ends, 6)
+        # skip blank lines; only lines starting with 6 blanks need a full check
+        non_blank = ~_blank_bytes[head].all(axis=1)
+        for i in np.flatnonzero(~non_blank):
+            non_blank[i] = bool(bytes(buffer[starts[i] : ends[i]]).strip())
+        head = head.view("S6").ravel()
+        is_coord = np.zeros(len(starts), dtype=bool)
+        # the record lines are copied out of the buffer, but the sections are
+        # only constructed when they are first accessed
+        dfs, counts = LazyDict(), {}
+        for r in pdb_records:
+            if r == "OTHERS":
+                continue
+            sel = non_blank & (head == r.ljust(6).encode("ascii"))
+            is_coord |= sel
+            if r not in fields:
+                continue
+            counts[r] = int(sel.sum())
+            if not counts[r]:
+                dfs.set_lazy(r, PandasPdb._rows_to_df, [], fields[r], compact)
+                continue
+            width = max([f["line"][1] for f in fields[r]], default=0)
+            rows = PandasPdb._gather_lines(chars, starts[sel], ends[sel], width)
+            dfs.set_lazy(
+                r, PandasPdb._chars_to_df, rows, line_idx[sel], fields[r], compact
             )
 
+        if "OTHERS" in fields:
+            rows = []
+            for i in np.flatnonzero(non_blank & ~is_coord):
+                # mirror `line[6:-1]` on lines that include the line break
+                stop = ends[i] if ends[i] < len(chars) else ends[i] - 1
+                rows.append(
+                    [
+                        bytes(buffer[starts[i] : min(starts[i] + 6, ends[i])])
+                        .decode("ascii")
+                        .rstrip(),
+                        bytes(buffer[starts[i] + 6 : stop]).decode("ascii").rstrip(),
+                        i,
+                    ]
+                )
+            dfs.set_lazy("OTHERS", PandasPdb._rows_to_df, rows, fields["OTHERS"])
+        PandasPdb._warn_if_no_atoms(counts)
         return dfs
 
+    @staticmethod
+    def _gather_lines(chars, starts, ends, width, chunksize=65536):
+        """Copy the first `width` bytes of the given lines into a space-padded
+        (n_lines, width) array, processing `chunksize` lines at a time."""
+        out = np.empty((len(starts), width), dtype=np.uint8)
+        offsets = np.arange(width)
+        for i in range(0, len(starts), chunksize):
+            idx = starts[i : i + chunksize, None] + offsets
+            block = chars[np.minimum(idx, len(chars) - 1)]
+            block[idx >= ends[i : i + chunksize, None]] = 32
+            out[i : i + chunksize] = block
+        return out
+
+    @staticmethod
+    def _rows_to_df(rows, fields, compact=False):
+        """Construct a DataFrame from pre-sliced record rows."""
+        df = pd.DataFrame(rows, columns=[c["id"] for c in fields] + ["line_idx"])
+        for c in fields:
+            try:
+                df[c["id"]] = df[c["id"]].astype(c["type"])
+            except ValueError:
+                # expect ValueError if float/int columns are empty strings
+                df[c["id"]] = pd.Series(np.nan, index=df.index)
+        if compact:
+            df = compact_df(
+                df, categorical_columns=[c["id"] for c in fields if c["type"] is str]
+            )
+        return df
+
     def amino3to1(self, record="ATOM", residue_col="residue_name", fillna="?"):
         """Creates 1-letter amino acid codes from DataFrame
 
@@ -606,36 +1358,61 @@ class PandasPdb(object):
         cmp = "placeholder"
         indices = []
 
-        residue_number_insertion = tmp["residue_number"].astype(str) + tmp["insertion"]
+        residue_number_insertion = tmp["residue_number"].astype(str) + tmp[
+            "insertion"
+        ].astype(object)
 
         for num, ind in zip(residue_number_insertion, np.arange(tmp.shape[0])):
             if num != cmp:
                 indices.append(ind)
             cmp = num
 
-        transl = tmp.iloc[indices][residue_col].map(amino3to1dict).fillna(fillna)
+        transl = (
+            tmp.iloc[indices][residue_col]
+            .astype(object)
+            .map(amino3to1dict)
+            .fillna(fillna)
+        )
 
         return pd.concat((tmp.iloc[indices]["chain_id"], transl), axis=1)
 
-    def distance(self, xyz=(0.00, 0.00, 0.00), records=("ATOM", "HETATM")):
-        """Computes Euclidean distance between atoms and a 3D point.
+    def distance(
+        self,
+        xyz=(0.00, 0.00, 0.00),
+        records=("ATOM", "HETATM"),
+        reduce=None,
+        cutoff=None,
+    ):
+        """Computes Euclidean distance between atoms and a 3D point or
+        several points.
 
         Parameters
         ----------
-        xyz : tuple, default: (0.00, 0.00, 0.00)
+        xyz : tuple or array-like, default: (0.00, 0.00, 0.00)
             X, Y, and Z coordinate of the reference center for the distance
-            computation.
+            computation, or an array of shape (n_points, 3) of several
+            reference points.
         records : iterable, default: ('ATOM', 'HETATM')
             Specify which record sections to consider. For example, to consider
             both protein and ligand atoms, set `records=('ATOM', 'HETATM')`.
             This setting is ignored if `df` is not set to None.
             For downward compatibility, a string argument is still supported
             but deprecated and will be removed in future versions.
+        reduce : {None, 'min', 'argmin', 'count'}, default: None
+            If set, reduces the distances of each atom to the reference
+            points to the distance of the nearest point ('min'), the row
+            number of the nearest point in `xyz` ('argmin') or the number
+            of points within `cutoff` ('count').
+        cutoff : float or None, default: None
+            Distance cutoff in Angstrom; required for `reduce='count'`.
 
         Returns
         ---------
         pandas.Series : Pandas Series object containing the Euclidean
             distance between the atoms in the record section and `xyz`.
+            For several reference points, a DataFrame with one column per
+            point, or a Series of the reduced values if `reduce` is set.
+            The coordinates of the `records` are cached; see `get`.
 
         """
 
@@ -649,17 +1426,13 @@ class PandasPdb(object):
             )
             records = (records,)
 
-        df = pd.concat(objs=[self.df[i] for i in records])
-
-        return np.sqrt(
-            np.sum(
-                df[["x_coord", "y_coord", "z_coord"]].subtract(xyz, axis=1) ** 2, axis=1
-            )
-        )
+        table = atom_table(self, records, ("x_coord", "y_coord", "z_coord"))
+        return table.distance(xyz, reduce, cutoff)
 
     @staticmethod
-    def distance_df(df, xyz=(0.00, 0.00, 0.00)):
-        """Computes Euclidean distance between atoms and a 3D point.
+    def distance_df(df, xyz=(0.00, 0.00, 0.00), reduce=None, cutoff=None):
+        """Computes Euclidean distance between atoms and a 3D point or
+        several points.
 
         Parameters
         ----------
@@ -667,20 +1440,114 @@ class PandasPdb(object):
             DataFrame containing entries in the `PandasPdb.df['ATOM']`
             or `PandasPdb.df['HETATM']` format for the
             the distance computation to the `xyz` reference coordinates.
-        xyz : tuple, default: (0.00, 0.00, 0.00)
+        xyz : tuple or array-like, default: (0.00, 0.00, 0.00)
             X, Y, and Z coordinate of the reference center for the distance
-            computation.
+            computation, or an array of shape (n_points, 3) of several
+            reference points.
+        reduce : {None, 'min', 'argmin', 'count'}, default: None
+            See `distance`.
+        cutoff : float or None, default: None
+            Distance cutoff in Angstrom; required for `reduce='count'`.
 
         Returns
         ---------
         pandas.Series : Pandas Series object containing the Euclidean
             distance between the atoms in the record section and `xyz`.
+            For several reference points, a DataFrame with one column per
+            point, or a Series of the reduced values if `reduce` is set.
 
         """
-        return np.sqrt(
-            np.sum(
-                df[["x_coord", "y_coord", "z_coord"]].subtract(xyz, axis=1) ** 2, axis=1
-            )
+        table = AtomTable([df], ("x_coord", "y_coord", "z_coord"))
+        return table.distance(xyz, reduce, cutoff)
+
+    def build_spatial_index(self, records=("ATOM", "HETATM"), cell_size=4.0):
+        """Returns a spatial index of the atom coordinates for radius,
+        k-nearest-neighbor and pair queries.
+
+        Parameters
+        ----------
+        records : iterable, default: ('ATOM', 'HETATM')
+            Record sections whose atoms are indexed.
+        cell_size : float, default: 4.0
+            Edge length of the grid cells of the index in Angstrom.
+
+        Returns
+        ---------
+        SpatialIndex : Index whose query results are the row numbers of
+            the atoms in `pd.concat([self.df[r] for r in records])`. The
+            index is cached until the DataFrames are changed.
+
+        Examples
+        ---------
+        >>> index = ppdb.build_spatial_index()
+        >>> rows = index.query_radius([10.0, 5.0, -3.0], r=4.5)
+        >>> pairs = index.query_pairs(r=2.0)
+
+        """
+        table = atom_table(self, records, ("x_coord", "y_coord", "z_coord"))
+        return table.spatial_index(cell_size)
+
+    def contact_map(
+        self,
+        level="residue",
+        cutoff=None,
+        reduce="min",
+        records=("ATOM",),
+        max_memory=2**28,
+        sparse=False,
+    ):
+        """Computes the distance matrix or contact map of the residues or
+        atoms.
+
+        Parameters
+        ----------
+        level : {'residue', 'atom'}, default: 'residue'
+            Whether to compute distances between residues, identified by
+            `chain_id`, `residue_number` and `insertion`, or between atoms.
+        cutoff : float or None, default: None
+            If None, returns the distances. Otherwise, returns the contact
+            map of the distances of at most `cutoff` Angstrom, which is
+            computed from the atom pairs within `cutoff` only.
+        reduce : {'min', 'ca', 'centroid'}, default: 'min'
+            Distance between two residues: the minimum distance between
+            their atoms, the distance between their C-alpha atoms (NaN for
+            residues without one) or between the centroids of their atoms.
+            Ignored if `level='atom'`.
+        records : iterable, default: ('ATOM',)
+            Record sections whose atoms are considered. The atoms of all
+            models are considered; use `get_model` to select one.
+        max_memory : int, default: 2**28
+            Maximum size in bytes of the tiles of atom distances computed
+            at a time for the residue distances with `reduce='min'`. The
+            result is not included.
+        sparse : bool, default: False
+            If True, returns the contact map as a `scipy.sparse.csr_matrix`
+            (requires scipy and a `cutoff`).
+
+        Returns
+        ---------
+        pandas.DataFrame : Distance matrix (float) or contact map (bool)
+            whose index and columns are the residue keys (a MultiIndex in
+            order of appearance) or the index of the atoms. If `sparse` is
+            True, a tuple of the sparse matrix and these keys.
+
+        Examples
+        ---------
+        >>> cmap = ppdb.contact_map(cutoff=8.0, reduce="ca")
+        >>> cmap.loc[("A", 10, ""), ("A", 12, "")]
+        True
+
+        """
+        table = atom_table(self, records, ("x_coord", "y_coord", "z_coord"))
+        return contact_map(
+            table,
+            ["chain_id", "residue_number", "insertion"],
+            "atom_name",
+            level=level,
+            cutoff=cutoff,
+            reduce=reduce,
+            max_memory=max_memory,
+            sparse=sparse,
         )
 
     def to_pdb(self, path, records=None, gz=False, append_newline=True):
@@ -688,8 +1555,11 @@ class PandasPdb(object):
 
         Parameters
         ----------
-        path : str
-            A valid output path for the pdb file
+        path : str, path object or file-like object
+            A valid output path for the pdb file, or a writable text or
+            binary file-like object (e.g., `sys.stdout`, an `io.BytesIO` or
+            a socket file), which is not closed. The lines are formatted
+            and written in chunks.
 
         records : iterable, default: None
             A list of PDB record sections in
@@ -697,73 +1567,57 @@ class PandasPdb(object):
             Writes all lines to PDB if `records=None`.
 
         gz : bool, default: False
-            Writes a gzipped PDB file if True.
+            Writes a gzipped PDB file if True. File-like objects must be
+            binary in this case.
 
         append_newline : bool, default: True
             Appends a new line at the end of the PDB file if True
 
         """
-        if gz:
-            openf = gzip.open
-            w_mode = "wt"
-        else:
-            openf = open
-            w_mode = "w"
         if not records:
             records = self.df.keys()
 
-        dfs = {r: self.df[r].copy() for r in records if not self.df[r].empty}
-
-        for r in dfs:
-            for col in pdb_records[r]:
-                dfs[r][col["id"]] = dfs[r][col["id"]].apply(col["strf"])
-                dfs[r]["OUT"] = pd.Series("", index=dfs[r].index)
-
-            for c in dfs[r].columns:
-                # fix issue where coordinates with four or more digits would
-                # cause issues because the columns become too wide
-                if c in {"x_coord", "y_coord", "z_coord"}:
-                    for idx in range(dfs[r][c].values.shape[0]):
-                        if len(dfs[r][c].values[idx]) > 8:
-                            dfs[r][c].values[idx] = str(dfs[r][c].values[idx]).strip()
-                if c in {"line_idx", "OUT"}:
-                    pass
-                elif r in {"ATOM", "HETATM"} and c not in pdb_df_columns:
-                    warn(
-                        "Column %s is not an expected column and"
-                        " will be skipped." % c
-                    )
-                else:
-                    dfs[r]["OUT"] = dfs[r]["OUT"] + dfs[r][c]
-
-        if pd_version < LooseVersion("0.17.0"):
-            warn(
-                "You are using an old pandas version (< 0.17)"
-                " that relies on the old sorting syntax."
-                " Please consider updating your pandas"
-                " installation to a more recent version.",
-                DeprecationWarning,
-            )
-            dfs.sort(columns="line_idx", inplace=True)
+        dfs = {r: self.df[r] for r in records if not self.df[r].empty}
+        write_pdb(path, dfs, gz=gz, append_newline=append_newline)
 
-        elif pd_version < LooseVersion("0.23.0"):
-            df = pd.concat(dfs)
+    def write_trajectory(self, path, coords, records=("ATOM", "HETATM"), gz=False):
+        """Write a trajectory as a multi-model PDB file, using the record
+        DataFrames as topology and `coords` as the coordinates of each frame.
 
-        else:
-            df = pd.concat(dfs, sort=False)
+        The columns other than the coordinates are only formatted once, and
+        each frame is written as a MODEL/ENDMDL block.
+
+        Parameters
+        ----------
+        path : str, path object or file-like object
+            A valid output path for the pdb file, or a writable text or
+            binary file-like object; see `to_pdb`.
 
-        df.sort_values(by="line_idx", inplace=True)
+        coords : array-like, shape (n_frames, n_atoms, 3)
+            Coordinates of each frame. Atom `i` refers to row `i` of the
+            concatenated `records` DataFrames, i.e.,
+            `pd.concat([self.df[r] for r in records])`.
+
+        records : iterable, default: ('ATOM', 'HETATM')
+            Record sections in {'ATOM', 'HETATM'} that define the topology.
+
+        gz : bool, default: False
+            Writes a gzipped PDB file if True.
 
-        with openf(path, w_mode) as f:
+        Examples
+        ---------
+        >>> xyz = ppdb.df["ATOM"][["x_coord", "y_coord", "z_coord"]].to_numpy()
+        >>> frames = xyz + np.random.normal(scale=0.1, size=(10,) + xyz.shape)
+        >>> ppdb.write_trajectory("traj.pdb", frames, records=("ATOM",))
 
-            s = df["OUT"].tolist()
-            for idx in range(len(s)):
-                if len(s[idx]) < 80:
-                    s[idx] = f"{s[idx]}{' ' * (80 - len(s[idx]))}"
-            to_write = "\n".join(s)
-            f.write(to_write)
-            if append_newline:
-                f.write("\n")
+        """
+        for r in records:
+            if r not in ("ATOM", "HETATM"):
+                raise ValueError(
+                    f"Unknown record {r!r}; allowed records are ['ATOM', 'HETATM']"
+                )
+        dfs = {r: self.df[r] for r in records if not self.df[r].empty}
+        write_trajectory(path, dfs, coords, gz=gz)
 
     def parse_sse(self):
         """Parse secondary structure elements"""
@@ -789,7 +1643,13 @@ class PandasPdb(object):
         idxs.loc[:, "end_idx"] = ends.line_idx.values
         # If structure only contains 1 model, create a dummy df mapping all lines to model_idx 1
         if len(idxs) == 0:
-            n_lines = len(self.pdb_text.splitlines())
+            if self.pdb_text:
+                n_lines = len(self.pdb_text.splitlines())
+            else:
+                n_lines = 1 + max(
+                    [self.df[r]["line_idx"].max() for r in self.df if len(self.df[r])],
+                    default=-1,
+                )
             idxs = pd.DataFrame(
                 [
                     {
@@ -806,56 +1666,42 @@ class PandasPdb(object):
     def label_models(self):
         """Adds a column (`"model_id"`) to the underlying
         DataFrames containing the model number."""
-        idxs = self.get_model_start_end()
-        # Label ATOMS
-        if "ATOM" in self.df.keys():
-            pdb_df = self.df["ATOM"]
-            idx_map = np.piecewise(
-                np.zeros(len(pdb_df)),
-                [
-                    (pdb_df.line_idx.values >= start_idx)
-                    & (pdb_df.line_idx.values <= end_idx)
-                    for start_idx, end_idx in zip(
-                        idxs.start_idx.values, idxs.end_idx.values
-                    )
-                ],
-                idxs.model_idx,
-            )
-            self.df["ATOM"]["model_id"] = idx_map.astype(int)
-        # LABEL HETATMS
-        if "HETATM" in self.df.keys():
-            pdb_df = self.df["HETATM"]
-            idx_map = np.piecewise(
-                np.zeros(len(pdb_df)),
-                [
-                    (pdb_df.line_idx.values >= start_idx)
-                    & (pdb_df.line_idx.values <= end_idx)
-                    for start_idx, end_idx in zip(
-                        idxs.start_idx.values, idxs.end_idx.values
-                    )
-                ],
-                idxs.model_idx,
-            )
-            self.df["HETATM"]["model_id"] = idx_map.astype(int)
-        if "ANISOU" in self.df.keys():
-            pdb_df = self.df["ANISOU"]
-            idx_map = np.piecewise(
-                np.zeros(len(pdb_df)),
-                [
-                    (pdb_df.line_idx.values >= start_idx)
-                    & (pdb_df.line_idx.values <= end_idx)
-                    for start_idx, end_idx in zip(
-                        idxs.start_idx.values, idxs.end_idx.values
-                    )
-                ],
-                idxs.model_idx,
-            )
-            self.df["ANISOU"]["model_id"] = idx_map.astype(int)
+        for r in ("ATOM", "HETATM", "ANISOU"):
+            if r in self.df.keys():
+                self.df[r]["model_id"] = self._model_index(r).model_ids
         return self
 
+    def _model_index(self, record):
+        """Return the (cached) `biopandas.models.ModelIndex` of a record
+        section, labeling each line with the model whose MODEL and ENDMDL
+        lines enclose it (0 if there is none)."""
+        df, others = self.df[record], self.df["OTHERS"]
+        cached = self._model_cache.get(record)
+        if cached is not None and cached[0] is df and cached[1] is others:
+            return cached[2]
+
+        idxs = self.get_model_start_end().sort_values(by="start_idx", kind="stable")
+        starts = idxs["start_idx"].to_numpy()
+        ends = idxs["end_idx"].to_numpy()
+        model_idx = idxs["model_idx"].to_numpy().astype(float).astype(int)
+
+        line_idx = df["line_idx"].to_numpy()
+        pos = np.searchsorted(starts, line_idx, side="right") - 1
+        inside = pos >= 0
+        inside[inside] = line_idx[inside] <= ends[pos[inside]]
+        model_ids = np.zeros(len(line_idx), dtype=int)
+        model_ids[inside] = model_idx[pos[inside]]
+
+        index = ModelIndex(model_ids)
+        self._model_cache[record] = (df, others, index)
+        return index
+
     def get_model(self, model_index: int) -> PandasPdb:
         """Returns a new PandasPDB object with the dataframes subset to the given model index.
 
+        Only the rows of the model are copied; the model of each line is
+        looked up in a cached index of the MODEL/ENDMDL line ranges.
+
         Parameters
         ----------
         model_index : int
@@ -866,23 +1712,9 @@ class PandasPdb(object):
         pandas_pdb.PandasPdb : A new PandasPdb object containing the
           structure subsetted to the given model.
         """
-
-        biopandas_structure = deepcopy(self)
-        biopandas_structure.label_models()
-
-        if "ATOM" in biopandas_structure.df.keys():
-            biopandas_structure.df["ATOM"] = biopandas_structure.df["ATOM"].loc[
-                biopandas_structure.df["ATOM"]["model_id"] == model_index
-            ]
-        if "HETATM" in biopandas_structure.df.keys():
-            biopandas_structure.df["HETATM"] = biopandas_structure.df["HETATM"].loc[
-                biopandas_structure.df["HETATM"]["model_id"] == model_index
-            ]
-        if "ANISOU" in biopandas_structure.df.keys():
-            biopandas_structure.df["ANISOU"] = biopandas_structure.df["ANISOU"].loc[
-                biopandas_structure.df["ANISOU"]["model_id"] == model_index
-            ]
-        return biopandas_structure
+        return select_models(
+            self, [model_index], ("ATOM", "HETATM", "ANISOU"), label="model_id"
+        )
 
     def get_models(self, model_indices: List[int]) -> PandasPdb:
         """Returns a new PandasPDB object with the dataframes subset to the given model index.
@@ -897,32 +1729,117 @@ class PandasPdb(object):
         pandas_pdb.PandasPdb : A new PandasPdb object
           containing the structure subsetted to the given model.
         """
+        return select_models(
+            self, model_indices, ("ATOM", "HETATM", "ANISOU"), label="model_id"
+        )
 
-        biopandas_structure = deepcopy(self)
-        biopandas_structure.label_models()
+    def to_coordinate_array(self, records=("ATOM", "HETATM")):
+        """Return the coordinates of all models as a single array.
 
-        if "ATOM" in biopandas_structure.df.keys():
-            biopandas_structure.df["ATOM"] = biopandas_structure.df["ATOM"].loc[
-                [
-                    x in model_indices
-                    for x in biopandas_structure.df["ATOM"]["model_id"].tolist()
-                ]
-            ]
-        if "HETATM" in biopandas_structure.df.keys():
-            biopandas_structure.df["HETATM"] = biopandas_structure.df["HETATM"].loc[
-                [
-                    x in model_indices
-                    for x in biopandas_structure.df["HETATM"]["model_id"].tolist()
-                ]
-            ]
-        if "ANISOU" in biopandas_structure.df.keys():
-            biopandas_structure.df["ANISOU"] = biopandas_structure.df["ANISOU"].loc[
-                [
-                    x in model_indices
-                    for x in biopandas_structure.df["ANISOU"]["model_id"].tolist()
-                ]
-            ]
-        return biopandas_structure
+        Parameters
+        ----------
+        records : iterable, default: ('ATOM', 'HETATM')
+            Record sections in {'ATOM', 'HETATM'} to include.
+
+        Returns
+        ---------
+        coords : numpy.ndarray, shape (n_models, n_atoms, 3)
+            Coordinates of each model, allocated once. Within each model,
+            the atoms are in the order of the concatenated `records`
+            DataFrames.
+
+        topology : pandas.DataFrame
+            The `records` rows of the first model (with a new index), which
+            describe the atoms of all models.
+
+        Raises a ValueError if the models do not have the same atoms, i.e.,
+        the same record names, chain IDs, residues, atom names and
+        alternate locations.
+
+        Examples
+        ---------
+        >>> coords, topology = ppdb.to_coordinate_array()
+        >>> coords -= coords.mean(axis=1, keepdims=True)
+        >>> PandasPdb.from_coordinate_array(coords, topology).to_pdb("out.pdb")
+
+        """
+        for r in records:
+            if r not in ("ATOM", "HETATM"):
+                raise ValueError(
+                    f"Unknown record {r!r}; allowed records are ['ATOM', 'HETATM']"
+                )
+        return models_to_array(
+            self,
+            records,
+            ("x_coord", "y_coord", "z_coord"),
+            (
+                "record_name",
+                "chain_id",
+                "residue_number",
+                "insertion",
+                "residue_name",
+                "atom_name",
+                "alt_loc",
+            ),
+        )
+
+    @classmethod
+    def from_coordinate_array(cls, coords, topology, model_ids=None):
+        """Construct a multi-model structure from an array of coordinates.
+
+        Parameters
+        ----------
+        coords : array-like, shape (n_models, n_atoms, 3)
+            Coordinates of each model.
+
+        topology : pandas.DataFrame
+            ATOM and/or HETATM rows describing the `n_atoms` atoms of each
+            model, e.g. as returned by `to_coordinate_array`.
+
+        model_ids : array-like or None, default: None
+            Model numbers. Models are numbered 1, 2, ... if None.
+
+        Returns
+        ---------
+        pandas_pdb.PandasPdb : A new PandasPdb object with a copy of the
+            `topology` rows for each model in the ATOM and HETATM
+            DataFrames, and MODEL/ENDMDL records in the OTHERS DataFrame if
+            there is more than one model.
+
+        """
+        model_column = "model_id" if "model_id" in topology.columns else None
+        df, model_ids = array_to_models(
+            coords,
+            topology,
+            ("x_coord", "y_coord", "z_coord"),
+            model_column=model_column,
+            model_ids=model_ids,
+        )
+
+        # each model takes a MODEL line, its atoms and an ENDMDL line
+        n_models, n_atoms = len(model_ids), len(topology)
+        multi = n_models > 1
+        stride = n_atoms + 2 if multi else n_atoms
+        starts = np.arange(n_models) * stride
+        df["line_idx"] = (starts[:, None] + np.arange(n_atoms) + multi).ravel()
+        others = []
+        if multi:
+            for start, model_id in zip(starts, model_ids):
+                others.append(["MODEL", "    %4d" % model_id, start])
+                others.append(["ENDMDL", "", start + n_atoms + 1])
+        others.append(["END", "", n_models * stride])
+
+        new = cls()
+        new._df = {
+            r: df.loc[df["record_name"] == r].reset_index(drop=True)
+            for r in ("ATOM", "HETATM")
+        }
+        new._df["ANISOU"] = cls._construct_df([], records=("ANISOU",))["ANISOU"]
+        new._df["OTHERS"] = pd.DataFrame(
+            sorted(others, key=lambda row: row[2]),
+            columns=["record_name", "entry", "line_idx"],
+        )
+        return new
 
     def to_pdb_stream(self, records: tuple[str] = ("ATOM", "HETATM")) -> StringIO:
         """Writes a PDB dataframe to a stream.
@@ -944,34 +1861,8 @@ class PandasPdb(object):
         df["residue_number"] = pd.to_numeric(df.residue_number, errors="coerce")
         records = [r.strip() for r in list(set(df.record_name))]
         dfs = {r: df.loc[df.record_name == r] for r in records}
-
-        for r in dfs:
-            for col in pdb_records[r]:
-                dfs[r][col["id"]] = dfs[r][col["id"]].apply(col["strf"])
-                dfs[r]["OUT"] = pd.Series("", index=dfs[r].index)
-
-            for c in dfs[r].columns:
-                # fix issue where coordinates with four or more digits would
-                # cause issues because the columns become too wide
-                if c in {"x_coord", "y_coord", "z_coord"}:
-                    for idx in range(dfs[r][c].values.shape[0]):
-                        if len(dfs[r][c].values[idx]) > 8:
-                            dfs[r][c].values[idx] = str(dfs[r][c].values[idx]).strip()
-
-                if c not in {"line_idx", "OUT"}:
-                    dfs[r]["OUT"] = dfs[r]["OUT"] + dfs[r][c]
-
-        df = pd.concat(dfs, sort=False)
-        df.sort_values(by="line_idx", inplace=True)
-
         output = StringIO()
-        s = df["OUT"].tolist()
-        for idx in range(len(s)):
-            if len(s[idx]) < 80:
-                s[idx] = f"{s[idx]}{' ' * (80 - len(s[idx]))}"
-        to_write = "\n".join(s)
-        output.write(to_write)
-        output.write("\n")
+        write_pdb(output, dfs, warn_unexpected=False)
         output.seek(0)
         return output
 
@@ -1003,20 +1894,12 @@ class PandasPdb(object):
             )
             records = (records,)
 
-        if len(records) > 1:
-            df = pd.concat(
-                objs=[
-                    self.df[record][["x_coord", "y_coord", "z_coord", "element_symbol"]]
-                    for record in records
-                ]
-            )
-        else:
-            df = self.df[records[0]]
-
-        coords = df[["x_coord", "y_coord", "z_coord"]].to_numpy()
-        masses = (
-            df["element_symbol"].map(lambda atom: ATOMIC_MASSES.get(atom, 0)).to_numpy()
-        )
+        table = atom_table(self, records, ("x_coord", "y_coord", "z_coord"))
+        coords = table.xyz
+        codes, lookup = table.codes("element_symbol")
+        # missing element symbols (code -1) have mass 0
+        masses = np.array([ATOMIC_MASSES.get(e, 0) for e in lookup] + [0], dtype=float)
+        masses = masses[codes]
         total_mass = masses.sum()
         center_of_mass = (masses[:, None] * coords).sum(axis=0) / total_mass
         distances = np.linalg.norm(coords - center_of_mass, axis=1)
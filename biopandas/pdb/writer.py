@@ -0,0 +1,347 @@
+# BioPandas
+# License: BSD 3 clause
+# Project Website: http://rasbt.github.io/biopandas/
+# Code Repository: https://github.com/rasbt/biopandas
+
+"""Column-wise formatting of record DataFrames into PDB lines."""
+
+import gzip
+import io
+from contextlib import contextmanager
+from itertools import chain
+from warnings import warn
+
+import numpy as np
+import pandas as pd
+
+from .engines import pdb_df_columns, pdb_records
+
+# number of lines that are formatted and written at a time
+CHUNKSIZE = 2**16
+
+
+def format_pdb_lines(dfs, warn_unexpected=True):
+    """Format record DataFrames into fixed-width PDB lines.
+
+    Each column is formatted as a whole, using the `strf` functions of
+    `biopandas.pdb.engines.pdb_records`. Those are only called once per
+    distinct value of string and integer columns, and float columns
+    are formatted with equivalent format strings. The columns are
+    concatenated in the order in which they appear in each DataFrame, and
+    the lines are padded to 80 characters and sorted by `line_idx`.
+
+    Parameters
+    ----------
+    dfs : dict
+        Dictionary mapping record names in
+        {'ATOM', 'HETATM', 'ANISOU', 'OTHERS'} to non-empty DataFrames.
+
+    warn_unexpected : bool, default: True
+        If True, ATOM and HETATM columns that are not PDB columns are
+        skipped with a warning. Otherwise, all columns except `line_idx` are
+        written.
+
+    Returns
+    ---------
+    list : The lines (without line breaks) in the order of `line_idx`.
+
+    """
+    chunks = iter_pdb_lines(dfs, warn_unexpected=warn_unexpected, chunksize=None)
+    return list(chain.from_iterable(chunks))
+
+
+def iter_pdb_lines(dfs, warn_unexpected=True, chunksize=CHUNKSIZE):
+    """Yield the lines of `format_pdb_lines` in chunks.
+
+    Only the rows of the current chunk are formatted, so that the memory
+    used for the formatted lines is bounded by `chunksize`.
+
+    Parameters
+    ----------
+    dfs : dict
+        Dictionary mapping record names to non-empty DataFrames; see
+        `format_pdb_lines`.
+
+    warn_unexpected : bool, default: True
+        See `format_pdb_lines`.
+
+    chunksize : int or None, default: 65536
+        Maximum number of lines per chunk. Yields a single chunk if None.
+
+    Returns
+    ---------
+    generator : Lists of lines (without line breaks) in the order of
+        `line_idx`.
+
+    """
+    if not dfs:
+        return
+    names = list(dfs)
+    columns = {r: _output_columns(dfs[r], r, warn_unexpected) for r in names}
+    record, position, _ = _sorted_rows(dfs)
+
+    step = len(record) if chunksize is None else max(int(chunksize), 1)
+    for start in range(0, len(record), step):
+        chunk_record = record[start : start + step]
+        chunk_position = position[start : start + step]
+        lines = np.empty(len(chunk_record), dtype=object)
+        for i, r in enumerate(names):
+            mask = chunk_record == i
+            if mask.any():
+                rows = dfs[r].iloc[chunk_position[mask]]
+                lines[mask] = _format_rows(rows, r, columns[r])
+        yield lines.tolist()
+
+
+def write_pdb(path_or_buf, dfs, gz=False, append_newline=True, **kwargs):
+    """Write record DataFrames in PDB format, one chunk of lines at a time.
+
+    Parameters
+    ----------
+    path_or_buf : str, path object or file-like object
+        Output path, or a writable text or binary file-like object, e.g.
+        an open file, `sys.stdout`, a `gzip.GzipFile`, an `io.BytesIO` or a
+        socket file obtained via `socket.makefile("wb")`. File-like objects
+        are not closed. Binary output is UTF-8 encoded.
+
+    dfs : dict
+        Dictionary mapping record names to non-empty DataFrames; see
+        `format_pdb_lines`.
+
+    gz : bool, default: False
+        Writes gzipped output if True. File-like objects must be binary in
+        this case.
+
+    append_newline : bool, default: True
+        Appends a new line at the end of the output if True.
+
+    **kwargs
+        Keyword arguments for `iter_pdb_lines`, i.e., `warn_unexpected` and
+        `chunksize`.
+
+    """
+    chunks = iter_pdb_lines(dfs, **kwargs)
+    with _open_output(path_or_buf, gz) as write:
+        sep = ""
+        for lines in chunks:
+            write(sep + "\n".join(lines))
+            sep = "\n"
+        if append_newline:
+            write("\n")
+
+
+def write_trajectory(path_or_buf, dfs, coords, gz=False, warn_unexpected=True):
+    """Write the frames of a trajectory as MODEL/ENDMDL blocks in PDB format.
+
+    All columns except the coordinates are formatted once; only the
+    coordinates are formatted for each frame.
+
+    Parameters
+    ----------
+    path_or_buf : str, path object or file-like object
+        Output path or writable file-like object; see `write_pdb`.
+
+    dfs : dict
+        Dictionary mapping record names in {'ATOM', 'HETATM'} to non-empty
+        DataFrames that define the topology.
+
+    coords : array-like, shape (n_frames, n_atoms, 3)
+        Coordinates of each frame, where atom `i` refers to row `i` of the
+        concatenated DataFrames in `dfs`, i.e.
+        `pd.concat(dfs.values())`.
+
+    gz : bool, default: False
+        Writes gzipped output if True.
+
+    warn_unexpected : bool, default: True
+        See `format_pdb_lines`.
+
+    """
+    coords = np.asarray(coords, dtype=float)
+    n_atoms = sum(len(df) for df in dfs.values())
+    if coords.ndim != 3 or coords.shape[1:] != (n_atoms, 3):
+        raise ValueError(
+            "Expected coordinates of shape (n_frames, %d, 3); got %s"
+            % (n_atoms, coords.shape)
+        )
+
+    # the formatted columns before and after the coordinates of each line
+    prefix = np.empty(n_atoms, dtype=object)
+    suffix = np.empty(n_atoms, dtype=object)
+    record, position, order = _sorted_rows(dfs)
+    for i, (r, df) in enumerate(dfs.items()):
+        columns = _output_columns(df, r, warn_unexpected)
+        if not {"x_coord", "y_coord", "z_coord"}.issubset(columns):
+            raise ValueError("The %s DataFrame has no coordinate columns" % r)
+        mask = record == i
+        rows = df.iloc[position[mask]]
+        start = columns.index("x_coord")
+        end = columns.index("z_coord") + 1
+        prefix[mask] = _format_rows(rows, r, columns[:start], pad=False)
+        suffix[mask] = _format_rows(rows, r, columns[end:], pad=False)
+    prefix, suffix = prefix.tolist(), suffix.tolist()
+
+    with _open_output(path_or_buf, gz) as write:
+        for model, frame in enumerate(coords, 1):
+            x, y, z = frame[order].T.tolist()
+            lines = [
+                ("%s%8.3f%8.3f%8.3f%s" % values).ljust(80)
+                for values in zip(prefix, x, y, z, suffix)
+            ]
+            write(("MODEL     %4d" % model).ljust(80) + "\n")
+            write("\n".join(lines) + "\n")
+            write("ENDMDL".ljust(80) + "\n")
+        write("END".ljust(80) + "\n")
+
+
+@contextmanager
+def _open_output(path_or_buf, gz):
+    """Open a path or wrap a file-like object for writing; yields a function
+    that writes strings to it."""
+    if not hasattr(path_or_buf, "write"):
+        if gz:
+            f = gzip.open(path_or_buf, "wt")
+        else:
+            f = open(path_or_buf, "w")
+        with f:
+            yield f.write
+    elif gz:
+        with gzip.GzipFile(fileobj=path_or_buf, mode="wb") as f:
+            yield lambda text: f.write(text.encode("utf-8"))
+    elif _is_binary(path_or_buf):
+        yield lambda text: path_or_buf.write(text.encode("utf-8"))
+    else:
+        yield path_or_buf.write
+
+
+def _is_binary(f):
+    """Return True if `f` is a binary file-like object."""
+    if isinstance(f, io.TextIOBase):
+        return False
+    if isinstance(f, (io.RawIOBase, io.BufferedIOBase)):
+        return True
+    return "b" in str(getattr(f, "mode", ""))
+
+
+def _sorted_rows(dfs):
+    """Return the record number (in the order of `dfs`) and the position
+    within its DataFrame of each line sorted by `line_idx`, and the position
+    of each line in the concatenated DataFrames."""
+    # sort like `pd.concat(dfs).sort_values(by="line_idx")` to keep the
+    # order of lines with the same `line_idx`
+    line_idx = {r: df.reindex(columns=["line_idx"]) for r, df in dfs.items()}
+    order = pd.concat(line_idx, sort=False).reset_index(drop=True)
+    order = order.sort_values(by="line_idx").index.to_numpy()
+
+    lengths = [len(df) for df in dfs.values()]
+    offsets = np.cumsum([0] + lengths[:-1])
+    record = np.repeat(np.arange(len(lengths)), lengths)[order]
+    return record, order - offsets[record], order
+
+
+def _output_columns(df, record, warn_unexpected):
+    """Return the columns of `df` that are written, in order."""
+    missing = [col["id"] for col in pdb_records[record] if col["id"] not in df]
+    if missing:
+        raise KeyError("The %s DataFrame has no columns %s" % (record, missing))
+    columns = []
+    for c in df.columns:
+        if c in {"line_idx", "OUT"}:
+            continue
+        if warn_unexpected and record in {"ATOM", "HETATM"} and c not in pdb_df_columns:
+            warn("Column %s is not an expected column and will be skipped." % c)
+        else:
+            columns.append(c)
+    return columns
+
+
+def _format_rows(df, record, columns, pad=True):
+    """Return a list of the formatted lines of the rows of `df`, padded to
+    80 characters if `pad` is True."""
+    fields = {col["id"]: col for col in pdb_records[record]}
+    parts = [
+        (
+            _format_column(df[c], fields[c], record)
+            if c in fields
+            else np.asarray(df[c], dtype=object)
+        )
+        for c in columns
+    ]
+    if not parts:
+        return [" " * 80 if pad else ""] * len(df)
+    if not pad:
+        return ["".join(p) for p in zip(*parts)]
+    return ["".join(p).ljust(80) for p in zip(*parts)]
+
+
+def _format_column(series, col, record):
+    """Return an object array of the formatted values of a column."""
+    fid = col["id"]
+    if record in {"ATOM", "HETATM"} and fid in _FLOAT_FORMATS:
+        values = np.asarray(series, dtype=object).tolist()
+        return np.asarray(_FLOAT_FORMATS[fid](values), dtype=object)
+    if fid == "charge":
+        values = np.asarray(series, dtype=object).tolist()
+        return np.asarray(_format_charge(values), dtype=object)
+    return _format_distinct(series, col["strf"])
+
+
+def _format_distinct(series, strf):
+    """Apply `strf` once per distinct value of a column."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        uniques = list(series.cat.categories)
+    else:
+        values = series.to_numpy()
+        if values.dtype == object and pd.api.types.infer_dtype(
+            values, skipna=True
+        ) not in {"string", "empty"}:
+            # values of different types may compare equal, e.g., 1 and 1.0
+            return np.asarray([strf(v) for v in values.tolist()], dtype=object)
+        if values.dtype.kind == "f":
+            # -0.0 and 0.0 compare equal but may be formatted differently
+            return np.asarray([strf(v) for v in values.tolist()], dtype=object)
+        codes, uniques = pd.factorize(values)
+        uniques = list(uniques)
+    out = np.empty(len(codes), dtype=object)
+    if uniques:
+        formatted = np.asarray([strf(u) for u in uniques], dtype=object)
+        valid = codes >= 0
+        out[valid] = formatted[codes[valid]]
+    for i in np.flatnonzero(codes < 0):
+        # missing values are formatted individually, e.g. None and NaN
+        out[i] = strf(series.iloc[i])
+    return out
+
+
+# Equivalent to the `strf` functions in `pdb_atomdict`, e.g.
+# ("%+8.3f" % x).replace("+", " ") == "% 8.3f" % x
+
+
+def _format_coord(values):
+    # same as "% 8.3f" with the leading blank removed from values that do not
+    # fit into 8 characters
+    return ["%8.3f" % v for v in values]
+
+
+def _format_occupancy(values):
+    return ["% 6.2f" % v for v in values]
+
+
+def _format_b_factor(values):
+    return ["% 6.2f" % v if len(str(int(v))) < 3 else "%6.2f" % v for v in values]
+
+
+def _format_charge(values):
+    notnull = pd.notnull(np.asarray(values, dtype=object)).tolist()
+    return ["% 2.1f" % v if ok else "" for v, ok in zip(values, notnull)]
+
+
+_FLOAT_FORMATS = {
+    "x_coord": _format_coord,
+    "y_coord": _format_coord,
+    "z_coord": _format_coord,
+    "occupancy": _format_occupancy,
+    "b_factor": _format_b_factor,
+    "charge": _format_charge,
+}
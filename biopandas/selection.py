@@ -0,0 +1,288 @@
+# BioPandas
+# License: BSD 3 clause
+# Project Website: http://rasbt.github.io/biopandas/
+# Code Repository: https://github.com/rasbt/biopandas
+
+"""Selection language for atoms, e.g. `"chain A and resi 10-50 and name CA"`.
+
+A selection is a boolean expression of the following terms, combined with
+`and`, `or`, `not` and parentheses:
+
+- `chain A+B`, `resn ALA+GLY`, `name CA+CB`, `elem C+N`, `alt A`,
+  `record HETATM`: atoms whose property equals one of the `+`-separated
+  values.
+- `resi 10-50+60`, `id 1-100`: atoms whose residue number (atom serial
+  number) is in one of the ranges. `b`, `q`, `x`, `y` and `z` select by
+  B-factor, occupancy and coordinates in the same way.
+- `b > 50`, `q <= 0.5`, `resi >= 10`: comparisons (`<`, `<=`, `>`, `>=`,
+  `==`, `!=`) of numeric properties.
+- `within 5 of <term>`: atoms within 5 Angstrom of any atom selected by
+  the term, e.g. `within 5 of resn HEM`.
+- Keywords: `all`, `hydrogen`, `heavy`, `carbon`, `c-alpha` (or `calpha`),
+  `main chain` (or `mainchain`, `backbone`), `hetatm` and `water`.
+
+"""
+
+import operator
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# property names of the selection language and the columns they refer to
+PDB_FIELDS = {
+    "chain": "chain_id",
+    "resi": "residue_number",
+    "resn": "residue_name",
+    "name": "atom_name",
+    "elem": "element_symbol",
+    "alt": "alt_loc",
+    "id": "atom_number",
+    "record": "record_name",
+    "b": "b_factor",
+    "q": "occupancy",
+    "x": "x_coord",
+    "y": "y_coord",
+    "z": "z_coord",
+}
+
+ALIASES = {
+    "resid": "resi",
+    "resname": "resn",
+    "element": "elem",
+    "altloc": "alt",
+    "serial": "id",
+}
+
+STRING_FIELDS = {"chain", "resn", "name", "elem", "alt", "record"}
+
+KEYWORDS = {
+    "all": ("all",),
+    "hydrogen": ("values", "elem", ("H",)),
+    "heavy": ("not", ("values", "elem", ("H",))),
+    "carbon": ("values", "elem", ("C",)),
+    "c-alpha": ("values", "name", ("CA",)),
+    "calpha": ("values", "name", ("CA",)),
+    "mainchain": ("values", "name", ("C", "O", "N", "CA")),
+    "backbone": ("values", "name", ("C", "O", "N", "CA")),
+    "hetatm": ("values", "record", ("HETATM",)),
+    "water": ("values", "resn", ("HOH", "WAT", "H2O", "DOD")),
+}
+
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+_TOKEN = re.compile(r"\(|\)|<=|>=|==|!=|<|>|=|[^\s()<>=!]+")
+_RANGE = re.compile(r"^(-?\d+(?:\.\d*)?)(?:-(-?\d+(?:\.\d*)?))?$")
+
+
+class SelectionError(ValueError):
+    """Raised for selection strings that cannot be parsed."""
+
+
+def mmcif_fields(use_auth=True):
+    """Return the property names of the selection language and the mmCIF
+    columns they refer to, using the `auth_*` or `label_*` columns for
+    chains, residues and atom names."""
+    prefix = "auth" if use_auth else "label"
+    return {
+        "chain": f"{prefix}_asym_id",
+        "resi": f"{prefix}_seq_id",
+        "resn": f"{prefix}_comp_id",
+        "name": f"{prefix}_atom_id",
+        "elem": "type_symbol",
+        "alt": "label_alt_id",
+        "id": "id",
+        "record": "group_PDB",
+        "b": "B_iso_or_equiv",
+        "q": "occupancy",
+        "x": "Cartn_x",
+        "y": "Cartn_y",
+        "z": "Cartn_z",
+    }
+
+
+@lru_cache(maxsize=256)
+def compile_selection(query):
+    """Parse a selection string into a tree of tuples.
+
+    Compiled selections are cached, so that repeated queries are only
+    parsed once.
+
+    """
+    # allow blanks around the `+` of value lists, e.g. "name CA + CB"
+    tokens = _TOKEN.findall(re.sub(r"\s*\+\s*", "+", query))
+    parser = _Parser(tokens, query)
+    node = parser.expression()
+    if parser.peek() is not None:
+        parser.fail(f"unexpected {parser.peek()!r}")
+    return node
+
+
+def selection_mask(query, table, fields):
+    """Evaluate a selection string on a table of atoms.
+
+    Parameters
+    ----------
+    query : str
+        Selection string; see the module documentation.
+
+    table : biopandas.atom_table.AtomTable
+        The atoms to select from. The codes of the string columns are
+        cached in the table, so that repeated queries do not factorize
+        them again until the DataFrames are replaced or modified (see
+        `AtomTable.is_current`).
+
+    fields : dict
+        Mapping of the property names of the selection language to column
+        names, e.g. `PDB_FIELDS`.
+
+    Returns
+    ---------
+    numpy.ndarray : Boolean mask over the rows of the table.
+
+    """
+    node = compile_selection(query)
+    return _Evaluator(table, fields).evaluate(node)
+
+
+class _Parser(object):
+    """Recursive descent parser of selection strings."""
+
+    def __init__(self, tokens, query):
+        self.tokens = tokens
+        self.query = query
+        self.pos = 0
+
+    def fail(self, message):
+        raise SelectionError(f"Invalid selection {self.query!r}: {message}")
+
+    def peek(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return None
+
+    def next(self, what):
+        token = self.peek()
+        if token is None:
+            self.fail(f"expected {what}")
+        self.pos += 1
+        return token
+
+    def expression(self):
+        node = self.conjunction()
+        while (self.peek() or "").lower() == "or":
+            self.pos += 1
+            node = ("or", node, self.conjunction())
+        return node
+
+    def conjunction(self):
+        node = self.negation()
+        while (self.peek() or "").lower() == "and":
+            self.pos += 1
+            node = ("and", node, self.negation())
+        return node
+
+    def negation(self):
+        if (self.peek() or "").lower() == "not":
+            self.pos += 1
+            return ("not", self.negation())
+        return self.term()
+
+    def term(self):
+        token = self.next("a selection term")
+        word = token.lower()
+        if token == "(":
+            node = self.expression()
+            if self.next("')'") != ")":
+                self.fail("expected ')'")
+            return node
+        if word == "within":
+            distance = self.number(self.next("a distance"))
+            if not distance >= 0:
+                self.fail(f"expected a non-negative distance; got {distance}")
+            if self.next("'of'").lower() != "of":
+                self.fail("expected 'of' after the distance")
+            return ("within", distance, self.negation())
+        if word == "main" and (self.peek() or "").lower() == "chain":
+            self.pos += 1
+            return KEYWORDS["mainchain"]
+        if word in KEYWORDS:
+            return KEYWORDS[word]
+
+        field = ALIASES.get(word, word)
+        if field not in PDB_FIELDS:
+            self.fail(f"unknown keyword {token!r}")
+        value = self.next(f"a value after {token!r}")
+        if value in OPERATORS:
+            if field in STRING_FIELDS:
+                self.fail(f"{token!r} cannot be compared with {value!r}")
+            number = self.number(self.next(f"a number after {value!r}"))
+            return ("compare", field, value, number)
+        if value in ("(", ")"):
+            self.fail(f"expected a value after {token!r}")
+        if field in STRING_FIELDS:
+            return ("values", field, tuple(value.split("+")))
+        ranges = []
+        for part in value.split("+"):
+            match = _RANGE.match(part)
+            if match is None:
+                self.fail(f"invalid number or range {part!r}")
+            low, high = match.groups()
+            ranges.append((float(low), float(high if high else low)))
+        return ("range", field, tuple(ranges))
+
+    def number(self, token):
+        try:
+            return float(token)
+        except ValueError:
+            self.fail(f"expected a number instead of {token!r}")
+
+
+class _Evaluator(object):
+    """Evaluates compiled selections on an `AtomTable`."""
+
+    def __init__(self, table, fields):
+        self.table = table
+        self.fields = fields
+
+    def evaluate(self, node):
+        kind = node[0]
+        if kind == "all":
+            return np.ones(self.table.size, dtype=bool)
+        if kind == "not":
+            return ~self.evaluate(node[1])
+        if kind == "and":
+            return self.evaluate(node[1]) & self.evaluate(node[2])
+        if kind == "or":
+            return self.evaluate(node[1]) | self.evaluate(node[2])
+        if kind == "values":
+            codes, lookup = self.table.codes(self.fields[node[1]])
+            wanted = [lookup[v] for v in node[2] if v in lookup]
+            return np.isin(codes, wanted)
+        if kind == "range":
+            values = self.numeric(node[1])
+            mask = np.zeros(self.table.size, dtype=bool)
+            for low, high in node[2]:
+                mask |= (values >= low) & (values <= high)
+            return mask
+        if kind == "compare":
+            with np.errstate(invalid="ignore"):
+                return OPERATORS[node[2]](self.numeric(node[1]), node[3])
+        # within
+        centers = self.table.xyz[self.evaluate(node[2])]
+        return self.table.spatial_index().within(centers, node[1])
+
+    def numeric(self, field):
+        values = self.table.column(self.fields[field])
+        if values.dtype.kind not in "biuf":
+            values = pd.to_numeric(values, errors="coerce")
+        return np.asarray(values, dtype=float)
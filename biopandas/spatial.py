@@ -0,0 +1,439 @@
+# BioPandas
+# License: BSD 3 clause
+# Project Website: http://rasbt.github.io/biopandas/
+# Code Repository: https://github.com/rasbt/biopandas
+
+"""Cell list for neighbor queries and blockwise distance computations on
+atom coordinates."""
+
+import numpy as np
+
+# maximum number of (query point, atom) distances computed at a time
+BLOCK_SIZE = 2**20
+
+# number of distances computed at a time by `point_distances`, small
+# enough for the temporary arrays to stay in the CPU cache
+DISTANCE_BLOCK_SIZE = 2**16
+
+
+class SpatialIndex(object):
+    """Cell list (uniform grid) of 3D points for radius, k-nearest-neighbor
+    and pair queries.
+
+    The points are sorted by the grid cell that contains them, so that a
+    query only computes the distances to the points in the cells that
+    overlap the search radius. Queries are vectorized over blocks of query
+    points. Points with non-finite coordinates are not indexed and are
+    never returned.
+
+    Parameters
+    ----------
+    xyz : array-like, shape (n_points, 3)
+        Coordinates of the points. Query results refer to the rows of
+        `xyz`.
+
+    cell_size : float, default: 4.0
+        Edge length of the grid cells in Angstrom. With the default, a cell
+        of a protein structure holds about 5 atoms.
+
+    Examples
+    ---------
+    >>> xyz = ppdb.df['ATOM'][['x_coord', 'y_coord', 'z_coord']].to_numpy()
+    >>> index = SpatialIndex(xyz)
+    >>> index.query_radius([10.0, 5.0, -3.0], r=4.5)
+    array([ 97,  98, 102, 103])
+    >>> distances, indices = index.query_knn([10.0, 5.0, -3.0], k=3)
+    >>> pairs = index.query_pairs(r=2.0)
+
+    """
+
+    def __init__(self, xyz, cell_size=4.0):
+        xyz = np.asarray(xyz, dtype=float)
+        if xyz.ndim != 2 or xyz.shape[1] != 3:
+            raise ValueError(
+                "Expected coordinates of shape (n_points, 3); got %s"
+                % (xyz.shape,)
+            )
+        if not cell_size > 0:
+            raise ValueError("cell_size must be positive; got %s" % cell_size)
+        self.xyz = xyz
+        self.cell_size = float(cell_size)
+
+        valid = np.flatnonzero(np.isfinite(xyz).all(axis=1))
+        self.origin = xyz[valid].min(axis=0) if len(valid) else np.zeros(3)
+        cells = self._cell_of(xyz[valid])
+        if len(valid):
+            self.shape = cells.max(axis=0) + 1
+        else:
+            self.shape = np.ones(3, dtype=np.int64)
+        self._strides = np.array(
+            [self.shape[1] * self.shape[2], self.shape[2], 1]
+        )
+        ids = self._linear(cells)
+
+        # the points sorted by cell, and the range of sorted positions of
+        # each non-empty cell
+        order = np.argsort(ids, kind="stable")
+        self.order = valid[order]
+        self.sorted_xyz = xyz[self.order]
+        self.cell_ids, self.starts = np.unique(ids[order], return_index=True)
+        self.ends = np.append(self.starts[1:], len(order))
+
+    def __len__(self):
+        return len(self.xyz)
+
+    def query_radius(self, points, r, return_distance=False):
+        """Find the points within distance `r` of each query point.
+
+        Parameters
+        ----------
+        points : array-like, shape (3,) or (n_queries, 3)
+            Query point(s).
+
+        r : float
+            Search radius in Angstrom.
+
+        return_distance : bool, default: False
+            If True, also returns the distances.
+
+        Returns
+        ---------
+        list : Arrays of the ascending row numbers of the points within `r`
+            of each query point, or a single array if `points` has shape
+            (3,). If `return_distance` is True, a tuple of these and the
+            corresponding distances.
+
+        """
+        points, single = _as_points(points)
+        indices = [np.empty(0, dtype=np.intp)] * len(points)
+        distances = [np.empty(0)] * len(points)
+        for block, owner, idx, sq_dist in self._within(points, r):
+            order = np.lexsort((idx, owner))
+            owner, idx, sq_dist = owner[order], idx[order], sq_dist[order]
+            bounds = np.searchsorted(owner, np.arange(1, len(block)))
+            for q, i in zip(block, np.split(idx, bounds)):
+                indices[q] = i
+            if return_distance:
+                split = np.split(np.sqrt(sq_dist), bounds)
+                for q, d in zip(block, split):
+                    distances[q] = d
+        if single:
+            indices, distances = indices[0], distances[0]
+        if return_distance:
+            return indices, distances
+        return indices
+
+    def query_knn(self, points, k=1):
+        """Find the `k` nearest points of each query point.
+
+        Parameters
+        ----------
+        points : array-like, shape (3,) or (n_queries, 3)
+            Query point(s).
+
+        k : int, default: 1
+            Number of neighbors. Ties are broken by row number.
+
+        Returns
+        ---------
+        distances, indices : numpy.ndarray, shape (n_queries, k)
+            Distances and row numbers of the neighbors in order of
+            increasing distance, or arrays of shape (k,) if `points` has
+            shape (3,).
+
+        """
+        points, single = _as_points(points)
+        n_valid = len(self.order)
+        if not 1 <= k <= n_valid:
+            raise ValueError(
+                "k must be between 1 and the number of indexed points (%d); "
+                "got %s" % (n_valid, k)
+            )
+        distances = np.empty((len(points), k))
+        indices = np.empty((len(points), k), dtype=np.intp)
+
+        # search in growing cubes of cells around each point until the
+        # k-th nearest candidate is closer than the cube's boundary
+        pending = np.arange(len(points))
+        density = n_valid / len(self.cell_ids)
+        reach = max(1, int(np.ceil(((k / density) ** (1 / 3) - 1) / 2)))
+        while len(pending):
+            unresolved = []
+            radius = reach * self.cell_size
+            for block in self._blocks(pending, reach):
+                owner, pos = self._candidates(points[block], reach, radius)
+                idx = self.order[pos]
+                sq_dist = _sq_dist(points[block][owner], self.sorted_xyz[pos])
+                order = np.lexsort((idx, sq_dist, owner))
+                owner, idx = owner[order], idx[order]
+                sq_dist = sq_dist[order]
+                first = np.searchsorted(owner, np.arange(len(block)))
+                counts = np.bincount(owner, minlength=len(block))
+
+                found = counts >= k
+                kth_sq_dist = np.full(len(block), np.inf)
+                kth_sq_dist[found] = sq_dist[first[found] + k - 1]
+                done = found & (
+                    (kth_sq_dist <= radius**2) | (counts == n_valid)
+                )
+                rows = first[done][:, None] + np.arange(k)
+                distances[block[done]] = np.sqrt(sq_dist[rows])
+                indices[block[done]] = idx[rows]
+                unresolved.append(block[~done])
+            pending = np.concatenate(unresolved)
+            reach *= 2
+        if single:
+            return distances[0], indices[0]
+        return distances, indices
+
+    def query_pairs(self, r, return_distance=False):
+        """Find all pairs of points within distance `r` of each other.
+
+        Parameters
+        ----------
+        r : float
+            Cutoff distance in Angstrom.
+
+        return_distance : bool, default: False
+            If True, also returns the distances.
+
+        Returns
+        ---------
+        numpy.ndarray, shape (n_pairs, 2) : Row numbers `(i, j)` with
+            `i < j` of each pair, sorted lexicographically. If
+            `return_distance` is True, a tuple of the pairs and their
+            distances.
+
+        """
+        pairs, distances = [np.empty((0, 2), dtype=np.intp)], [np.empty(0)]
+        for block_pairs, block_distances in self.iter_pairs(r):
+            pairs.append(block_pairs)
+            distances.append(block_distances)
+        pairs = np.concatenate(pairs)
+        distances = np.concatenate(distances)
+        order = np.lexsort((pairs[:, 1], pairs[:, 0]))
+        if return_distance:
+            return pairs[order], distances[order]
+        return pairs[order]
+
+    def iter_pairs(self, r):
+        """Yield the pairs of points within distance `r` of each other in
+        blocks, unsorted, without holding all pairs in memory at once.
+
+        Yields
+        ---------
+        pairs, distances : numpy.ndarray
+            Row numbers `(i, j)` with `i < j` of the pairs of a block,
+            shape (n_pairs, 2), and their distances.
+
+        """
+        points = self.sorted_xyz
+        for block, owner, idx, sq_dist in self._within(points, r, half=True):
+            i = self.order[block[owner]]
+            pairs = np.column_stack([np.minimum(i, idx), np.maximum(i, idx)])
+            yield pairs, np.sqrt(sq_dist)
+
+    def within(self, points, r):
+        """Return a boolean mask of the indexed points that are within
+        distance `r` of any of the query `points`, shape (n_points,).
+        Query points with non-finite coordinates are ignored."""
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        points = points[np.isfinite(points).all(axis=1)]
+        mask = np.zeros(len(self.xyz), dtype=bool)
+        for _, _, idx, _ in self._within(points, r):
+            mask[idx] = True
+        return mask
+
+    def _within(self, points, r, half=False):
+        """Yield the query points of each block (as positions in `points`)
+        and the (block position, row number, squared distance) of each
+        pair within distance `r`. With `half`, `points` must be the sorted
+        points, and each pair is only yielded for the query point with the
+        lower sorted position."""
+        if r < 0:
+            raise ValueError("r must not be negative; got %s" % r)
+        reach = int(np.ceil(r / self.cell_size))
+        for block in self._blocks(np.arange(len(points)), reach):
+            owner, pos = self._candidates(points[block], reach, r, half)
+            if half:
+                later = pos > block[owner]
+                owner, pos = owner[later], pos[later]
+            sq_dist = _sq_dist(points[block][owner], self.sorted_xyz[pos])
+            keep = sq_dist <= r**2
+            yield block, owner[keep], self.order[pos[keep]], sq_dist[keep]
+
+    def _blocks(self, queries, reach):
+        """Split the query points into blocks for which about `BLOCK_SIZE`
+        candidate pairs are compared."""
+        if len(self.cell_ids) == 0:
+            return
+        per_cell = len(self.order) / len(self.cell_ids)
+        per_query = min((2 * reach + 1) ** 3 * per_cell, len(self.order))
+        step = max(1, int(BLOCK_SIZE // per_query))
+        for start in range(0, len(queries), step):
+            yield queries[start : start + step]
+
+    def _candidates(self, points, reach, r, half=False):
+        """Return the (query, sorted position) pairs of the points in the
+        cells within distance `r` of the query points, out of the cubes of
+        (2 * reach + 1)**3 cells around them. With `half`, only the cells
+        that are sorted after the query point's own cell are included."""
+        n_cells = (2 * reach + 1) ** 3
+        if n_cells >= len(self.cell_ids):
+            # the cube covers about as many cells as there are non-empty
+            # cells; compare with all points instead
+            n = len(self.order)
+            owner = np.repeat(np.arange(len(points)), n)
+            return owner, np.tile(np.arange(n), len(points))
+
+        # the neighbor cells along each axis, and the squared distance of
+        # the query point to them (infinite outside of the grid)
+        m = len(points)
+        cells = self._cell_of(points)[:, :, None] + np.arange(
+            -reach, reach + 1
+        )
+        low = (
+            self.origin[:, None] + self.cell_size * cells - points[:, :, None]
+        )
+        gap = np.maximum(low, 0) + np.maximum(-low - self.cell_size, 0)
+        gap = gap**2
+        gap[(cells < 0) | (cells >= self.shape[:, None])] = np.inf
+        cells = cells * self._strides[:, None]
+
+        # combine the axes into the cube of cells around each query point,
+        # skipping the cells whose box is farther than r from the point
+        # (with a margin for rounding of the cell boundaries)
+        sq_dist = (
+            gap[:, 0, :, None, None]
+            + gap[:, 1, None, :, None]
+            + gap[:, 2, None, None, :]
+        ).reshape(m, -1)
+        ids = (
+            cells[:, 0, :, None, None]
+            + cells[:, 1, None, :, None]
+            + cells[:, 2, None, None, :]
+        ).reshape(m, -1)
+        near = sq_dist <= (r + 1e-6) ** 2
+        if half:
+            near &= ids >= ids[:, [n_cells // 2]]
+        owner = np.nonzero(near)[0]
+        ids = ids[near]
+
+        found = np.searchsorted(self.cell_ids, ids)
+        found[found == len(self.cell_ids)] = 0
+        hit = self.cell_ids[found] == ids
+        owner, found = owner[hit], found[hit]
+
+        # expand the position range of each cell
+        starts = self.starts[found]
+        counts = self.ends[found] - starts
+        owner = np.repeat(owner, counts)
+        pos = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        return owner, pos + np.arange(len(pos))
+
+    def _cell_of(self, points):
+        cells = np.floor((points - self.origin) / self.cell_size)
+        # keep far away query points from overflowing
+        return np.clip(cells, -(2**20), 2**20).astype(np.int64)
+
+    def _linear(self, cells):
+        return cells @ self._strides
+
+
+def point_distances(xyz, points, reduce=None, cutoff=None):
+    """Compute the distances between points and reference points.
+
+    The distances are computed for blocks of rows of `xyz`, so that at
+    most about `DISTANCE_BLOCK_SIZE` distances are held in memory at a time
+    besides the result.
+
+    Parameters
+    ----------
+    xyz : array-like, shape (n_points, 3)
+        Coordinates of the points, e.g. atoms.
+
+    points : array-like, shape (n_references, 3)
+        Coordinates of the reference points. Must be finite.
+
+    reduce : {None, 'min', 'argmin', 'count'}, default: None
+        If None, returns the full distance matrix. Otherwise, returns for
+        each point the distance to the nearest reference point ('min'),
+        the row number of the nearest reference point ('argmin'; the first
+        one in case of ties), or the number of reference points within
+        `cutoff` ('count').
+
+    cutoff : float or None, default: None
+        Distance cutoff in Angstrom; required for `reduce='count'`.
+
+    Returns
+    ---------
+    numpy.ndarray : Distances of shape (n_points, n_references), or the
+        reduced values of shape (n_points,). Points with non-finite
+        coordinates have a minimum distance of NaN, an argmin of -1 and a
+        count of 0.
+
+    """
+    xyz = np.asarray(xyz, dtype=float)
+    points, _ = _as_points(points)
+    if reduce not in (None, "min", "argmin", "count"):
+        raise ValueError(
+            "reduce must be None, 'min', 'argmin' or 'count'; got %r"
+            % (reduce,)
+        )
+    if (reduce == "count") != (cutoff is not None):
+        raise ValueError("cutoff must be given if and only if reduce='count'")
+    if reduce != "count" and len(points) == 0:
+        if reduce is None:
+            return np.empty((len(xyz), 0))
+        raise ValueError("Cannot reduce over zero reference points")
+
+    if reduce is None:
+        out = np.empty((len(xyz), len(points)))
+    elif reduce == "min":
+        out = np.empty(len(xyz))
+    else:
+        out = np.empty(len(xyz), dtype=np.intp)
+    columns = [np.ascontiguousarray(xyz[:, j]) for j in range(3)]
+    step = max(1, DISTANCE_BLOCK_SIZE // max(1, len(points)))
+    for start in range(0, len(xyz), step):
+        block = [c[start : start + step] for c in columns]
+        sq_dist = np.subtract.outer(block[0], points[:, 0])
+        sq_dist *= sq_dist
+        for j in (1, 2):
+            diff = np.subtract.outer(block[j], points[:, j])
+            diff *= diff
+            sq_dist += diff
+        rows = slice(start, start + len(sq_dist))
+        if reduce is None:
+            np.sqrt(sq_dist, out=out[rows])
+        elif reduce == "count":
+            out[rows] = np.count_nonzero(sq_dist <= cutoff**2, axis=1)
+        else:
+            nearest = sq_dist.argmin(axis=1)
+            nearest_sq_dist = sq_dist[np.arange(len(sq_dist)), nearest]
+            if reduce == "min":
+                out[rows] = np.sqrt(nearest_sq_dist)
+            else:
+                out[rows] = np.where(np.isnan(nearest_sq_dist), -1, nearest)
+    return out
+
+
+def _as_points(points):
+    """Return the query points as an array of shape (n, 3) and whether a
+    single point was passed."""
+    points = np.asarray(points, dtype=float)
+    single = points.ndim == 1
+    points = points.reshape(-1, 3) if single else points
+    if points.ndim != 2 or points.shape[1] != 3:
+        raise ValueError(
+            "Expected query points of shape (3,) or (n, 3); got %s"
+            % (points.shape,)
+        )
+    if not np.isfinite(points).all():
+        raise ValueError("Query points must have finite coordinates")
+    return points, single
+
+
+def _sq_dist(a, b):
+    diff = a - b
+    return diff[:, 0] ** 2 + diff[:, 1] ** 2 + diff[:, 2] ** 2
@@ -0,0 +1,556 @@
+# BioPandas
+# License: BSD 3 clause
+# Project Website: http://rasbt.github.io/biopandas/
+# Code Repository: https://github.com/rasbt/biopandas
+
+"""Optimal superposition (Kabsch algorithm) and RMSD of coordinates."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+
+def kabsch(mobile, reference, weights=None):
+    """Compute the rotation and translation that superpose the `mobile`
+    coordinates onto the `reference` coordinates with minimal (weighted)
+    RMSD.
+
+    Parameters
+    ----------
+    mobile : array-like, shape (n_atoms, 3) or (n_frames, n_atoms, 3)
+        Coordinates to superpose. Stacks of frames are superposed in a
+        single vectorized computation.
+
+    reference : array-like, shape (n_atoms, 3) or (n_frames, n_atoms, 3)
+        Reference coordinates; broadcast against `mobile`.
+
+    weights : array-like, shape (n_atoms,), or None, default: None
+        Non-negative weight of each atom, e.g. the pLDDT of predicted
+        structures. Uniform if None.
+
+    Returns
+    ---------
+    rotation, translation : numpy.ndarray, shape (..., 3, 3) and (..., 3)
+        Proper rotation matrix and translation such that
+        `mobile @ rotation.T + translation` is superposed onto
+        `reference`.
+
+    """
+    mobile, reference, weights = _check(mobile, reference, weights)
+    mobile_center = np.einsum("...ij,i->...j", mobile, weights)
+    reference_center = np.einsum("...ij,i->...j", reference, weights)
+    covariance = np.einsum(
+        "...ij,i,...ik->...jk",
+        mobile - mobile_center[..., None, :],
+        weights,
+        reference - reference_center[..., None, :],
+    )
+    u, _, vt = np.linalg.svd(covariance)
+    v = np.swapaxes(vt, -1, -2)
+    # flip the axis of the smallest singular value if the optimal
+    # orthogonal matrix is a reflection
+    sign = np.where(np.linalg.det(v @ np.swapaxes(u, -1, -2)) < 0, -1.0, 1.0)
+    v[..., :, 2] *= sign[..., None]
+    rotation = v @ np.swapaxes(u, -1, -2)
+    translation = reference_center - np.einsum(
+        "...j,...ij->...i", mobile_center, rotation
+    )
+    return rotation, translation
+
+
+def transform(xyz, rotation, translation):
+    """Apply a rotation and translation from `kabsch` to coordinates of
+    shape (..., n_atoms, 3)."""
+    xyz = np.asarray(xyz, dtype=float)
+    return xyz @ np.swapaxes(rotation, -1, -2) + translation[..., None, :]
+
+
+def coordinate_rmsd(mobile, reference, weights=None, superpose=False):
+    """Compute the (weighted) Root Mean Square Deviation between
+    coordinates, optionally after optimal superposition.
+
+    Parameters
+    ----------
+    mobile, reference : array-like
+        Coordinates of the same atoms in the same order, of shape
+        (n_atoms, 3) or (n_frames, n_atoms, 3).
+
+    weights : array-like, shape (n_atoms,), or None, default: None
+        Non-negative weight of each atom. Uniform if None.
+
+    superpose : bool, default: False
+        If True, superposes `mobile` onto `reference` with `kabsch` first.
+
+    Returns
+    ---------
+    float or numpy.ndarray : RMSD, or one RMSD per frame.
+
+    """
+    mobile, reference, weights = _check(mobile, reference, weights)
+    if superpose:
+        mobile = transform(mobile, *kabsch(mobile, reference, weights))
+    sq_dev = ((mobile - reference) ** 2).sum(axis=-1)
+    value = np.sqrt(sq_dev @ weights)
+    return float(value) if value.ndim == 0 else value
+
+
+def fit_coordinates(df1, df2, coord_columns, select=None, weights=None):
+    """Return the coordinates of the atoms of two DataFrames that are
+    compared by `coordinate_rmsd` or `kabsch`, and the weights.
+
+    Parameters
+    ----------
+    df1, df2 : pandas.DataFrame
+        Mobile and reference atoms in the same order.
+
+    coord_columns : list of str
+        Names of the x, y and z coordinate columns.
+
+    select : callable or None, default: None
+        Function that returns the selected rows of a DataFrame, e.g.
+        `partial(PandasPdb._get_calpha, invert=False)`. All atoms if None.
+
+    weights : str, array-like or None, default: None
+        Name of a column of `df1` (e.g. 'b_factor'), or one weight per row
+        of `df1`.
+
+    """
+    if df1.shape[0] != df2.shape[0]:
+        raise AttributeError("DataFrames have unequal lengths")
+    if isinstance(weights, str):
+        weights = df1[weights].to_numpy(dtype=float)
+    elif weights is not None:
+        weights = np.asarray(weights, dtype=float)
+        if weights.shape != (len(df1),):
+            raise ValueError(
+                "weights must have one value per atom (%d); got shape %s"
+                % (len(df1), weights.shape)
+            )
+    if select is not None:
+        rows = select(df1.reset_index(drop=True)).index.to_numpy()
+        df1, df2 = select(df1), select(df2)
+        if weights is not None:
+            weights = weights[rows]
+    mobile = df1[list(coord_columns)].to_numpy(dtype=float)
+    reference = df2[list(coord_columns)].to_numpy(dtype=float)
+    return mobile, reference, weights
+
+
+def dataframe_rmsd(
+    df1, df2, coord_columns, select=None, weights=None, superpose=False
+):
+    """Compute the RMSD between the atoms of two DataFrames in the same
+    order, as the `rmsd` methods of the structure classes.
+
+    Parameters
+    ----------
+    df1, df2, coord_columns, select, weights
+        See `fit_coordinates`.
+
+    superpose : bool, default: False
+        If True, superposes the selected atoms of `df1` onto those of `df2`.
+
+    Returns
+    ---------
+    float : RMSD, not rounded.
+
+    """
+    mobile, reference, weights = fit_coordinates(
+        df1, df2, coord_columns, select, weights
+    )
+    if superpose or weights is not None:
+        return coordinate_rmsd(mobile, reference, weights, superpose)
+    # plain RMSD as computed by previous versions, which is NaN for zero
+    # selected atoms
+    sq_dev = ((mobile - reference) ** 2).sum(axis=1)
+    return float((sq_dev.sum() / len(sq_dev)) ** 0.5)
+
+
+def superpose_dataframe(
+    df_mobile, df_ref, coord_columns, select=None, weights=None
+):
+    """Superpose the atoms of a DataFrame onto reference atoms, as the
+    `superpose` methods of the structure classes.
+
+    Parameters
+    ----------
+    df_mobile, df_ref, coord_columns, select, weights
+        See `fit_coordinates`. All atoms of `df_mobile` are transformed.
+
+    Returns
+    ---------
+    rotation, translation : numpy.ndarray
+        See `kabsch`.
+
+    df : pandas.DataFrame
+        Copy of `df_mobile` with transformed coordinates.
+
+    """
+    mobile, reference, weights = fit_coordinates(
+        df_mobile, df_ref, coord_columns, select, weights
+    )
+    rotation, translation = kabsch(mobile, reference, weights)
+    df = df_mobile.copy()
+    columns = list(coord_columns)
+    xyz = transform(df[columns].to_numpy(dtype=float), rotation, translation)
+    for j, column in enumerate(columns):
+        df[column] = xyz[:, j]
+    return rotation, translation, df
+
+
+def selector(get_dict, s, invert):
+    """Return the function that selects the atoms of a DataFrame for the
+    `s` argument of the `rmsd` methods, or None to select all atoms.
+
+    Parameters
+    ----------
+    get_dict : dict
+        Filter functions of a structure class, e.g.
+        `PandasPdb._init_get_dict()`.
+
+    s : str or None
+        Key of `get_dict`; raises an AttributeError for other values.
+
+    invert : bool
+        Inverts the selection if true.
+
+    """
+    if not s:
+        return None
+    if s not in get_dict.keys():
+        raise AttributeError(f"s must be in {get_dict.keys()} or None")
+    return partial(get_dict[s], invert=invert)
+
+
+def _check(mobile, reference, weights):
+    """Return the coordinates as arrays and the weights normalized to a
+    sum of 1."""
+    mobile = np.asarray(mobile, dtype=float)
+    reference = np.asarray(reference, dtype=float)
+    for xyz in (mobile, reference):
+        if xyz.ndim not in (2, 3) or xyz.shape[-1] != 3:
+            raise ValueError(
+                "Expected coordinates of shape (n_atoms, 3) or "
+                "(n_frames, n_atoms, 3); got %s" % (xyz.shape,)
+            )
+    if mobile.shape[-2] != reference.shape[-2]:
+        raise ValueError(
+            "Coordinates have unequal numbers of atoms (%d and %d)"
+            % (mobile.shape[-2], reference.shape[-2])
+        )
+    n = mobile.shape[-2]
+    if n == 0:
+        raise ValueError("Cannot compare zero atoms")
+    if weights is None:
+        return mobile, reference, np.full(n, 1.0 / n)
+    weights = np.asarray(weights, dtype=float)
+    if weights.shape != (n,):
+        raise ValueError(
+            "weights must have one value per atom (%d); got shape %s"
+            % (n, weights.shape)
+        )
+    if not (np.isfinite(weights).all() and (weights >= 0).all()):
+        raise ValueError("weights must be finite and non-negative")
+    if not weights.sum() > 0:
+        raise ValueError("weights must not all be zero")
+    return mobile, reference, weights / weights.sum()
+
+
+def rmsd_matrix(
+    frames, superpose=False, weights=None, chunk_size=256, workers=1
+):
+    """Compute the (weighted) RMSD between all pairs of frames of a stack of
+    coordinates, e.g. the models of an NMR ensemble or conformers.
+
+    Parameters
+    ----------
+    frames : array-like, shape (n_frames, n_atoms, 3)
+        Coordinates of the same atoms in each frame.
+
+    superpose : bool, default: False
+        If True, computes the RMSD of each pair after optimal superposition.
+        The minimal RMSD is obtained from the singular values of the
+        covariance matrix of the pair, without rotating any coordinates.
+
+    weights : array-like, shape (n_atoms,), or None, default: None
+        Non-negative weight of each atom. Uniform if None.
+
+    chunk_size : int, default: 256
+        Number of frames per block. The matrix is computed in blocks of
+        `chunk_size` x `chunk_size` pairs, which bounds the memory used
+        besides the result.
+
+    workers : int or None, default: 1
+        Number of worker processes that compute the blocks. Uses
+        `os.cpu_count()` processes if None, and computes all blocks in the
+        current process if `workers` is 0 or 1 or if there is only a single
+        block.
+
+    Returns
+    ---------
+    numpy.ndarray, shape (n_frames, n_frames) : Symmetric RMSD matrix with
+        zeros on the diagonal.
+
+    Examples
+    ---------
+    >>> coords, topology = ppdb.to_coordinate_array()
+    >>> rmsd = rmsd_matrix(coords, superpose=True, workers=4)
+
+    """
+    frames = np.asarray(frames, dtype=float)
+    if frames.ndim != 3 or frames.shape[-1] != 3:
+        raise ValueError(
+            "Expected coordinates of shape (n_frames, n_atoms, 3); got %s"
+            % (frames.shape,)
+        )
+    if not chunk_size >= 1:
+        raise ValueError(f"chunk_size must be positive; got {chunk_size}")
+    n_frames = len(frames)
+    if n_frames == 0:
+        return np.zeros((0, 0))
+    _, _, weights = _check(frames[0], frames[0], weights)
+    if superpose:
+        frames = frames - np.einsum("fij,i->fj", frames, weights)[:, None]
+    else:
+        # centering all frames at the same point limits the rounding error
+        frames = frames - np.einsum("fij,i->j", frames, weights) / n_frames
+    # with weights summing to 1, the squared RMSD is the squared distance
+    # between the frames scaled by the square roots of the weights
+    scaled = frames * np.sqrt(weights)[:, None]
+
+    chunk_size = int(chunk_size)
+    starts = range(0, n_frames, chunk_size)
+    blocks = [(a, b) for a in starts for b in starts if b >= a]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    out = np.empty((n_frames, n_frames))
+    if workers <= 1 or len(blocks) == 1:
+        results = (
+            _rmsd_block(scaled, a, b, chunk_size, superpose) for a, b in blocks
+        )
+        for (a, b), block in zip(blocks, results):
+            _fill(out, a, b, block)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(scaled,)
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _rmsd_block, None, a, b, chunk_size, superpose
+                ): (a, b)
+                for a, b in blocks
+            }
+            for future in as_completed(futures):
+                _fill(out, *futures[future], future.result())
+    np.fill_diagonal(out, 0.0)
+    return out
+
+
+def model_rmsd_matrix(
+    structure,
+    s=None,
+    invert=False,
+    records=("ATOM", "HETATM"),
+    superpose=False,
+    weights=None,
+    chunk_size=256,
+    workers=1,
+):
+    """Compute the RMSD between all pairs of models of a `PandasPdb`,
+    `PandasMmcif` or `PandasMmtf` object, as their `rmsd_matrix` methods.
+
+    The atoms are selected with `structure.get(s, ...)` on the topology of
+    `structure.to_coordinate_array(records)`, and the named weights column
+    is taken from it; the other arguments are passed to `rmsd_matrix`.
+
+    """
+    coords, topology = structure.to_coordinate_array(records)
+    if isinstance(weights, str):
+        weights = topology[weights].to_numpy(dtype=float)
+    elif weights is not None:
+        weights = np.asarray(weights, dtype=float)
+    if s is not None:
+        rows = structure.get(s, df=topology, invert=invert).index.to_numpy()
+        coords = coords[:, rows]
+        if weights is not None and weights.shape == (len(topology),):
+            weights = weights[rows]
+    return rmsd_matrix(coords, superpose, weights, chunk_size, workers)
+
+
+# coordinates of the frames in a worker process of `rmsd_matrix`
+_FRAMES = None
+
+
+def _init_worker(frames):
+    global _FRAMES
+    _FRAMES = frames
+
+
+def _rmsd_block(frames, a, b, chunk_size, superpose):
+    """Return the RMSD between the frames `a` to `a + chunk_size` and the
+    frames `b` to `b + chunk_size` of the scaled coordinates."""
+    if frames is None:
+        frames = _FRAMES
+    left, right = frames[a : a + chunk_size], frames[b : b + chunk_size]
+    n_left, n_right, n_atoms = len(left), len(right), frames.shape[1]
+    sq_left = (left**2).sum(axis=(1, 2))
+    sq_right = (right**2).sum(axis=(1, 2))
+    if superpose:
+        # covariance matrices of all pairs with a single matrix product
+        covariance = (
+            left.transpose(0, 2, 1).reshape(n_left * 3, n_atoms)
+            @ right.transpose(1, 0, 2).reshape(n_atoms, n_right * 3)
+        ).reshape(n_left, 3, n_right, 3)
+        covariance = covariance.transpose(0, 2, 1, 3)
+        singular = np.linalg.svd(covariance, compute_uv=False)
+        # the smallest singular value is subtracted if the optimal
+        # orthogonal matrix is a reflection
+        singular[..., 2] *= np.sign(np.linalg.det(covariance))
+        cross = singular.sum(axis=-1)
+    else:
+        cross = left.reshape(n_left, -1) @ right.reshape(n_right, -1).T
+    sq_rmsd = sq_left[:, None] + sq_right[None, :] - 2.0 * cross
+    np.maximum(sq_rmsd, 0.0, out=sq_rmsd)
+    return np.sqrt(sq_rmsd, out=sq_rmsd)
+
+
+def _fill(out, a, b, block):
+    """Write a block of the RMSD matrix and its transpose."""
+    if a == b:
+        # mirror the upper triangle so that the matrix is exactly symmetric
+        block = np.triu(block) + np.triu(block, 1).T
+    out[a : a + block.shape[0], b : b + block.shape[1]] = block
+    out[b : b + block.shape[1], a : a + block.shape[0]] = block.T
+
+
+def match_atoms(df1, df2, keys):
+    """Match the atoms of two DataFrames by the values of key columns.
+
+    The atoms are matched with a hash join: the key values of both
+    DataFrames are factorized together, so that each atom is identified by
+    a single integer code. Missing values match missing values.
+
+    Parameters
+    ----------
+    df1, df2 : pandas.DataFrame
+        Atoms to match, in any order.
+
+    keys : list of str
+        Columns that identify an atom, e.g.
+        `['chain_id', 'residue_number', 'insertion', 'atom_name', 'alt_loc']`.
+
+    Returns
+    ---------
+    rows1, rows2 : numpy.ndarray
+        Row numbers of the matched atoms in `df1` and `df2`, in the order of
+        `df1`.
+
+    unmatched : pandas.DataFrame
+        The rows of `df1` without a match in `df2`, followed by the rows of
+        `df2` without a match in `df1`, with a `missing_from` column that is
+        'df2' or 'df1', respectively.
+
+    Raises a ValueError if the keys of the atoms of a DataFrame are not
+    unique.
+
+    """
+    keys = list(keys)
+    if not keys:
+        raise ValueError("At least one key column is required")
+    n1 = len(df1)
+    codes = np.zeros(n1 + len(df2), dtype=np.int64)
+    for key in keys:
+        values = np.concatenate(
+            [
+                np.asarray(df1[key], dtype=object),
+                np.asarray(df2[key], dtype=object),
+            ]
+        )
+        column, uniques = pd.factorize(values)
+        # missing values are factorized as -1
+        column = np.where(column < 0, len(uniques), column)
+        codes, _ = pd.factorize(codes * (len(uniques) + 1) + column)
+    codes1, codes2 = codes[:n1], codes[n1:]
+    for name, part in (("df1", codes1), ("df2", codes2)):
+        if len(np.unique(part)) < len(part):
+            raise ValueError(
+                "The keys %s do not identify the atoms of %s uniquely; "
+                "add key columns, e.g. 'alt_loc', or select a single "
+                "alternate location" % (keys, name)
+            )
+
+    position = np.full(len(codes1) + len(codes2), -1, dtype=np.intp)
+    position[codes2] = np.arange(len(codes2))
+    match = position[codes1]
+    rows1 = np.flatnonzero(match >= 0)
+    rows2 = match[rows1]
+    found2 = np.zeros(len(codes2), dtype=bool)
+    found2[rows2] = True
+    unmatched = pd.concat(
+        [
+            df1.iloc[np.flatnonzero(match < 0)].assign(missing_from="df2"),
+            df2.iloc[np.flatnonzero(~found2)].assign(missing_from="df1"),
+        ]
+    )
+    return rows1, rows2, unmatched
+
+
+def matched_rmsd(
+    df1, df2, coord_columns, keys, select=None, weights=None, superpose=False
+):
+    """Compute the RMSD between the atoms of two DataFrames that are matched
+    by key columns with `match_atoms`.
+
+    Parameters
+    ----------
+    df1, df2 : pandas.DataFrame
+        Atoms to compare, in any order and possibly with missing atoms.
+
+    coord_columns : list of str
+        Names of the x, y and z coordinate columns.
+
+    keys : list of str
+        Columns that identify an atom.
+
+    select : callable or None, default: None
+        Function that returns the selected rows of a DataFrame. Only the
+        selected atoms are matched. All atoms if None.
+
+    weights : str, array-like or None, default: None
+        Name of a column of `df1`, or one weight per row of `df1`.
+
+    superpose : bool, default: False
+        If True, superposes the matched atoms of `df1` onto those of `df2`.
+
+    Returns
+    ---------
+    rmsd : float
+        RMSD between the matched atoms.
+
+    unmatched : pandas.DataFrame
+        The selected atoms without a match; see `match_atoms`.
+
+    """
+    if isinstance(weights, str):
+        weights = df1[weights].to_numpy(dtype=float)
+    elif weights is not None:
+        weights = np.asarray(weights, dtype=float)
+        if weights.shape != (len(df1),):
+            raise ValueError(
+                "weights must have one value per atom (%d); got shape %s"
+                % (len(df1), weights.shape)
+            )
+    rows1 = np.arange(len(df1))
+    if select is not None:
+        rows1 = select(df1.reset_index(drop=True)).index.to_numpy()
+        df1, df2 = df1.iloc[rows1], select(df2)
+    match1, match2, unmatched = match_atoms(df1, df2, keys)
+    mobile = df1[list(coord_columns)].to_numpy(dtype=float)[match1]
+    reference = df2[list(coord_columns)].to_numpy(dtype=float)[match2]
+    if weights is not None:
+        weights = weights[rows1[match1]]
+    rmsd = coordinate_rmsd(mobile, reference, weights, superpose=superpose)
+    return rmsd, unmatched
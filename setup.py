@@ -34,7 +34,9 @@ setup(name='biopandas',
                     },
       include_package_data=True,
       install_requires=install_reqs,
-      extras_require={'test': ['pytest', 'pytest-cov','flake8'],},
+      extras_require={'test': ['pytest', 'pytest-cov','flake8'],
+                      'cache': ['pyarrow'],
+                      'sparse': ['scipy'],},
       license='BSD 3-Clause',
       platforms='any',
       classifiers=[
@@ -0,0 +1,222 @@
+# BioPandas
+# License: BSD 3 clause
+# Project Website: http://rasbt.github.io/biopandas/
+# Code Repository: https://github.com/rasbt/biopandas
+import gzip
+import random
+import sys
+
+if sys.version_info >= (3, 9):
+    import importlib.resources as pkg_resources
+else:
+    import importlib_resources as pkg_resources
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+import tests.mmcif.data
+from biopandas.mmcif import PandasMmcif
+from biopandas.mmcif.engines import mmcif_col_types
+from biopandas.mmcif.mmcif_parser import (
+    fast_split,
+    load_cif_data,
+    raw_category,
+    select_categories,
+    special_split,
+)
+
+TEST_DATA = pkg_resources.files(tests.mmcif.data)
+
+CIF_FILES = sorted(
+    path.name
+    for path in TEST_DATA.iterdir()
+    if path.name.endswith((".cif", ".cif.gz"))
+)
+
+
+def read_text(name):
+    path = str(TEST_DATA.joinpath(name))
+    if path.endswith(".gz"):
+        with gzip.open(path, "rt") as f:
+            return f.read()
+    with open(path) as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("name", CIF_FILES)
+def test_parsers_agree(name):
+    text = read_text(name)
+    expect = load_cif_data(text, parser="python")
+    assert load_cif_data(text, parser="fast") == expect
+    assert load_cif_data(text.splitlines(True), parser="fast") == expect
+    assert load_cif_data(text, do_clean=False, parser="fast") == (
+        load_cif_data(text, do_clean=False, parser="python")
+    )
+
+
+def test_fast_split():
+    lines = [
+        "ATOM 1 C \"C5'\" A 1 'a b' 1.0",
+        "_a.b 'x'y' \"#\" # comment",
+        "x'y 'a''b' '' z'",
+        "a\tb \x0bc\xa0d",
+        "'_name' loop_ \"",
+    ]
+    for line in lines:
+        assert fast_split(line) == special_split(line), line
+
+    rng = random.Random(0)
+    chars = ["a", "_", " ", "\t", "'", '"', "#", "\x0c"]
+    for _ in range(20000):
+        line = "".join(rng.choice(chars) for _ in range(rng.randint(0, 10)))
+        line = line.strip()
+        assert fast_split(line) == special_split(line), repr(line)
+
+
+def test_loops():
+    text = "\n".join(
+        [
+            "data_test",
+            "loop_",
+            "_a.x",
+            "_a.y",
+            "1 2 3",
+            "4 '5 6'",
+            '"O5\'" 7 stop_',
+            "_b.z 8",
+            "loop_",
+            "_c.u",
+            "_c.u",
+            "1 2 3 4",
+            ";",
+            "text",
+            ";",
+            "loop_",
+            "_d.v",
+            "_d.w",
+            "'_v' loop_",
+        ]
+    )
+    expect = load_cif_data(text, parser="python")
+    assert load_cif_data(text, parser="fast") == expect
+    assert expect["data_test"]["a"]["y"] == ["2", "4", "O5'"]
+    assert expect["data_test"]["c"]["u"] == ["1", "2", "3", "4", "\ntext"]
+
+
+def test_read_mmcif_parser():
+    path = str(TEST_DATA.joinpath("3eiy.cif"))
+    fast = PandasMmcif().read_mmcif(path)
+    python = PandasMmcif().read_mmcif(path, parser="python")
+    for r in ("ATOM", "HETATM", "ANISOU"):
+        assert_frame_equal(fast.df[r], python.df[r])
+    with pytest.raises(ValueError):
+        PandasMmcif().read_mmcif(path, parser="regex")
+
+
+@pytest.mark.parametrize("name", CIF_FILES)
+def test_categories(name):
+    text = read_text(name)
+    full = load_cif_data(text, do_clean=False)
+    block = list(full)[0]
+    names = list(full[block])
+    rng = random.Random(0)
+    for _ in range(4):
+        selected = rng.sample(names, rng.randint(0, len(names)))
+        expect = {k: v for k, v in full[block].items() if k in selected}
+        for parser in ("fast", "python"):
+            data = load_cif_data(
+                text, do_clean=False, parser=parser, categories=selected
+            )
+            assert data == {block: expect}
+
+
+def test_select_categories():
+    lines = [
+        "data_test",
+        "_a.x 1",
+        "_b.y",
+        ";",
+        "_a.z text",
+        ";",
+        "loop_",
+        "_b.u",
+        "_b.v",
+        "1 2",
+        "loop_ _a.w",
+        "3",
+        "_b.t 'x'",
+    ]
+    assert list(select_categories(lines, ["a"])) == [
+        "data_test",
+        "_a.x 1",
+        "loop_ _a.w",
+        "3",
+    ]
+    data = load_cif_data("\n".join(lines), categories=["b"])
+    assert data == {
+        "data_test": {
+            "b": {"y": ["\n_a.z text"], "u": ["1"], "v": ["2"], "t": ["x"]}
+        }
+    }
+
+
+def test_read_mmcif_categories():
+    path = str(TEST_DATA.joinpath("3eiy.cif"))
+    expect = PandasMmcif().read_mmcif(path)
+    pdbx = PandasMmcif().read_mmcif(path, categories=["struct_conn"])
+    assert set(pdbx.data) == {
+        "entry",
+        "atom_site",
+        "struct_conn",
+    }
+    assert pdbx.data["struct_conn"] == expect.data["struct_conn"]
+    assert pdbx.code == "3eiy"
+    for r in ("ATOM", "HETATM", "ANISOU"):
+        assert_frame_equal(pdbx.df[r], expect.df[r])
+    pdbx = PandasMmcif().read_mmcif(path, records=["ATOM"], categories=())
+    assert set(pdbx.data) == {"entry", "atom_site"}
+
+
+@pytest.mark.parametrize("name", CIF_FILES)
+def test_category_to_df(name):
+    text = read_text(name)
+    data = load_cif_data(text, lazy=True)
+    data = data[list(data)[0]]
+    atom_site = raw_category(data, "atom_site")
+    assert not data.is_loaded("atom_site")
+    assert "?" in atom_site["pdbx_formal_charge"]
+
+    df = PandasMmcif._category_to_df(atom_site, mmcif_col_types)
+    expect = pd.DataFrame.from_dict(data["atom_site"], orient="index")
+    expect = expect.transpose()
+    expect = expect.astype(
+        {k: v for k, v in mmcif_col_types.items() if k in expect},
+        errors="ignore",
+    )
+    assert_frame_equal(df, expect, check_exact=True)
+    # the cleaned values of an accessed category give the same DataFrame
+    assert raw_category(data, "atom_site") is data["atom_site"]
+    assert_frame_equal(
+        PandasMmcif._category_to_df(data["atom_site"], mmcif_col_types), df
+    )
+
+
+def test_category_to_df_missing():
+    category = {
+        "id": ["1", "2", "3"],
+        "label_seq_id": ["1", ".", "3"],
+        "label_alt_id": ["A", "?", "."],
+        "occupancy": ["1.0", "?", "0.5"],
+        "type_symbol": ["C", "?", "N"],
+        "other": ["x", ".", ""],
+    }
+    df = PandasMmcif._category_to_df(category, mmcif_col_types)
+    assert df["id"].dtype == "int64"
+    assert df["id"].tolist() == [1, 2, 3]
+    assert df["label_seq_id"].tolist() == ["1", None, "3"]
+    assert df["label_alt_id"].tolist() == ["A", None, None]
+    assert df["occupancy"].tolist()[::2] == [1.0, 0.5]
+    assert df["occupancy"].isnull().tolist() == [False, True, False]
+    assert df["type_symbol"].tolist() == ["C", "None", "N"]
+    assert df["other"].tolist() == ["x", None, None]
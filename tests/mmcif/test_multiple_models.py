@@ -11,6 +11,9 @@ if sys.version_info >= (3, 9):
 else:
     import importlib_resources as pkg_resources
 
+import numpy as np
+from pandas.testing import assert_frame_equal
+
 import tests.mmcif.data
 from biopandas.mmcif import PandasMmcif
 
@@ -44,3 +47,29 @@ def test_get_models():
         new_biopandas_structure.df["ATOM"]["pdbx_PDB_model_num"].all()
         in MODEL_INDICES
     )
+
+
+def test_coordinate_array():
+    structure = PandasMmcif().read_mmcif(TESTDATA_FILENAME)
+    coords, topology = structure.to_coordinate_array()
+    assert coords.shape == (10, len(topology), 3)
+    atoms = structure.get_model(10).df["ATOM"]
+    np.testing.assert_array_equal(coords[9], atoms[["Cartn_x", "Cartn_y", "Cartn_z"]].to_numpy())
+
+    ensemble = PandasMmcif.from_coordinate_array(coords, topology)
+    assert_frame_equal(
+        ensemble.df["ATOM"], structure.df["ATOM"].reset_index(drop=True)
+    )
+
+
+def test_rmsd_matrix():
+    structure = PandasMmcif().read_mmcif(TESTDATA_FILENAME)
+    rmsd = structure.rmsd_matrix(s="heavy", superpose=True)
+    assert rmsd.shape == (10, 10)
+    expect = PandasMmcif.rmsd(
+        structure.get_model(1).df["ATOM"],
+        structure.get_model(7).df["ATOM"],
+        s="heavy",
+        superpose=True,
+    )
+    assert round(rmsd[0, 6], 4) == expect
@@ -323,6 +323,20 @@ def test_get_df():
     assert shape == (857, 21), shape
 
 
+def test_get_selection():
+    ppdb = PandasMmcif()
+    ppdb.read_mmcif(TESTDATA_FILENAME)
+
+    shape = ppdb.get("chain A and resi 10-50 and name CA").shape
+    assert shape == (41, 21), shape
+
+    shape = ppdb.get("resn HOH and within 3.5 of resn POP").shape
+    assert shape == (7, 21), shape
+
+    shape = ppdb.get("b > 30 and not elem O").shape
+    assert shape == (365, 21), shape
+
+
 def test_mmcif_pdb_conversion():
     """Tests conversion from mmCIF df to PDB df"""
     # Multichain test
@@ -352,3 +366,50 @@ def test_mmcif_pdb_conversion():
         pdb.df["HETATM"].drop(columns=["line_idx"]),
         mmcif_pdb.df["HETATM"].drop(columns=["line_idx"]).reset_index(drop=True),
     )
+
+
+def test_read_mmcif_columns_records():
+    """Test column projection and record filtering in read_mmcif"""
+    columns = ("auth_atom_id", "Cartn_x", "Cartn_y", "Cartn_z")
+    full = PandasMmcif().read_mmcif(TESTDATA_FILENAME)
+    pmmcif = PandasMmcif().read_mmcif(
+        TESTDATA_FILENAME, columns=columns, records=("HETATM",)
+    )
+    assert set(pmmcif.df.keys()) == {"HETATM"}
+    assert set(pmmcif.df["HETATM"].columns) == set(columns)
+    assert_frame_equal(
+        pmmcif.df["HETATM"], full.df["HETATM"][pmmcif.df["HETATM"].columns]
+    )
+    assert pmmcif.code == "3eiy"
+
+
+def test_read_mmcif_memory_map():
+    """Test parsing mmCIF files line by line from memory-mapped buffers"""
+    for path in (TESTDATA_FILENAME, TESTDATA_FILENAME_GZ):
+        expect = PandasMmcif().read_mmcif(path)
+        pmmcif = PandasMmcif().read_mmcif(path, memory_map=True, keep_text=False)
+        assert pmmcif.pdb_text == ""
+        assert pmmcif.code == expect.code
+        for r in expect.df:
+            assert_frame_equal(pmmcif.df[r], expect.df[r])
+
+
+def test_read_mmcif_compact():
+    expect = PandasMmcif().read_mmcif(TESTDATA_FILENAME)
+    pdb = PandasMmcif().read_mmcif(TESTDATA_FILENAME, compact=True)
+    assert pdb.df["ATOM"]["Cartn_x"].dtype == "float32"
+    assert pdb.df["ATOM"]["label_comp_id"].dtype == "category"
+    assert PandasMmcif.rmsd(pdb.df["ATOM"], expect.df["ATOM"]) < 1e-4
+    assert pdb.amino3to1()["auth_comp_id"].tolist() == (
+        expect.amino3to1()["auth_comp_id"].tolist()
+    )
+
+
+def test_read_mmcif_lazy_sections():
+    pdb = PandasMmcif().read_mmcif(TESTDATA_FILENAME)
+    assert not pdb.df.is_loaded("ATOM") and not pdb.df.is_loaded("HETATM")
+    assert not pdb.data.is_loaded("atom_site")
+    assert pdb.df["ATOM"].shape[0] == 1330
+    assert pdb.df.is_loaded("HETATM")
+    assert not pdb.df.is_loaded("ANISOU")
+    assert not pdb.data.is_loaded("struct")
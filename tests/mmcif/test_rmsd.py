@@ -80,3 +80,29 @@ def test_rna_and_nonmatching_indices():
 # def test_ligand_default():
 #    r = PandasMmcif.rmsd(pl1.df["HETATM"], pl2.df["HETATM"], s=None)
 #    assert r == 2.6444, r
+
+
+def test_superpose():
+    df1, df2 = p1t48.df["ATOM"], p1t49.df["ATOM"]
+    r = PandasMmcif.rmsd(df1, df2, s="c-alpha")
+    fitted = PandasMmcif.rmsd(df1, df2, s="c-alpha", superpose=True)
+    assert fitted <= r, (fitted, r)
+    assert PandasMmcif.rmsd(df1, df2, s="c-alpha", decimals=1) == round(r, 1)
+
+    rotation, translation, moved = PandasMmcif.superpose(df1, df2)
+    assert rotation.shape == (3, 3) and translation.shape == (3,)
+    assert PandasMmcif.rmsd(moved, df2) == PandasMmcif.rmsd(
+        df1, df2, superpose=True
+    )
+    weighted = PandasMmcif.rmsd(df1, df2, weights="B_iso_or_equiv")
+    assert weighted > 0.0
+
+
+def test_matched_rmsd():
+    df1, df2 = p1t48.df["ATOM"], p1t49.df["ATOM"]
+    shuffled = df2.sample(frac=1.0, random_state=0)
+    r, unmatched = PandasMmcif.matched_rmsd(df1, shuffled, s="c-alpha")
+    assert r == PandasMmcif.rmsd(df1, df2, s="c-alpha")
+    assert len(unmatched) == 0
+    r, _ = PandasMmcif.matched_rmsd(df1, shuffled, s="c-alpha", decimals=1)
+    assert r == PandasMmcif.rmsd(df1, df2, s="c-alpha", decimals=1)
@@ -59,3 +59,29 @@ def test_use_external_df():
         [2.533259, 1.520502, 0.000000, 1.257597], index=[12, 13, 14, 15]
     )
     assert dist[dist < 3].all() == expect.all()
+
+
+def test_multiple_points():
+    TESTDATA_1t48 = str(TEST_DATA.joinpath("1t48.mmtf"))
+
+    p1t48 = PandasMmtf()
+    p1t48.read_mmtf(TESTDATA_1t48)
+    points = p1t48.df["HETATM"][["x_coord", "y_coord", "z_coord"]].to_numpy()[:20]
+    dist = p1t48.distance(xyz=points, records=("ATOM",))
+
+    assert dist.shape == (len(p1t48.df["ATOM"]), 20)
+    for j in (0, 19):
+        expect = p1t48.distance(xyz=points[j], records=("ATOM",))
+        pd.testing.assert_series_equal(dist[j], expect, check_names=False)
+    pd.testing.assert_frame_equal(
+        PandasMmtf.distance_df(p1t48.df["ATOM"], xyz=points), dist
+    )
+
+    reduced = p1t48.distance(xyz=points, records=("ATOM",), reduce="min")
+    pd.testing.assert_series_equal(reduced, dist.min(axis=1))
+    reduced = p1t48.distance(xyz=points, records=("ATOM",), reduce="argmin")
+    assert (reduced == dist.idxmin(axis=1)).all()
+    reduced = PandasMmtf.distance_df(
+        p1t48.df["ATOM"], xyz=points, reduce="count", cutoff=10.0
+    )
+    assert (reduced == (dist <= 10.0).sum(axis=1)).all()
@@ -13,6 +13,7 @@ else:
     import importlib_resources as pkg_resources
 import os
 
+import numpy as np
 from pandas.testing import assert_frame_equal
 
 import tests.mmtf.data
@@ -58,3 +59,29 @@ def test_get_models():
 
     # Clean
     os.remove("test.mmtf")
+
+
+def test_coordinate_array():
+    structure = PandasMmtf().read_mmtf(TESTDATA_FILENAME)
+    coords, topology = structure.to_coordinate_array()
+    assert coords.shape == (10, len(topology), 3)
+    atoms = structure.get_model(10).df["ATOM"]
+    np.testing.assert_array_equal(coords[9], atoms[["x_coord", "y_coord", "z_coord"]].to_numpy())
+
+    ensemble = PandasMmtf.from_coordinate_array(coords, topology)
+    assert_frame_equal(
+        ensemble.df["ATOM"], structure.df["ATOM"].reset_index(drop=True)
+    )
+
+
+def test_rmsd_matrix():
+    structure = PandasMmtf().read_mmtf(TESTDATA_FILENAME)
+    rmsd = structure.rmsd_matrix(s="heavy", superpose=True)
+    assert rmsd.shape == (10, 10)
+    expect = PandasMmtf.rmsd(
+        structure.get_model(1).df["ATOM"],
+        structure.get_model(7).df["ATOM"],
+        s="heavy",
+        superpose=True,
+    )
+    assert round(rmsd[0, 6], 4) == expect
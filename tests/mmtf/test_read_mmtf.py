@@ -102,3 +102,20 @@ def test_read_mmtf():
     ppdb = PandasMmtf()
     ppdb.read_mmtf(MMTF_TESTDATA_FILENAME)
     assert ppdb.mmtf_path == MMTF_TESTDATA_FILENAME
+
+
+def test_get_selection():
+    pmmtf = PandasMmtf().read_mmtf(MMTF_TESTDATA_FILENAME)
+    ppdb = PandasPdb().read_pdb(PDB_TESTDATA_FILENAME)
+    for s in [
+        "c-alpha",
+        "chain A and resi 10-50 and name CA+CB",
+        "resn HOH and within 3.5 of resn POP",
+        "b > 30 and not elem O",
+    ]:
+        # the atom numbers differ, since the PDB file has a TER record
+        columns = ["chain_id", "residue_number", "atom_name"]
+        assert (
+            pmmtf.get(s)[columns].values.tolist()
+            == ppdb.get(s)[columns].values.tolist()
+        ), s
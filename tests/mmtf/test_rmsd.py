@@ -84,3 +84,30 @@ def test_rna_and_nonmatching_indices():
 # def test_ligand_default():
 #    r = PandasMmtf.rmsd(pl1.df["HETATM"], pl2.df["HETATM"], s=None)
 #    assert r == 2.6444, r
+
+
+def test_superpose():
+    df1, df2 = p1t48.df["ATOM"], p1t49.df["ATOM"]
+    r = PandasMmtf.rmsd(df1, df2, s="c-alpha")
+    fitted = PandasMmtf.rmsd(df1, df2, s="c-alpha", superpose=True)
+    assert fitted <= r, (fitted, r)
+    assert PandasMmtf.rmsd(df1, df2, s="c-alpha", decimals=1) == round(r, 1)
+
+    rotation, translation, moved = PandasMmtf.superpose(df1, df2)
+    assert rotation.shape == (3, 3) and translation.shape == (3,)
+    assert PandasMmtf.rmsd(moved, df2) == PandasMmtf.rmsd(
+        df1, df2, superpose=True
+    )
+    weighted = PandasMmtf.rmsd(df1, df2, weights="b_factor")
+    assert weighted > 0.0
+
+
+def test_matched_rmsd():
+    df1, df2 = p1t48.df["ATOM"], p1t49.df["ATOM"]
+    shuffled = df2.sample(frac=1.0, random_state=0)
+    missing = shuffled.index[:1]
+    r, unmatched = PandasMmtf.matched_rmsd(df1, shuffled.iloc[1:])
+    assert r == PandasMmtf.rmsd(df1.drop(missing), df2.drop(missing))
+    assert list(unmatched.index) == list(missing)
+    r, _ = PandasMmtf.matched_rmsd(df1, shuffled, decimals=1)
+    assert r == PandasMmtf.rmsd(df1, df2, decimals=1)
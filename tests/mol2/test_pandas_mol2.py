@@ -72,6 +72,47 @@ def test_rmsd():
     assert pdmol_1.rmsd(pdmol_1.df, pdmol_2.df) == 1.1609
 
 
+def test_rmsd_superpose():
+    data_path_1 = str(TEST_DATA.joinpath("1b5e_1.mol2"))
+    data_path_2 = str(TEST_DATA.joinpath("1b5e_2.mol2"))
+
+    pdmol_1 = PandasMol2().read_mol2(data_path_1)
+    pdmol_2 = PandasMol2().read_mol2(data_path_2)
+
+    fitted = pdmol_1.rmsd(pdmol_1.df, pdmol_2.df, superpose=True)
+    assert fitted <= 1.1609, fitted
+    rotation, translation, moved = PandasMol2.superpose(pdmol_1.df, pdmol_2.df)
+    assert rotation.shape == (3, 3) and translation.shape == (3,)
+    assert moved.index.equals(pdmol_1.df.index)
+    uniform = [1.0] * len(pdmol_1.df)
+    assert PandasMol2.rmsd(moved, pdmol_2.df, weights=uniform) == fitted
+
+
+def test_rmsd_matrix():
+    data_path_1 = str(TEST_DATA.joinpath("1b5e_1.mol2"))
+    data_path_2 = str(TEST_DATA.joinpath("1b5e_2.mol2"))
+
+    dfs = [
+        PandasMol2().read_mol2(data_path_1).df,
+        PandasMol2().read_mol2(data_path_2).df,
+    ]
+    rmsd = PandasMol2.rmsd_matrix(dfs + dfs[:1], superpose=True)
+    assert rmsd.shape == (3, 3)
+    assert round(rmsd[0, 1], 4) == PandasMol2.rmsd(*dfs, superpose=True)
+    assert rmsd[0, 2] == 0.0
+    uniform = [1.0] * len(dfs[0])
+    rmsd = PandasMol2.rmsd_matrix(dfs, heavy_only=False)
+    assert round(rmsd[0, 1], 4) == PandasMol2.rmsd(
+        *dfs, heavy_only=False, weights=uniform
+    )
+    assert_raises(
+        AttributeError,
+        "DataFrames have unequal lengths",
+        PandasMol2.rmsd_matrix,
+        [dfs[0], dfs[1].iloc[1:]],
+    )
+
+
 def test_distance():
     data_path = str(TEST_DATA.joinpath("1b5e_1.mol2"))
 
@@ -87,6 +128,19 @@ def test_distance_external_df():
     assert round(PandasMol2.distance_df(df=new_df).values[0], 3) == 31.165
 
 
+def test_distance_multiple_points():
+    data_path = str(TEST_DATA.joinpath("1b5e_1.mol2"))
+
+    pdmol = PandasMol2().read_mol2(data_path)
+    points = [(0.0, 0.0, 0.0), (10.0, 20.0, 30.0)]
+    dist = pdmol.distance(xyz=points)
+    assert dist.shape == (len(pdmol.df), 2)
+    assert round(dist[0].values[0], 3) == 31.185
+    assert (dist[1] == pdmol.distance(xyz=points[1])).all()
+    nearest = pdmol.distance(xyz=points, reduce="argmin")
+    assert (nearest == dist.idxmin(axis=1)).all()
+
+
 def test_overwrite_df():
     data_path = str(TEST_DATA.joinpath("1b5e_1.mol2"))
     pdmol = PandasMol2().read_mol2(data_path)
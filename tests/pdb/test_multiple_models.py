@@ -11,6 +11,12 @@ if sys.version_info >= (3, 9):
 else:
     import importlib_resources as pkg_resources
 
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+import pytest
+
 import tests.pdb.data
 from biopandas.pdb import PandasPdb
 
@@ -44,3 +50,90 @@ def test_get_models():
 
     new_df = df.get_models(MODEL_INDICES)
     assert new_df.df["ATOM"]["model_id"].all() in MODEL_INDICES
+
+
+
+def test_get_model_labels():
+    ppdb = PandasPdb().read_pdb(TESTDATA_FILENAME)
+    labeled = PandasPdb().read_pdb(TESTDATA_FILENAME).label_models()
+    atoms = labeled.df["ATOM"]
+    for model_index in (1, 7, 20, 21):
+        model = ppdb.get_model(model_index)
+        expect = atoms.loc[atoms["model_id"] == model_index]
+        pd.testing.assert_frame_equal(model.df["ATOM"], expect)
+
+    # the models do not share their DataFrames with the original structure
+    model.df["ATOM"]["x_coord"] = 0.0
+    model.df["OTHERS"]["entry"] = ""
+    assert "model_id" not in ppdb.df["ATOM"].columns
+    assert (ppdb.df["OTHERS"]["entry"] != "").any()
+
+    models = ppdb.get_models([3, 1])
+    expect = atoms.loc[atoms["model_id"].isin([1, 3])]
+    pd.testing.assert_frame_equal(models.df["ATOM"], expect)
+
+def test_iter_models():
+    ppdb = PandasPdb().read_pdb(TESTDATA_FILENAME)
+    n_models = 0
+    for model_index, model in PandasPdb.iter_models(TESTDATA_FILENAME):
+        expect = ppdb.get_model(model_index)
+        for r in ("ATOM", "HETATM", "ANISOU"):
+            pd.testing.assert_frame_equal(
+                model.df[r].reset_index(drop=True),
+                expect.df[r].reset_index(drop=True),
+            )
+        assert model.code == "2jyf"
+        n_models += 1
+    assert n_models == len(ppdb.get_model_start_end())
+
+
+def test_iter_models_single_model():
+    models = list(PandasPdb.iter_models(str(TEST_DATA.joinpath("3eiy.pdb.gz"))))
+    assert len(models) == 1
+    model_index, model = models[0]
+    assert model_index == 1
+    assert model.code == "3eiy"
+    assert model.df["ATOM"].shape == (1330, 22)
+
+
+def test_coordinate_array():
+    ppdb = PandasPdb().read_pdb(TESTDATA_FILENAME)
+    coords, topology = ppdb.to_coordinate_array()
+    assert coords.shape == (10, len(topology), 3)
+    for model_index in (1, 10):
+        atoms = ppdb.get_model(model_index).df["ATOM"]
+        xyz = atoms[["x_coord", "y_coord", "z_coord"]].to_numpy()
+        np.testing.assert_array_equal(coords[model_index - 1], xyz)
+
+    stream = StringIO()
+    PandasPdb.from_coordinate_array(coords + 1.0, topology).to_pdb(stream)
+    ensemble = PandasPdb().read_pdb_from_list(stream.getvalue().splitlines(True))
+    assert len(ensemble.get_model_start_end()) == 10
+    np.testing.assert_allclose(
+        ensemble.to_coordinate_array()[0], coords + 1.0, atol=1e-3
+    )
+
+    ppdb.df["ATOM"].loc[ppdb.df["ATOM"].index[-1], "atom_name"] = "X"
+    with pytest.raises(ValueError):
+        ppdb.to_coordinate_array()
+    ppdb.df["ATOM"] = ppdb.df["ATOM"].iloc[:-1]
+    with pytest.raises(ValueError):
+        ppdb.to_coordinate_array()
+
+
+def test_rmsd_matrix():
+    ppdb = PandasPdb().read_pdb(TESTDATA_FILENAME)
+    rmsd = ppdb.rmsd_matrix(s="heavy", superpose=True)
+    assert rmsd.shape == (10, 10)
+    model_1 = ppdb.get_model(1).df["ATOM"]
+    model_7 = ppdb.get_model(7).df["ATOM"]
+    expect = PandasPdb.rmsd(model_1, model_7, s="heavy", superpose=True)
+    assert round(rmsd[0, 6], 4) == expect
+    np.testing.assert_array_equal(rmsd, rmsd.T)
+
+    rmsd = ppdb.rmsd_matrix(s="chain A and resi 1-10", weights="b_factor")
+    selected = ppdb.get("chain A and resi 1-10", df=model_1)
+    expect = PandasPdb.rmsd(
+        selected, ppdb.get("chain A and resi 1-10", df=model_7)
+    )
+    assert round(rmsd[0, 6], 4) == expect
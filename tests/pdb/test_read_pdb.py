@@ -5,6 +5,7 @@
 # Code Repository: https://github.com/rasbt/biopandas
 
 
+import gzip
 import sys
 
 if sys.version_info >= (3, 9):
@@ -20,6 +21,7 @@ import pytest
 
 import tests.pdb.data
 from biopandas.pdb import PandasPdb
+from biopandas.pdb.engines import pdb_records
 from tests.testutils import assert_raises
 
 TEST_DATA = pkg_resources.files(tests.pdb.data)
@@ -310,3 +312,233 @@ def test_get_df():
 
     shape = ppdb.get("carbon", records=("ATOM",)).shape
     assert shape == (857, 21), shape
+
+
+def test_get_selection():
+    ppdb = PandasPdb()
+    ppdb.read_pdb(TESTDATA_FILENAME)
+    df = pd.concat([ppdb.df["ATOM"], ppdb.df["HETATM"]])
+
+    sel = ppdb.get("chain A and resi 10-50 and name CA")
+    expect = df[df["residue_number"].between(10, 50) & (df["atom_name"] == "CA")]
+    pd.testing.assert_frame_equal(sel, expect)
+
+    sel = ppdb.get("(resn ALA + GLY or b > 30) and not name CA", invert=True)
+    keep = (df["residue_name"].isin(["ALA", "GLY"]) | (df["b_factor"] > 30)) & (
+        df["atom_name"] != "CA"
+    )
+    pd.testing.assert_frame_equal(sel, df[~keep])
+
+    sel = ppdb.get("MAINCHAIN", records=("ATOM",))
+    pd.testing.assert_frame_equal(sel, ppdb.get("main chain", records=("ATOM",)))
+    assert len(ppdb.get("hetatm and not water")) == 39
+    assert len(ppdb.get("id 1-5+10 or q < 1", df=ppdb.df["ATOM"])) == 6
+
+    # brute-force neighbors of the POP ligand
+    xyz = df[["x_coord", "y_coord", "z_coord"]].to_numpy()
+    pop = xyz[(df["residue_name"] == "POP").to_numpy()]
+    dist = np.sqrt(((xyz[:, None] - pop[None]) ** 2).sum(axis=-1)).min(axis=1)
+    sel = ppdb.get("resn HOH and within 3.5 of resn POP")
+    expect = df[(dist <= 3.5) & (df["residue_name"] == "HOH").to_numpy()]
+    pd.testing.assert_frame_equal(sel, expect)
+    assert len(expect) == 7
+
+
+def test_get_selection_cache(monkeypatch):
+    ppdb = PandasPdb()
+    ppdb.read_pdb(TESTDATA_FILENAME)
+    factorize = pd.factorize
+    calls = []
+
+    def counting_factorize(values, *args, **kwargs):
+        calls.append(values.name)
+        return factorize(values, *args, **kwargs)
+
+    monkeypatch.setattr(pd, "factorize", counting_factorize)
+    assert len(ppdb.get("resn PRO")) == 84
+    assert "residue_name" in ppdb._atom_tables[("ATOM", "HETATM")]._codes
+
+    # the second query reuses the codes of the column
+    assert len(ppdb.get("resn PRO or resn GLY")) == 84 + 56
+    assert calls == ["residue_name"]
+
+    # replaced DataFrames are not looked up in outdated cache entries
+    atoms = ppdb.df["ATOM"]
+    ppdb.df["ATOM"] = atoms[atoms["residue_name"] != "PRO"]
+    assert len(ppdb.get("resn PRO")) == 0
+    ppdb.df["ATOM"] = atoms
+    assert len(ppdb.get("resn PRO")) == 84
+
+    # values modified in place are factorized again
+    ppdb.df["ATOM"].loc[0, "residue_name"] = "PRO"
+    assert ppdb.get("resn PRO").index[0] == 0
+    assert calls == ["residue_name"] * 4
+
+
+def test_get_selection_exceptions():
+    ppdb = PandasPdb()
+    ppdb.read_pdb(TESTDATA_FILENAME)
+    for s in [
+        "chain",
+        "name CA and",
+        "(name CA",
+        "resi A-B",
+        "within of name CA",
+        "within -1 of name CA",
+        "name > 3",
+    ]:
+        with pytest.raises(AttributeError, match="Invalid selection"):
+            ppdb.get(s)
+
+
+def test__lines_to_df_matches_rowwise():
+    """Test that the vectorized parser matches line-by-line slicing"""
+    for pdb_text in (three_eiy, four_eiy):
+        lines = pdb_text.splitlines(True)
+        for record in ("ATOM", "HETATM", "ANISOU"):
+            fields = pdb_records[record]
+            sub = [(i, ln) for i, ln in enumerate(lines) if ln[:6].rstrip() == record]
+            rows = [
+                [ln[f["line"][0] : f["line"][1]].strip() for f in fields] + [i]
+                for i, ln in sub
+            ]
+            expect = PandasPdb._rows_to_df(rows, fields)
+            got = PandasPdb._lines_to_df(
+                [ln for _, ln in sub], [i for i, _ in sub], fields
+            )
+            pd.testing.assert_frame_equal(expect, got)
+
+
+def test__lines_to_df_non_ascii_fallback():
+    """Test that non-ASCII lines fall back to line-by-line slicing"""
+    line = three_eiy.splitlines(True)[609]
+    line = line[:72] + "Ä" + line[73:]
+    df = PandasPdb._lines_to_df([line], [0], pdb_records["ATOM"])
+    assert df.loc[0, "segment_id"] == "Ä"
+    assert df.loc[0, "x_coord"] == 2.527
+
+
+def test_read_pdb_columns_records():
+    """Test column projection and record filtering in read_pdb"""
+    columns = ("atom_name", "x_coord", "y_coord", "z_coord")
+    full = PandasPdb().read_pdb(TESTDATA_FILENAME)
+    ppdb = PandasPdb().read_pdb(
+        TESTDATA_FILENAME, columns=columns, records=("ATOM", "OTHERS")
+    )
+    assert set(ppdb.df.keys()) == {"ATOM", "OTHERS"}
+    assert list(ppdb.df["ATOM"].columns) == list(columns) + ["line_idx"]
+    pd.testing.assert_frame_equal(
+        ppdb.df["ATOM"], full.df["ATOM"][list(columns) + ["line_idx"]]
+    )
+    assert ppdb.code == "3eiy"
+
+    ppdb = PandasPdb().read_pdb_from_list(
+        four_eiy.splitlines(True), records=("ANISOU",)
+    )
+    assert set(ppdb.df.keys()) == {"ANISOU"}
+    assert ppdb.code == ""
+
+
+def test_read_pdb_columns_records_raises():
+    expect = "Unknown columns ['xcoord']"
+    assert_raises(
+        ValueError, expect, PandasPdb().read_pdb, TESTDATA_FILENAME, columns=["xcoord"]
+    )
+    expect = "Unknown record sections ['TER']"
+    assert_raises(
+        ValueError, expect, PandasPdb().read_pdb, TESTDATA_FILENAME, records=["TER"]
+    )
+
+
+def test_read_pdb_memory_map():
+    """Test parsing PDB files from memory-mapped bytes buffers"""
+    for path in (TESTDATA_FILENAME, TESTDATA_FILENAME2, TESTDATA_FILENAME_GZ):
+        expect = PandasPdb().read_pdb(path)
+        ppdb = PandasPdb().read_pdb(path, memory_map=True)
+        assert ppdb.pdb_text == expect.pdb_text
+        assert ppdb.code == expect.code
+        for r in expect.df:
+            pd.testing.assert_frame_equal(ppdb.df[r], expect.df[r])
+
+    ppdb = PandasPdb().read_pdb(TESTDATA_FILENAME, memory_map=True, keep_text=False)
+    assert ppdb.pdb_text == ""
+    assert ppdb.code == "3eiy"
+
+
+def test_read_pdb_memory_map_crlf(tmp_path):
+    """Test that CRLF line breaks are translated by both engines"""
+    data = three_eiy.replace("\n", "\r\n").encode("ascii")
+    paths = [str(tmp_path / "crlf.pdb"), str(tmp_path / "crlf.pdb.gz")]
+    with open(paths[0], "wb") as f:
+        f.write(data)
+    with gzip.open(paths[1], "wb") as f:
+        f.write(data)
+    expect = PandasPdb().read_pdb(TESTDATA_FILENAME)
+    for path in paths:
+        for memory_map in (False, True):
+            ppdb = PandasPdb().read_pdb(path, memory_map=memory_map)
+            assert ppdb.pdb_text == three_eiy
+            for r in expect.df:
+                pd.testing.assert_frame_equal(ppdb.df[r], expect.df[r])
+
+
+def test__construct_df_from_buffer_fallback():
+    """Test that non-ASCII buffers are parsed like decoded text"""
+    text = three_eiy.replace("REMARK   2", "REMARK   2 Å", 1)
+    expect = PandasPdb._construct_df(text.splitlines(True))
+    dfs = PandasPdb._construct_df_from_buffer(text.encode("utf-8"))
+    for r in expect:
+        pd.testing.assert_frame_equal(dfs[r], expect[r])
+
+
+def test__construct_df_from_buffer_malformed():
+    """Test that both engines keep malformed record lines in OTHERS"""
+    lines = three_eiy.splitlines(True)
+    idx = next(i for i, line in enumerate(lines) if line.startswith("ATOM"))
+    lines[idx] = "ATOM100000" + lines[idx][10:]
+    text = "".join(lines)
+    for records in (None, ("ATOM", "OTHERS")):
+        expect = PandasPdb._construct_df(text.splitlines(True), records=records)
+        dfs = PandasPdb._construct_df_from_buffer(
+            text.encode("ascii"), records=records
+        )
+        assert list(dfs) == list(expect)
+        for r in expect:
+            pd.testing.assert_frame_equal(dfs[r], expect[r])
+        others = expect["OTHERS"]
+        assert others["record_name"].tolist().count("ATOM10") == 1
+        assert others.loc[others["record_name"] == "ATOM10", "line_idx"].item() == idx
+
+
+def test_read_pdb_compact():
+    """Test parsing PDB files into compact dtypes"""
+    expect = PandasPdb().read_pdb(TESTDATA_FILENAME)
+    for memory_map in (False, True):
+        ppdb = PandasPdb().read_pdb(
+            TESTDATA_FILENAME, memory_map=memory_map, compact=True
+        )
+        atom = ppdb.df["ATOM"]
+        assert atom["x_coord"].dtype == np.float32
+        assert atom["atom_number"].dtype == np.int32
+        assert isinstance(atom["residue_name"].dtype, pd.CategoricalDtype)
+        pd.testing.assert_frame_equal(
+            atom, PandasPdb().read_pdb(TESTDATA_FILENAME).compact().df["ATOM"]
+        )
+        assert ppdb.to_pdb_stream().getvalue() == expect.to_pdb_stream().getvalue()
+        assert len(ppdb.get("c-alpha")) == len(expect.get("c-alpha"))
+        assert ppdb.amino3to1()["residue_name"].tolist() == (
+            expect.amino3to1()["residue_name"].tolist()
+        )
+        assert PandasPdb.rmsd(ppdb.df["ATOM"], expect.df["ATOM"]) < 1e-4
+
+
+def test_read_pdb_lazy_sections():
+    """Test that record sections are only constructed when accessed"""
+    for memory_map in (False, True):
+        ppdb = PandasPdb().read_pdb(TESTDATA_FILENAME, memory_map=memory_map)
+        assert ppdb.code == "3eiy"
+        assert list(ppdb.df.keys()) == ["ATOM", "HETATM", "ANISOU", "OTHERS"]
+        assert not any(ppdb.df.is_loaded(r) for r in ppdb.df)
+        assert ppdb.df["ATOM"].shape == (1330, 21)
+        assert ppdb.df.is_loaded("ATOM")
+        assert not ppdb.df.is_loaded("OTHERS")
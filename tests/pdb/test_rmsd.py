@@ -11,6 +11,7 @@ if sys.version_info >= (3, 9):
 else:
     import importlib_resources as pkg_resources
 
+import numpy as np
 import pytest
 
 import tests.pdb.data
@@ -87,3 +88,81 @@ def test_ligand_default():
 def test_decimals():
     r = PandasPdb.rmsd(p1t48.df["ATOM"], p1t49.df["ATOM"], decimals=3)
     assert r == 0.738, r
+
+
+def test_superpose():
+    df = p1t48.df["ATOM"]
+    moved = df.copy()
+    xyz = df[["x_coord", "y_coord", "z_coord"]].to_numpy()
+    c, s = np.cos(0.5), np.sin(0.5)
+    rotation = np.array([[c, -s, 0.0], [s, c, 0.0], [0.0, 0.0, 1.0]])
+    moved[["x_coord", "y_coord", "z_coord"]] = xyz @ rotation.T + 5.0
+    assert PandasPdb.rmsd(moved, df) > 1.0
+    assert PandasPdb.rmsd(moved, df, superpose=True) == 0.0
+
+    found, _, fitted = PandasPdb.superpose(moved, df, s="c-alpha")
+    np.testing.assert_allclose(found, rotation.T, atol=1e-9)
+    np.testing.assert_allclose(
+        fitted[["x_coord", "y_coord", "z_coord"]].to_numpy(), xyz, atol=1e-6
+    )
+    assert fitted.index.equals(moved.index)
+    assert (fitted["atom_name"] == moved["atom_name"]).all()
+
+
+def test_superposed_rmsd():
+    df1, df2 = p1t48.df["ATOM"], p1t49.df["ATOM"]
+    r = PandasPdb.rmsd(df1, df2, s="c-alpha")
+    fitted = PandasPdb.rmsd(df1, df2, s="c-alpha", superpose=True)
+    assert fitted <= r, (fitted, r)
+
+    weighted = PandasPdb.rmsd(df1, df2, s="c-alpha", weights="b_factor")
+    coords = ["x_coord", "y_coord", "z_coord"]
+    ca1 = df1[df1["atom_name"] == "CA"]
+    ca2 = df2[df2["atom_name"] == "CA"]
+    weights = ca1["b_factor"].to_numpy()
+    diff = ca1[coords].to_numpy() - ca2[coords].to_numpy()
+    sq_dev = (diff**2).sum(axis=1)
+    expect = np.sqrt(sq_dev @ weights / weights.sum())
+    assert weighted == round(expect, 4), (weighted, expect)
+
+    uniform = PandasPdb.rmsd(df1, df2, weights=np.ones(len(df1)))
+    assert uniform == PandasPdb.rmsd(df1, df2)
+
+
+@pytest.mark.xfail(raises=AttributeError)
+def test_superpose_invalid_query():
+    PandasPdb.superpose(p1t48.df["ATOM"], p1t48.df["ATOM"], s="bla")
+
+
+def test_matched_rmsd():
+    df1, df2 = p1t48.df["ATOM"], p1t49.df["ATOM"]
+    r, unmatched = PandasPdb.matched_rmsd(df1, df2, s="c-alpha")
+    assert r == 0.4785, r
+    assert len(unmatched) == 0
+
+    # shuffled rows with missing atoms
+    shuffled = df2.sample(frac=1.0, random_state=0)
+    missing = shuffled.index[:10]
+    r, unmatched = PandasPdb.matched_rmsd(df1, shuffled.iloc[10:])
+    expect = PandasPdb.rmsd(df1.drop(missing), df2.drop(missing))
+    assert r == expect, (r, expect)
+    assert sorted(unmatched.index) == sorted(missing)
+    assert (unmatched["missing_from"] == "df2").all()
+
+    r, unmatched = PandasPdb.matched_rmsd(
+        shuffled.iloc[10:], df1, superpose=True, weights="b_factor"
+    )
+    assert (unmatched["missing_from"] == "df1").all()
+    expect = PandasPdb.rmsd(
+        df2.drop(missing),
+        df1.drop(missing),
+        superpose=True,
+        weights="b_factor",
+    )
+    assert r == expect, (r, expect)
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_matched_rmsd_duplicate_keys():
+    df = p1t48.df["ATOM"]
+    PandasPdb.matched_rmsd(df, df, keys=["chain_id", "atom_name"])
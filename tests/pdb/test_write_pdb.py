@@ -11,13 +11,19 @@ if sys.version_info >= (3, 9):
 else:
     import importlib_resources as pkg_resources
 
+import gzip
+import io
 import os
 import warnings
 
+import numpy as np
 import pandas as pd
+import pytest
 
 import tests.pdb.data
 from biopandas.pdb import PandasPdb
+from biopandas.pdb.engines import pdb_records
+from biopandas.pdb.writer import format_pdb_lines, iter_pdb_lines
 
 TEST_DATA = pkg_resources.files(tests.pdb.data)
 
@@ -175,3 +181,88 @@ def test_to_pdb_stream():
 
     source_pdb = "\n".join(lines_to_check)
     assert stream.read() == source_pdb
+
+
+def test_to_pdb_formatting():
+    """Test that columns are formatted like the strf functions of pdb_records"""
+    ppdb = PandasPdb()
+    ppdb.read_pdb(TESTDATA_FILENAME)
+    atoms = ppdb.df["ATOM"]
+    atoms.loc[:2, "x_coord"] = [-0.0, 999.9994, -123.4567]
+    atoms.loc[:2, "b_factor"] = [100.0, -10.5, 99.99]
+    atoms.loc[:1, "charge"] = [-1.0, 1.0]
+
+    expected = []
+    for _, row in atoms.iterrows():
+        line = ""
+        for col in pdb_records["ATOM"]:
+            if col["id"] == "charge" and pd.isnull(row["charge"]):
+                continue
+            line += col["strf"](row[col["id"]])
+        expected.append(line.ljust(80))
+
+    stream = ppdb.to_pdb_stream(records=("ATOM",))
+    assert stream.read().split("\n")[:-1] == expected
+
+
+def test_to_pdb_compact():
+    ppdb = PandasPdb()
+    ppdb.read_pdb(TESTDATA_FILENAME2, compact=True)
+    ppdb.to_pdb(path=OUTFILE, records=None)
+    with open(OUTFILE, "r") as f:
+        f1 = f.read()
+    os.remove(OUTFILE)
+    assert f1 == four_eiy
+
+
+def test_to_pdb_file_objects():
+    ppdb = PandasPdb()
+    ppdb.read_pdb(TESTDATA_FILENAME2)
+
+    text = io.StringIO()
+    ppdb.to_pdb(text)
+    assert text.getvalue() == four_eiy
+
+    binary = io.BytesIO()
+    ppdb.to_pdb(binary)
+    assert binary.getvalue().decode() == four_eiy
+
+    binary = io.BytesIO()
+    ppdb.to_pdb(binary, gz=True)
+    assert gzip.decompress(binary.getvalue()).decode() == four_eiy
+
+
+def test_iter_pdb_lines():
+    ppdb = PandasPdb()
+    ppdb.read_pdb(TESTDATA_FILENAME2)
+    dfs = dict(ppdb.df)
+    chunks = list(iter_pdb_lines(dfs, chunksize=7))
+    assert all(len(chunk) <= 7 for chunk in chunks)
+    assert sum(chunks, []) == format_pdb_lines(dfs)
+
+
+def test_write_trajectory():
+    ppdb = PandasPdb()
+    ppdb.read_pdb(TESTDATA_FILENAME)
+    coords = ["x_coord", "y_coord", "z_coord"]
+    xyz = pd.concat([ppdb.df["ATOM"], ppdb.df["HETATM"]])[coords].to_numpy()
+    frames = np.stack([xyz, xyz + 1.0, xyz - 1.0])
+
+    stream = io.StringIO()
+    ppdb.write_trajectory(stream, frames)
+    lines = stream.getvalue().split("\n")
+    assert sum(line.startswith("MODEL") for line in lines) == 3
+    assert sum(line.startswith("ENDMDL") for line in lines) == 3
+    first = lines[1 : lines.index("ENDMDL".ljust(80))]
+    assert first == ppdb.to_pdb_stream().read().split("\n")[:-1]
+
+    traj = PandasPdb().read_pdb_from_list(stream.getvalue().splitlines(True))
+    for i, frame in enumerate(frames, 1):
+        model = traj.get_model(i)
+        df = pd.concat([model.df["ATOM"], model.df["HETATM"]])
+        assert np.allclose(df[coords].to_numpy(), frame, atol=1e-3)
+
+    with pytest.raises(ValueError):
+        ppdb.write_trajectory(stream, frames[:, :-1])
+    with pytest.raises(ValueError):
+        ppdb.write_trajectory(stream, frames, records=("OTHERS",))
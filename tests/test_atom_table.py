@@ -0,0 +1,126 @@
+# BioPandas
+# License: BSD 3 clause
+# Project Website: http://rasbt.github.io/biopandas/
+# Code Repository: https://github.com/rasbt/biopandas
+import os
+
+import numpy as np
+import pandas as pd
+
+from biopandas.atom_table import AtomTable, atom_table
+from biopandas.mmcif import PandasMmcif
+from biopandas.pdb import PandasPdb
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+PDB_FILE = os.path.join(TEST_DIR, "pdb", "data", "3eiy.pdb")
+CIF_FILE = os.path.join(TEST_DIR, "mmcif", "data", "3eiy.cif")
+
+COORDS = ("x_coord", "y_coord", "z_coord")
+
+
+def test_atom_table():
+    ppdb = PandasPdb().read_pdb(PDB_FILE)
+    frames = [ppdb.df["ATOM"], ppdb.df["HETATM"]]
+    table = AtomTable(frames, COORDS)
+    expect = pd.concat(frames)
+
+    assert table.size == len(expect)
+    assert table.index.equals(expect.index)
+    np.testing.assert_array_equal(table.xyz, expect[list(COORDS)].to_numpy())
+    assert table.xyz.flags.c_contiguous and not table.xyz.flags.writeable
+    pd.testing.assert_frame_equal(table.df, expect)
+
+    codes, lookup = table.codes("residue_name")
+    uniques = np.array(list(lookup), dtype=object)
+    np.testing.assert_array_equal(uniques[codes], expect["residue_name"])
+
+    # changes are only detected against a snapshot
+    assert not table.is_current(frames)
+    table.snapshot()
+    assert table.is_current(frames)
+
+
+def test_atom_table_cache():
+    ppdb = PandasPdb().read_pdb(PDB_FILE)
+    records = ("ATOM", "HETATM")
+    table = atom_table(ppdb, records, COORDS)
+    ppdb.distance()
+    ppdb.get("name CA")
+    assert atom_table(ppdb, records, COORDS) is table
+    assert atom_table(ppdb, ("ATOM",), COORDS) is not table
+
+    # assigned columns
+    ppdb.df["ATOM"]["residue_name"] = "XYZ"
+    assert atom_table(ppdb, records, COORDS) is not table
+    assert len(ppdb.get("resn XYZ")) == len(ppdb.df["ATOM"])
+
+    # coordinates modified in place
+    table = atom_table(ppdb, records, COORDS)
+    ppdb.df["ATOM"].loc[0, "x_coord"] = 100.0
+    assert ppdb.distance(xyz=(100.0, 0.0, 0.0)).iloc[0] == np.hypot(
+        ppdb.df["ATOM"].loc[0, "y_coord"], ppdb.df["ATOM"].loc[0, "z_coord"]
+    )
+    assert atom_table(ppdb, records, COORDS) is not table
+
+    # added columns and replaced DataFrames
+    table = atom_table(ppdb, records, COORDS)
+    ppdb.label_models()
+    assert "model_id" in ppdb.get("name CA").columns
+    ppdb.df["HETATM"] = ppdb.df["HETATM"].iloc[:10]
+    assert len(ppdb.distance()) == len(ppdb.df["ATOM"]) + 10
+
+
+def test_atom_table_inplace_columns():
+    ppdb = PandasPdb().read_pdb(PDB_FILE)
+    records = ("ATOM", "HETATM")
+    assert len(ppdb.get("hydrogen")) == 0
+    assert len(ppdb.get("elem H")) == 0
+    table = atom_table(ppdb, records, COORDS)
+
+    # values modified in place are used by the next selection
+    ppdb.df["ATOM"].loc[0:9, "element_symbol"] = "H"
+    assert not table.is_current([ppdb.df[r] for r in records])
+    assert len(ppdb.get("hydrogen")) == 10
+    assert len(ppdb.get("elem H")) == 10
+    assert ppdb.get("hydrogen")["element_symbol"].eq("H").all()
+    ppdb.df["ATOM"].loc[0:4, "chain_id"] = "Z"
+    assert ppdb.get("chain Z").index.tolist() == list(range(5))
+    ppdb.df["HETATM"].loc[:, "b_factor"] += 100.0
+    assert len(ppdb.get("b > 100")) == len(ppdb.df["HETATM"])
+
+
+def test_atom_table_reuse(monkeypatch):
+    ppdb = PandasPdb().read_pdb(PDB_FILE)
+    concat = pd.concat
+    calls = []
+
+    def counting_concat(*args, **kwargs):
+        calls.append(1)
+        return concat(*args, **kwargs)
+
+    monkeypatch.setattr(pd, "concat", counting_concat)
+    for _ in range(5):
+        ppdb.get("hydrogen")
+    # the concatenated DataFrame is reused while the DataFrames are current
+    assert len(calls) == 1
+    ppdb.df["ATOM"].loc[0, "element_symbol"] = "H"
+    assert len(ppdb.get("hydrogen")) == 1
+    assert len(calls) == 2
+
+    # categorical columns modified in place are detected as well
+    ppdb = PandasPdb().read_pdb(PDB_FILE, compact=True)
+    assert len(ppdb.get("resn ALA")) > 0
+    ppdb.df["ATOM"].loc[0, "residue_name"] = "ALA"
+    assert ppdb.get("resn ALA").index[0] == 0
+
+
+def test_distance_gyradius():
+    ppdb = PandasPdb().read_pdb(PDB_FILE)
+    df = pd.concat([ppdb.df["ATOM"], ppdb.df["HETATM"]])
+    expect = np.sqrt(((df[list(COORDS)] - (1.0, 2.0, 3.0)) ** 2).sum(axis=1))
+    pd.testing.assert_series_equal(ppdb.distance(xyz=(1.0, 2.0, 3.0)), expect)
+
+    pdbx = PandasMmcif().read_mmcif(CIF_FILE)
+    np.testing.assert_allclose(
+        pdbx.distance(xyz=(1.0, 2.0, 3.0)).to_numpy(), expect.to_numpy()
+    )
@@ -0,0 +1,75 @@
+# BioPandas
+# License: BSD 3 clause
+# Project Website: http://rasbt.github.io/biopandas/
+# Code Repository: https://github.com/rasbt/biopandas
+import os
+import warnings
+
+import pandas as pd
+
+from biopandas import read_many
+from biopandas.mmcif import PandasMmcif
+from biopandas.pdb import PandasPdb
+from tests.testutils import assert_raises
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+PDB_FILES = [
+    os.path.join(TEST_DIR, "pdb", "data", f)
+    for f in ("3eiy.pdb", "2jyf.pdb", "1t48_995.pdb")
+]
+CIF_FILE = os.path.join(TEST_DIR, "mmcif", "data", "3eiy.cif")
+
+
+def test_read_many_concat():
+    for workers in (1, 2):
+        df = read_many(PDB_FILES, workers=workers)
+        expect = pd.concat(
+            [
+                PandasPdb().read_pdb(p).df[r].assign(structure_id=p)
+                for p in PDB_FILES
+                for r in ("ATOM", "HETATM")
+            ],
+            ignore_index=True,
+        )
+        pd.testing.assert_frame_equal(df, expect)
+        assert df.attrs["errors"] == {}
+
+
+def test_read_many_iter():
+    paths = PDB_FILES + [CIF_FILE]
+    results = dict(read_many(paths, workers=2, concat=False))
+    assert set(results) == set(paths)
+    assert isinstance(results[CIF_FILE], PandasMmcif)
+    assert results[PDB_FILES[0]].pdb_text == ""
+    assert results[PDB_FILES[0]].code == "3eiy"
+    pd.testing.assert_frame_equal(
+        results[PDB_FILES[0]].df["ATOM"],
+        PandasPdb().read_pdb(PDB_FILES[0]).df["ATOM"],
+    )
+
+
+def test_read_many_glob():
+    pattern = os.path.join(TEST_DIR, "pdb", "data", "3eiy*.pdb*")
+    df = read_many(pattern, workers=1, columns=["x_coord"])
+    assert sorted(df["structure_id"].unique()) == sorted(
+        os.path.join(TEST_DIR, "pdb", "data", f)
+        for f in ("3eiy.pdb", "3eiy.pdb.gz", "3eiy_stripped_no_ele.pdb")
+    )
+    assert list(df.columns) == ["x_coord", "line_idx", "structure_id"]
+
+
+def test_read_many_errors():
+    missing = os.path.join(TEST_DIR, "missing.pdb")
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        df = read_many([PDB_FILES[0], missing], workers=2)
+    assert any(missing in str(x.message) for x in w)
+    assert list(df.attrs["errors"]) == [missing]
+    assert set(df["structure_id"]) == {PDB_FILES[0]}
+
+    results = dict(read_many([missing, "x.xyz"], workers=1, concat=False))
+    assert isinstance(results[missing], FileNotFoundError)
+    assert isinstance(results["x.xyz"], ValueError)
+
+    expect = "Unknown format 'xyz'"
+    assert_raises(ValueError, expect, read_many, PDB_FILES, fmt="xyz")
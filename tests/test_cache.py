@@ -0,0 +1,257 @@
+# BioPandas
+# License: BSD 3 clause
+# Project Website: http://rasbt.github.io/biopandas/
+# Code Repository: https://github.com/rasbt/biopandas
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+
+import pandas as pd
+import pytest
+
+from biopandas.cache import (
+    DiskCache,
+    MemoryCache,
+    clear_cache,
+    sorted_names,
+)
+from biopandas.mmcif import PandasMmcif
+from biopandas.pdb import PandasPdb
+
+requires_pyarrow = pytest.mark.skipif(
+    importlib.util.find_spec("pyarrow") is None, reason="requires pyarrow"
+)
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+PDB_FILE = os.path.join(TEST_DIR, "pdb", "data", "3eiy.pdb")
+CIF_FILE = os.path.join(TEST_DIR, "mmcif", "data", "3eiy.cif")
+
+
+@requires_pyarrow
+def test_read_pdb_cache(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache = DiskCache(cache_dir)
+    expect = PandasPdb().read_pdb(PDB_FILE)
+    for _ in range(2):
+        ppdb = PandasPdb().read_pdb(PDB_FILE, cache=cache)
+        assert len(os.listdir(cache_dir)) == 1
+        assert ppdb.code == expect.code == "3eiy"
+        assert ppdb.pdb_text == expect.pdb_text
+        for r in expect.df:
+            pd.testing.assert_frame_equal(ppdb.df[r], expect.df[r])
+
+    # other arguments are cached separately
+    ppdb = PandasPdb().read_pdb(PDB_FILE, cache=str(cache_dir), compact=True)
+    assert ppdb.df["ATOM"]["x_coord"].dtype == "float32"
+    assert len(os.listdir(cache_dir)) == 2
+
+    # modified files are parsed again
+    path = str(tmp_path / "copy.pdb")
+    shutil.copy(PDB_FILE, path)
+    PandasPdb().read_pdb(path, cache=cache)
+    with open(path, "a") as f:
+        f.write("REMARK 999 modified\n")
+    ppdb = PandasPdb().read_pdb(path, cache=cache)
+    assert ppdb.df["OTHERS"]["entry"].iloc[-1] == " 999 modified"
+
+    # only the entries of the cache are removed
+    (cache_dir / "data.pdb").write_text("ATOM\n")
+    (cache_dir / "results").mkdir()
+    (cache_dir / "results" / "out.csv").write_text("x\n")
+    clear_cache(cache_dir)
+    assert sorted(os.listdir(cache_dir)) == ["data.pdb", "results"]
+    assert os.listdir(cache_dir / "results") == ["out.csv"]
+
+
+@requires_pyarrow
+def test_read_mmcif_cache(tmp_path):
+    expect = PandasMmcif().read_mmcif(CIF_FILE)
+    PandasMmcif().read_mmcif(CIF_FILE, cache=tmp_path)
+    pdb = PandasMmcif().read_mmcif(CIF_FILE, cache=tmp_path)
+    assert pdb.code == "3eiy"
+    assert pdb.data["atom_site"] == expect.data["atom_site"]
+    for r in expect.df:
+        pd.testing.assert_frame_equal(pdb.df[r], expect.df[r])
+
+
+@requires_pyarrow
+def test_cache_eviction(tmp_path):
+    cache = DiskCache(tmp_path, max_size=0)
+    PandasPdb().read_pdb(PDB_FILE, cache=cache)
+    assert cache.size() == 0
+
+    cache.max_size = None
+    df = pd.DataFrame({"x": [1.0, 2.0]})
+    for key in ("a", "b", "c"):
+        cache.put(key, {"df": df}, {})
+    os.utime(os.path.join(tmp_path, "b", "meta.json"), (0, 0))
+    assert cache.get("a") is not None
+    cache.max_size = 2 * cache.size() // 3
+    cache._evict()
+    assert sorted(os.listdir(tmp_path)) == ["a", "c"]
+    assert cache.get("b") is None
+
+
+def test_cache_key():
+    cache = MemoryCache()
+    key = cache.key(PDB_FILE, "pdb", records=["ATOM", "HETATM"], columns=None)
+    for records in (("HETATM", "ATOM"), {"ATOM", "HETATM"}):
+        records = sorted_names(records)
+        assert cache.key(PDB_FILE, "pdb", records=records, columns=None) == key
+    assert cache.key(PDB_FILE, "pdb", records=["ATOM"]) != key
+    assert sorted_names("ATOM") == ["ATOM"] and sorted_names(None) is None
+
+    # keys of set-valued options do not depend on the hash seed
+    code = (
+        "from biopandas.cache import MemoryCache; "
+        f"print(MemoryCache().key({PDB_FILE!r}, 'pdb', "
+        "records=set('ABCDEFGH')))"
+    )
+    keys = {
+        subprocess.run(
+            [sys.executable, "-c", code],
+            env=dict(os.environ, PYTHONHASHSEED=str(seed)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        for seed in range(3)
+    }
+    assert len(keys) == 1
+
+    # reading with equivalent options hits the cached entry
+    PandasPdb().read_pdb(PDB_FILE, records=("ATOM", "HETATM"), cache=cache)
+    PandasPdb().read_pdb(PDB_FILE, records={"HETATM", "ATOM"}, cache=cache)
+    PandasMmcif().read_mmcif(CIF_FILE, columns=["id", "Cartn_x"], cache=cache)
+    PandasMmcif().read_mmcif(CIF_FILE, columns=("Cartn_x", "id"), cache=cache)
+    assert cache.stats()["hits"] == 2
+
+
+def test_memory_cache():
+    cache = MemoryCache()
+    expect = PandasPdb().read_pdb(PDB_FILE)
+    ppdb = PandasPdb().read_pdb(PDB_FILE, cache=cache)
+    ppdb.df["ATOM"].loc[0, "x_coord"] = 1000.0
+    for _ in range(2):
+        ppdb = PandasPdb().read_pdb(PDB_FILE, cache=cache)
+        assert ppdb.code == "3eiy"
+        for r in expect.df:
+            pd.testing.assert_frame_equal(ppdb.df[r], expect.df[r])
+        # modifying the returned copy does not modify the cached entry
+        ppdb.df["ATOM"].loc[0, "x_coord"] = 1000.0
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 1, 1)
+
+    pdb = PandasMmcif().read_mmcif(CIF_FILE, cache=cache)
+    pdb.data["atom_site"]["Cartn_x"][0] = "1000.0"
+    pdb = PandasMmcif().read_mmcif(CIF_FILE, cache=cache)
+    assert pdb.data["atom_site"]["Cartn_x"][0] != "1000.0"
+
+    cache.max_size = cache.size()
+    PandasPdb().read_pdb(PDB_FILE, cache=cache, compact=True)
+    stats = cache.stats()
+    assert stats["evictions"] >= 1 and stats["size"] <= cache.max_size
+    cache.clear()
+    assert cache.stats()["entries"] == 0
+
+
+def test_memory_cache_size():
+    cache = MemoryCache()
+    pdb = PandasMmcif().read_mmcif(CIF_FILE, cache=cache)
+    size = cache.size()
+    assert size >= len(pdb.pdb_text)
+    # record sections are counted once they are constructed and stored
+    frames = sum(
+        df.memory_usage(index=True, deep=True).sum() for df in pdb.df.values()
+    )
+    assert cache.size() == size + frames
+
+    # nested attributes are counted as well
+    data = {k: pdb.data[k] for k in pdb.data}
+    strings = sum(
+        sys.getsizeof(v)
+        for category in data.values()
+        for values in category.values()
+        for v in values
+    )
+    assert cache.put("data", {}, {"data": data})
+    assert cache.size() >= size + frames + strings
+    cache.max_size = frames + strings - 1
+    assert not cache.put("copy", dict(pdb.df), {"data": data})
+    assert cache.stats()["entries"] == 2
+
+
+@requires_pyarrow
+def test_cache_lazy_sections(tmp_path, monkeypatch):
+    cache = DiskCache(tmp_path)
+    expect = PandasPdb().read_pdb(PDB_FILE)
+
+    def stored():
+        (entry,) = os.listdir(tmp_path)
+        with open(tmp_path / entry / "meta.json") as f:
+            return json.load(f)["frames"]
+
+    # sections are stored once they are constructed
+    ppdb = PandasPdb().read_pdb(PDB_FILE, cache=cache)
+    assert not any(ppdb.df.is_loaded(r) for r in ppdb.df)
+    assert stored() == []
+    ppdb.df["ATOM"]
+    assert stored() == ["ATOM"]
+
+    # other sections are read again from the file and stored
+    ppdb = PandasPdb().read_pdb(PDB_FILE, cache=cache)
+    assert (ppdb.header, ppdb.code) == (expect.header, "3eiy")
+    for r in expect.df:
+        pd.testing.assert_frame_equal(ppdb.df[r], expect.df[r])
+    assert sorted(stored()) == sorted(expect.df)
+    clear_cache(tmp_path)
+
+    pdb = PandasMmcif().read_mmcif(CIF_FILE, cache=cache)
+    assert not pdb.data.is_loaded("struct") and stored() == []
+    expect = PandasMmcif().read_mmcif(CIF_FILE)
+    pdb = PandasMmcif().read_mmcif(CIF_FILE, cache=cache)
+    assert pdb.code == "3eiy" and list(pdb.data) == list(expect.data)
+    assert pdb.data["struct"] == expect.data["struct"]
+    pd.testing.assert_frame_equal(pdb.df["ATOM"], expect.df["ATOM"])
+    assert stored() == ["ATOM"]
+    clear_cache(tmp_path)
+
+    # fetched structures restore the header and code
+    with open(PDB_FILE) as f:
+        text = f.read()
+    monkeypatch.setattr(
+        PandasPdb, "_fetch_pdb", lambda self, code: ("url", text)
+    )
+    expect = PandasPdb().fetch_pdb("3eiy")
+    ppdb = PandasPdb().fetch_pdb("3eiy", cache=cache)
+    ppdb = PandasPdb().fetch_pdb("3eiy", cache=cache)
+    assert (ppdb.header, ppdb.code) == (expect.header, "3eiy")
+    assert ppdb.pdb_path == "url"
+    pd.testing.assert_frame_equal(ppdb.df["OTHERS"], expect.df["OTHERS"])
+
+
+def test_memory_cache_threads():
+    cache = MemoryCache()
+    expect = PandasPdb().read_pdb(PDB_FILE).df["ATOM"]
+    errors = []
+
+    def read():
+        try:
+            for _ in range(5):
+                df = PandasPdb().read_pdb(PDB_FILE, cache=cache).df["ATOM"]
+                pd.testing.assert_frame_equal(df, expect)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 20 and stats["entries"] == 1
@@ -0,0 +1,103 @@
+# BioPandas
+# License: BSD 3 clause
+# Project Website: http://rasbt.github.io/biopandas/
+# Code Repository: https://github.com/rasbt/biopandas
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from biopandas.mmcif import PandasMmcif
+from biopandas.mmtf import PandasMmtf
+from biopandas.pdb import PandasPdb
+
+requires_scipy = pytest.mark.skipif(
+    importlib.util.find_spec("scipy") is None, reason="requires scipy"
+)
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+PDB_FILE = os.path.join(TEST_DIR, "pdb", "data", "3eiy.pdb")
+CIF_FILE = os.path.join(TEST_DIR, "mmcif", "data", "3eiy.cif")
+MMTF_FILE = os.path.join(TEST_DIR, "mmtf", "data", "3eiy.mmtf")
+
+COORDS = ["x_coord", "y_coord", "z_coord"]
+KEYS = ["chain_id", "residue_number", "insertion"]
+
+
+def pairwise(xyz):
+    return np.sqrt(((xyz[:, None, :] - xyz[None, :, :]) ** 2).sum(axis=2))
+
+
+def test_residue_distances():
+    ppdb = PandasPdb().read_pdb(PDB_FILE)
+    df = ppdb.df["ATOM"]
+    residues = df.groupby(KEYS, sort=False).ngroup().to_numpy()
+    atom_dist = pd.DataFrame(pairwise(df[COORDS].to_numpy()))
+    expect = atom_dist.groupby(residues).min().T.groupby(residues).min()
+
+    # tiny tiles split residues between tiles
+    dist = ppdb.contact_map(max_memory=2**12)
+    assert dist.shape == (174, 174)
+    assert list(dist.index[0]) == ["A", 2, ""]
+    assert dist.index.names == KEYS
+    np.testing.assert_allclose(dist.to_numpy(), expect.to_numpy(), atol=1e-9)
+    contacts = ppdb.contact_map(cutoff=4.0)
+    np.testing.assert_array_equal(contacts.to_numpy(), dist.to_numpy() <= 4.0)
+
+    ca = df[df["atom_name"] == "CA"][COORDS].to_numpy()
+    dist = ppdb.contact_map(reduce="ca")
+    np.testing.assert_allclose(dist.to_numpy(), pairwise(ca))
+    contacts = ppdb.contact_map(reduce="ca", cutoff=8.0)
+    np.testing.assert_array_equal(contacts.to_numpy(), pairwise(ca) <= 8.0)
+
+    centroids = df.groupby(residues)[COORDS].mean().to_numpy()
+    dist = ppdb.contact_map(reduce="centroid")
+    np.testing.assert_allclose(dist.to_numpy(), pairwise(centroids))
+
+
+def test_atom_contacts():
+    ppdb = PandasPdb().read_pdb(PDB_FILE)
+    df = ppdb.df["ATOM"]
+    contacts = ppdb.contact_map(level="atom", cutoff=3.0)
+    assert contacts.index.equals(df.index)
+    np.testing.assert_array_equal(
+        contacts.to_numpy(), pairwise(df[COORDS].to_numpy()) <= 3.0
+    )
+
+
+def test_formats():
+    expect = PandasPdb().read_pdb(PDB_FILE).contact_map(cutoff=5.0)
+    pmmtf = PandasMmtf().read_mmtf(MMTF_FILE)
+    pd.testing.assert_frame_equal(pmmtf.contact_map(cutoff=5.0), expect)
+    pmmcif = PandasMmcif().read_mmcif(CIF_FILE)
+    contacts = pmmcif.contact_map(cutoff=5.0)
+    assert contacts.index.names == [
+        "auth_asym_id",
+        "auth_seq_id",
+        "pdbx_PDB_ins_code",
+    ]
+    np.testing.assert_array_equal(contacts.to_numpy(), expect.to_numpy())
+
+
+@requires_scipy
+def test_sparse():
+    ppdb = PandasPdb().read_pdb(PDB_FILE)
+    matrix, keys = ppdb.contact_map(cutoff=6.0, sparse=True)
+    dense = ppdb.contact_map(cutoff=6.0)
+    assert keys.equals(dense.index)
+    np.testing.assert_array_equal(matrix.toarray(), dense.to_numpy())
+
+
+def test_exceptions():
+    ppdb = PandasPdb().read_pdb(PDB_FILE)
+    for kwargs in [
+        {"level": "chain"},
+        {"reduce": "max"},
+        {"sparse": True},
+        {"cutoff": -1.0},
+        {"max_memory": 0},
+    ]:
+        with pytest.raises(ValueError):
+            ppdb.contact_map(**kwargs)
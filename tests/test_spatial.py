@@ -0,0 +1,145 @@
+# BioPandas
+# License: BSD 3 clause
+# Project Website: http://rasbt.github.io/biopandas/
+# Code Repository: https://github.com/rasbt/biopandas
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from biopandas.mmcif import PandasMmcif
+from biopandas.mol2 import PandasMol2
+from biopandas.pdb import PandasPdb
+from biopandas import spatial
+from biopandas.spatial import SpatialIndex, point_distances
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+PDB_FILE = os.path.join(TEST_DIR, "pdb", "data", "3eiy.pdb")
+CIF_FILE = os.path.join(TEST_DIR, "mmcif", "data", "3eiy.cif")
+MOL2_FILE = os.path.join(TEST_DIR, "mol2", "data", "1b5e_1.mol2")
+
+
+def brute_force(xyz, points):
+    return np.sqrt(((points[:, None, :] - xyz[None, :, :]) ** 2).sum(axis=2))
+
+
+@pytest.mark.parametrize("cell_size", [1.0, 4.0, 25.0])
+def test_queries(cell_size):
+    rng = np.random.default_rng(0)
+    xyz = rng.uniform(-20.0, 20.0, size=(300, 3))
+    xyz[::50] = np.nan
+    index = SpatialIndex(xyz, cell_size=cell_size)
+    points = rng.uniform(-25.0, 25.0, size=(40, 3))
+    dist = np.where(np.isnan(xyz[:, 0]), np.inf, brute_force(xyz, points))
+
+    rows, distances = index.query_radius(points, r=6.0, return_distance=True)
+    for i in range(len(points)):
+        expect = np.flatnonzero(dist[i] <= 6.0)
+        np.testing.assert_array_equal(rows[i], expect)
+        np.testing.assert_allclose(distances[i], dist[i, expect])
+    np.testing.assert_array_equal(
+        index.query_radius(points[0], r=6.0), rows[0]
+    )
+
+    distances, rows = index.query_knn(points, k=7)
+    expect = np.argsort(dist, axis=1, kind="stable")[:, :7]
+    np.testing.assert_array_equal(rows, expect)
+    np.testing.assert_allclose(
+        distances, np.take_along_axis(dist, expect, axis=1)
+    )
+
+    pair_dist = brute_force(xyz, xyz)
+    expect = np.argwhere(np.triu(pair_dist <= 3.0, k=1))
+    pairs, distances = index.query_pairs(r=3.0, return_distance=True)
+    np.testing.assert_array_equal(pairs, expect)
+    np.testing.assert_allclose(
+        distances, pair_dist[expect[:, 0], expect[:, 1]]
+    )
+
+    np.testing.assert_array_equal(
+        index.within(points[:3], r=5.0), (dist[:3] <= 5.0).any(axis=0)
+    )
+
+
+def test_exceptions():
+    with pytest.raises(ValueError):
+        SpatialIndex(np.zeros((5, 2)))
+    with pytest.raises(ValueError):
+        SpatialIndex(np.zeros((5, 3)), cell_size=0)
+    index = SpatialIndex(np.zeros((5, 3)))
+    with pytest.raises(ValueError):
+        index.query_radius([np.nan, 0.0, 0.0], r=1.0)
+    with pytest.raises(ValueError):
+        index.query_radius([0.0, 0.0, 0.0], r=-1.0)
+    with pytest.raises(ValueError):
+        index.query_knn([0.0, 0.0, 0.0], k=6)
+
+
+def test_point_distances(monkeypatch):
+    rng = np.random.default_rng(0)
+    xyz = rng.uniform(-20.0, 20.0, size=(100, 3))
+    xyz[7] = np.nan
+    points = rng.uniform(-20.0, 20.0, size=(9, 3))
+    expect = brute_force(points, xyz)
+
+    # blocks of a few atoms
+    monkeypatch.setattr(spatial, "DISTANCE_BLOCK_SIZE", 20)
+    np.testing.assert_allclose(point_distances(xyz, points), expect)
+    np.testing.assert_allclose(
+        point_distances(xyz, points, reduce="min"), expect.min(axis=1)
+    )
+    argmin = point_distances(xyz, points, reduce="argmin")
+    np.testing.assert_array_equal(argmin[:7], expect[:7].argmin(axis=1))
+    assert argmin[7] == -1
+    np.testing.assert_array_equal(
+        point_distances(xyz, points, reduce="count", cutoff=15.0),
+        (expect <= 15.0).sum(axis=1),
+    )
+
+    with pytest.raises(ValueError):
+        point_distances(xyz, points, reduce="max")
+    with pytest.raises(ValueError):
+        point_distances(xyz, points, reduce="count")
+    with pytest.raises(ValueError):
+        point_distances(xyz, points, cutoff=5.0)
+    with pytest.raises(ValueError):
+        point_distances(xyz, xyz)
+
+
+def test_build_spatial_index():
+    ppdb = PandasPdb().read_pdb(PDB_FILE)
+    index = ppdb.build_spatial_index()
+    assert ppdb.build_spatial_index() is index
+    assert ppdb.build_spatial_index(records=("ATOM",)) is not index
+
+    df = pd.concat([ppdb.df["ATOM"], ppdb.df["HETATM"]])
+    center = df[["x_coord", "y_coord", "z_coord"]].to_numpy()[100]
+    rows = index.query_radius(center, r=5.0)
+    np.testing.assert_array_equal(
+        rows, np.flatnonzero(ppdb.distance(xyz=center).to_numpy() <= 5.0)
+    )
+
+    # the index is rebuilt once the coordinates change
+    ppdb.df["ATOM"]["x_coord"] += 100.0
+    ppdb.df["HETATM"]["x_coord"] += 100.0
+    assert ppdb.build_spatial_index() is not index
+    assert len(ppdb.build_spatial_index().query_radius(center, r=5.0)) == 0
+
+    pdbx = PandasMmcif().read_mmcif(CIF_FILE)
+    _, expect = (
+        PandasPdb()
+        .read_pdb(PDB_FILE)
+        .build_spatial_index()
+        .query_knn(center, k=10)
+    )
+    _, rows = pdbx.build_spatial_index().query_knn(center, k=10)
+    np.testing.assert_array_equal(rows, expect)
+
+    pmol = PandasMol2().read_mol2(MOL2_FILE)
+    pairs = pmol.build_spatial_index().query_pairs(r=1.6)
+    xyz = pmol.df[["x", "y", "z"]].to_numpy()
+    expect = np.argwhere(np.triu(brute_force(xyz, xyz) <= 1.6, k=1))
+    np.testing.assert_array_equal(pairs, expect)
+    pmol._df = pmol.df.iloc[:5]
+    assert len(pmol.build_spatial_index()) == 5
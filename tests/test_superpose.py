@@ -0,0 +1,150 @@
+# BioPandas
+# License: BSD 3 clause
+# Project Website: http://rasbt.github.io/biopandas/
+# Code Repository: https://github.com/rasbt/biopandas
+import numpy as np
+import pandas as pd
+import pytest
+
+from biopandas.superpose import (
+    coordinate_rmsd,
+    kabsch,
+    match_atoms,
+    rmsd_matrix,
+    transform,
+)
+
+
+def random_rotation(rng):
+    q, r = np.linalg.qr(rng.normal(size=(3, 3)))
+    q *= np.sign(np.diag(r))
+    return q if np.linalg.det(q) > 0 else -q
+
+
+def test_kabsch():
+    rng = np.random.default_rng(0)
+    reference = rng.uniform(-10.0, 10.0, size=(50, 3))
+    rotation = random_rotation(rng)
+    mobile = (reference - 3.0) @ rotation.T
+
+    found, translation = kabsch(mobile, reference)
+    np.testing.assert_allclose(found, rotation.T, atol=1e-9)
+    np.testing.assert_allclose(
+        transform(mobile, found, translation), reference, atol=1e-9
+    )
+    assert coordinate_rmsd(mobile, reference, superpose=True) < 1e-9
+    assert coordinate_rmsd(mobile, reference) > 1.0
+
+    # the mirror image is superposed with a proper rotation
+    found, _ = kabsch(mobile * [1.0, 1.0, -1.0], reference)
+    assert np.isclose(np.linalg.det(found), 1.0)
+
+
+def test_batched():
+    rng = np.random.default_rng(1)
+    reference = rng.uniform(-10.0, 10.0, size=(30, 3))
+    frames = reference + rng.normal(scale=0.5, size=(4, 30, 3))
+    rotations, translations = kabsch(frames, reference)
+    assert rotations.shape == (4, 3, 3)
+    assert translations.shape == (4, 3)
+    rmsd = coordinate_rmsd(frames, reference, superpose=True)
+    assert rmsd.shape == (4,)
+    for i in range(4):
+        rotation, translation = kabsch(frames[i], reference)
+        np.testing.assert_allclose(rotations[i], rotation)
+        np.testing.assert_allclose(translations[i], translation)
+        assert np.isclose(
+            rmsd[i], coordinate_rmsd(frames[i], reference, superpose=True)
+        )
+
+
+def test_weights():
+    rng = np.random.default_rng(2)
+    reference = rng.uniform(-10.0, 10.0, size=(20, 3))
+    mobile = reference + rng.normal(scale=1.0, size=(20, 3))
+    weights = rng.uniform(0.0, 1.0, size=20)
+    expect = np.sqrt(((mobile - reference) ** 2).sum(axis=1) @ weights)
+    assert np.isclose(
+        coordinate_rmsd(mobile, reference, weights=weights),
+        expect / np.sqrt(weights.sum()),
+    )
+
+    # the weighted superposition minimizes the weighted RMSD
+    fitted = coordinate_rmsd(mobile, reference, weights, superpose=True)
+    unweighted = transform(mobile, *kabsch(mobile, reference))
+    assert fitted < coordinate_rmsd(unweighted, reference, weights)
+
+    # atoms with zero weight do not affect the superposition
+    weights[:5] = 0.0
+    shifted = mobile.copy()
+    shifted[:5] += 100.0
+    np.testing.assert_allclose(
+        kabsch(shifted, reference, weights)[0],
+        kabsch(mobile, reference, weights)[0],
+    )
+
+
+@pytest.mark.parametrize("superpose", [False, True])
+def test_rmsd_matrix(superpose):
+    rng = np.random.default_rng(3)
+    reference = rng.uniform(-10.0, 10.0, size=(40, 3))
+    frames = reference + rng.normal(scale=1.0, size=(11, 40, 3))
+    frames[3] = frames[3] * [1.0, 1.0, -1.0] + 50.0
+    weights = rng.uniform(0.0, 1.0, size=40)
+    for w in (None, weights):
+        expect = np.array(
+            [
+                [coordinate_rmsd(a, b, w, superpose=superpose) for b in frames]
+                for a in frames
+            ]
+        )
+        np.testing.assert_allclose(
+            rmsd_matrix(frames, superpose, w), expect, atol=1e-9
+        )
+        # blocks of a few frames, computed by worker processes
+        np.testing.assert_allclose(
+            rmsd_matrix(frames, superpose, w, chunk_size=4, workers=2),
+            expect,
+            atol=1e-9,
+        )
+    assert rmsd_matrix(np.empty((0, 5, 3))).shape == (0, 0)
+
+
+def test_match_atoms():
+    df1 = pd.DataFrame(
+        {"chain": ["A", "A", "B", None], "resi": [1, 2, 1, 5], "x": range(4)}
+    )
+    df2 = pd.DataFrame(
+        {"chain": [None, "B", "C", "A"], "resi": [5.0, 1.0, 1.0, 1.0]}
+    )
+    rows1, rows2, unmatched = match_atoms(df1, df2, ["chain", "resi"])
+    np.testing.assert_array_equal(rows1, [0, 2, 3])
+    np.testing.assert_array_equal(rows2, [3, 1, 0])
+    assert list(unmatched.index) == [1, 2]
+    assert list(unmatched["missing_from"]) == ["df2", "df1"]
+
+    with pytest.raises(ValueError):
+        match_atoms(df1, df2, ["chain"])
+    with pytest.raises(ValueError):
+        match_atoms(df1, df2, [])
+
+
+def test_exceptions():
+    xyz = np.zeros((5, 3))
+    for args in [
+        (np.zeros((5, 2)), xyz),
+        (np.zeros((4, 3)), xyz),
+        (np.zeros((0, 3)), np.zeros((0, 3))),
+        (xyz, xyz, np.ones(4)),
+        (xyz, xyz, -np.ones(5)),
+        (xyz, xyz, np.zeros(5)),
+        (xyz, xyz, [1.0, 1.0, np.nan, 1.0, 1.0]),
+    ]:
+        with pytest.raises(ValueError):
+            coordinate_rmsd(*args)
+    with pytest.raises(ValueError):
+        rmsd_matrix(xyz)
+    with pytest.raises(ValueError):
+        rmsd_matrix([xyz, xyz], chunk_size=0)
+    with pytest.raises(ValueError):
+        rmsd_matrix([xyz, xyz], weights=np.ones(4))